@@ -1,34 +1,71 @@
 """
 Agente experto en AWS.
 """
-from strands import Agent, tool
-from strands_tools import use_aws, shell, python_repl, file_read, file_write
+from strands import Agent
 import sys
 import os
+import threading
 
 # Añadir el directorio raíz al path para importar módulos comunes
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from common.tools.aws_tools import list_aws_resources, analyze_aws_costs
 from config.settings import DEFAULT_MODEL
+from common.utils.approval_policy import approval_hooks
+from common.utils.output_governor import governed_tools, governor_hooks
 from agents.aws_expert.prompts import AWS_EXPERT_SYSTEM_PROMPT
 def custom_callback_handler(**kwargs):
     if "data" in kwargs:
         print(f"MODEL OUTPUT: {kwargs['data']}")
     elif "current_tool_use" in kwargs and kwargs["current_tool_use"].get("name"):
         print(f"\nUSING TOOL: {kwargs['current_tool_use']['name']}")
-# Definir el agente experto en AWS
-aws_expert_agent = Agent(
-    model=DEFAULT_MODEL,
-    tools=[
-        use_aws, 
-        shell, 
-        python_repl, 
-        file_read,
-        file_write
-    ],
-    system_prompt=AWS_EXPERT_SYSTEM_PROMPT
-)
+
+def create_aws_expert_agent(**agent_kwargs) -> Agent:
+    """
+    Crea una nueva instancia del agente experto en AWS.
+    
+    Args:
+        **agent_kwargs: Argumentos adicionales para Agent (ej. callback_handler)
+        
+    Returns:
+        Agent: Nueva instancia del agente
+    """
+    # Las herramientas se cargan al materializar el agente, no al importar el módulo
+    from strands_tools import use_aws, shell, python_repl, file_read, file_write
+    from common.tools.inventory_tools import scan_aws_inventory
+    
+    return Agent(
+        model=DEFAULT_MODEL,
+        tools=governed_tools([
+            use_aws, 
+            shell, 
+            python_repl, 
+            file_read,
+            file_write,
+            scan_aws_inventory
+        ]),
+        hooks=governor_hooks() + approval_hooks("aws_expert"),
+        system_prompt=AWS_EXPERT_SYSTEM_PROMPT,
+        **agent_kwargs
+    )
+
+# Definir el agente experto en AWS (se construye en el primer uso)
+_aws_expert_agent = None
+_aws_expert_agent_lock = threading.Lock()
+
+def get_aws_expert_agent() -> Agent:
+    """Obtiene la instancia compartida del agente experto en AWS, creándola en el primer uso."""
+    global _aws_expert_agent
+    if _aws_expert_agent is None:
+        with _aws_expert_agent_lock:
+            if _aws_expert_agent is None:
+                _aws_expert_agent = create_aws_expert_agent()
+    return _aws_expert_agent
+
+def __getattr__(name):
+    # Compatibilidad: `aws_expert_agent` se materializa al accederlo por primera vez
+    if name == "aws_expert_agent":
+        return get_aws_expert_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Función para usar el agente directamente
 def query_aws_expert(question: str) -> str:
@@ -41,7 +78,7 @@ def query_aws_expert(question: str) -> str:
     Returns:
         str: Respuesta del agente
     """
-    response = aws_expert_agent(question)
+    response = get_aws_expert_agent()(question)
     return response.message
 
 if __name__ == "__main__":
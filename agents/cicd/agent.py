@@ -1,27 +1,62 @@
 """
 Agente experto en CI/CD (GitHub Actions).
 """
-from strands import Agent, tool
-from strands_tools import file_read, file_write, shell
+from strands import Agent
 import sys
 import os
+import threading
 
 # Añadir el directorio raíz al path para importar módulos comunes
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from config.settings import DEFAULT_MODEL
+from common.utils.approval_policy import approval_hooks
+from common.utils.output_governor import governed_tools, governor_hooks
 from agents.cicd.prompts import CICD_EXPERT_SYSTEM_PROMPT
 
-# Definir el agente experto en CI/CD
-cicd_agent = Agent(
-    model=DEFAULT_MODEL,
-    tools=[
-        file_read, 
-        file_write, 
-        shell
-    ],
-    system_prompt=CICD_EXPERT_SYSTEM_PROMPT
-)
+def create_cicd_agent(**agent_kwargs) -> Agent:
+    """
+    Crea una nueva instancia del agente experto en CI/CD.
+    
+    Args:
+        **agent_kwargs: Argumentos adicionales para Agent (ej. callback_handler)
+        
+    Returns:
+        Agent: Nueva instancia del agente
+    """
+    # Las herramientas se cargan al materializar el agente, no al importar el módulo
+    from strands_tools import file_read, file_write, shell
+    
+    return Agent(
+        model=DEFAULT_MODEL,
+        tools=governed_tools([
+            file_read, 
+            file_write, 
+            shell
+        ]),
+        hooks=governor_hooks() + approval_hooks("cicd"),
+        system_prompt=CICD_EXPERT_SYSTEM_PROMPT,
+        **agent_kwargs
+    )
+
+# Definir el agente experto en CI/CD (se construye en el primer uso)
+_cicd_agent = None
+_cicd_agent_lock = threading.Lock()
+
+def get_cicd_agent() -> Agent:
+    """Obtiene la instancia compartida del agente experto en CI/CD, creándola en el primer uso."""
+    global _cicd_agent
+    if _cicd_agent is None:
+        with _cicd_agent_lock:
+            if _cicd_agent is None:
+                _cicd_agent = create_cicd_agent()
+    return _cicd_agent
+
+def __getattr__(name):
+    # Compatibilidad: `cicd_agent` se materializa al accederlo por primera vez
+    if name == "cicd_agent":
+        return get_cicd_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Función para usar el agente directamente
 def query_cicd_expert(question: str) -> str:
@@ -34,7 +69,7 @@ def query_cicd_expert(question: str) -> str:
     Returns:
         str: Respuesta del agente
     """
-    response = cicd_agent(question)
+    response = get_cicd_agent()(question)
     return response.message
 
 if __name__ == "__main__":
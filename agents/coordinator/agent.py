@@ -5,6 +5,8 @@ from strands import Agent
 import sys
 import os
 import logging
+import threading
+from functools import partial
 
 # Configurar logger
 logger = logging.getLogger(__name__)
@@ -12,26 +14,150 @@ logger = logging.getLogger(__name__)
 # Añadir el directorio raíz al path para importar módulos comunes
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from config.settings import DEFAULT_MODEL
+from config.settings import (
+    AGENT_POOL_IDLE_TIMEOUT,
+    AGENT_POOL_MAX_SIZE,
+    AGENT_POOL_MIN_SIZE,
+    DEFAULT_MODEL,
+    ENABLE_INTENT_ROUTER,
+    HANDLE_REQUEST_DEADLINE,
+    ROUTER_MAX_SPECIALISTS,
+    SPECIALIST_MAX_CONCURRENCY,
+    SPECIALIST_TIMEOUT,
+)
+from common.utils.approval_policy import approval_hooks
+from common.utils.output_governor import governor_hooks
 from agents.coordinator.prompts import COORDINATOR_SYSTEM_PROMPT
+from orchestrator.agent_pool import AgentPool
+from orchestrator.dispatcher import SpecialistDispatcher
+from orchestrator.router import get_intent_router
 
-# Importar los agentes especializados
-from agents.aws_expert.agent import aws_expert_agent, query_aws_expert
-from agents.networking.agent import networking_agent, query_networking_expert
-from agents.cicd.agent import cicd_agent, query_cicd_expert
-from agents.iac.agent import iac_agent, query_iac_expert
-from agents.kubernetes.agent import kubernetes_agent, query_kubernetes_expert
-
-# Definir el agente coordinador
-coordinator_agent = Agent(
-    model=DEFAULT_MODEL,
-    system_prompt=COORDINATOR_SYSTEM_PROMPT
-)
+# Importar las factorías de los especialistas (sus agentes se crean en el primer uso)
+from agents.aws_expert.agent import create_aws_expert_agent
+from agents.networking.agent import create_networking_agent
+from agents.cicd.agent import create_cicd_agent
+from agents.iac.agent import create_iac_agent
+from agents.kubernetes.agent import create_kubernetes_agent
+
+def create_coordinator_agent(**agent_kwargs) -> Agent:
+    """
+    Crea una nueva instancia del agente coordinador.
+    
+    Args:
+        **agent_kwargs: Argumentos adicionales para Agent (ej. callback_handler)
+        
+    Returns:
+        Agent: Nueva instancia del agente
+    """
+    return Agent(
+        model=DEFAULT_MODEL,
+        system_prompt=COORDINATOR_SYSTEM_PROMPT,
+        hooks=governor_hooks() + approval_hooks("coordinator"),
+        **agent_kwargs
+    )
+
+# Definir el agente coordinador (se construye en el primer uso)
+_coordinator_agent = None
+_coordinator_agent_lock = threading.Lock()
+
+def get_coordinator_agent() -> Agent:
+    """Obtiene la instancia compartida del agente coordinador, creándola en el primer uso."""
+    global _coordinator_agent
+    if _coordinator_agent is None:
+        with _coordinator_agent_lock:
+            if _coordinator_agent is None:
+                _coordinator_agent = create_coordinator_agent()
+    return _coordinator_agent
+
+def __getattr__(name):
+    # Compatibilidad: `coordinator_agent` se materializa al accederlo por primera vez
+    if name == "coordinator_agent":
+        return get_coordinator_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Factorías por id de especialista (los ids del enrutador local)
+SPECIALIST_FACTORIES = {
+    "aws_expert": create_aws_expert_agent,
+    "networking": create_networking_agent,
+    "cicd": create_cicd_agent,
+    "iac": create_iac_agent,
+    "kubernetes": create_kubernetes_agent
+}
+
+# Nombre con el que el coordinador menciona a cada especialista en su plan
+SPECIALIST_MENTIONS = {
+    "aws_expert": "aws expert",
+    "networking": "networking expert",
+    "cicd": "ci/cd expert",
+    "iac": "iac expert",
+    "kubernetes": "kubernetes expert"
+}
+
+# Títulos de las secciones de una respuesta combinada
+SPECIALIST_TITLES = {
+    "aws_expert": "Experto en AWS",
+    "networking": "Experto en Networking",
+    "cicd": "Experto en CI/CD",
+    "iac": "Experto en Infrastructure as Code",
+    "kubernetes": "Experto en Kubernetes"
+}
+
+# Pool de hilos para consultar a varios especialistas a la vez (se crea en el primer uso)
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+def _get_dispatcher() -> SpecialistDispatcher:
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = SpecialistDispatcher(SPECIALIST_MAX_CONCURRENCY, SPECIALIST_TIMEOUT)
+    return _dispatcher
+
+# Un pool de instancias por especialista (se crean en el primer uso). Una consulta que
+# vence el plazo sigue ocupando su instancia hasta terminar; la siguiente solicitud
+# toma otra en lugar de invocar a la vez el mismo Agent
+_specialist_pools = {}
+_specialist_pools_lock = threading.Lock()
+
+def _get_specialist_pool(spec_id: str) -> AgentPool:
+    pool = _specialist_pools.get(spec_id)
+    if pool is None:
+        with _specialist_pools_lock:
+            pool = _specialist_pools.get(spec_id)
+            if pool is None:
+                pool = AgentPool(
+                    SPECIALIST_FACTORIES[spec_id],
+                    min_size=AGENT_POOL_MIN_SIZE,
+                    max_size=AGENT_POOL_MAX_SIZE,
+                    idle_timeout=AGENT_POOL_IDLE_TIMEOUT,
+                    name=spec_id
+                )
+                _specialist_pools[spec_id] = pool
+    return pool
+
+def _ask_specialist(spec_id: str, question: str):
+    """Consulta a un especialista con una instancia propia del pool."""
+    with _get_specialist_pool(spec_id).checkout(timeout=HANDLE_REQUEST_DEADLINE) as agent:
+        return agent(question)
+
+def _specialists_in_plan(planning_result: str) -> list:
+    """Especialistas mencionados en el plan del coordinador, por orden de primera mención."""
+    text = planning_result.lower()
+    mentioned = [(text.find(name), spec_id) for spec_id, name in SPECIALIST_MENTIONS.items() if name in text]
+    return [spec_id for _, spec_id in sorted(mentioned)][:ROUTER_MAX_SPECIALISTS]
 
 # Función para manejar solicitudes
 def handle_request(user_query: str) -> str:
     """
-    Maneja una solicitud del usuario y la dirige al agente especializado adecuado.
+    Maneja una solicitud del usuario y la dirige a los agentes especializados adecuados.
+    
+    Si el enrutador local clasifica la consulta con confianza, se consulta
+    directamente a sus especialistas sin la llamada de planificación del
+    coordinador; las consultas ambiguas siguen pasando por el coordinador, cuyo
+    plan puede nombrar a varios especialistas. Los especialistas elegidos se
+    consultan a la vez con un plazo común (HANDLE_REQUEST_DEADLINE) y sus
+    respuestas se combinan; los que no responden a tiempo se indican al final.
     
     Args:
         user_query (str): Consulta del usuario
@@ -39,6 +165,15 @@ def handle_request(user_query: str) -> str:
     Returns:
         str: Respuesta al usuario
     """
+    coordinator_agent = get_coordinator_agent()
+    
+    # Enrutamiento local: las consultas claras no necesitan planificación
+    if ENABLE_INTENT_ROUTER:
+        route = get_intent_router().route(user_query)
+        if route.confident:
+            logger.info(f"🧭 Consulta enrutada a {', '.join(route.specialists)} sin planificación del coordinador")
+            return _query_specialists(route.specialists, user_query, user_query)
+    
     # Usar el agente coordinador para determinar qué agentes especializados utilizar
     planning_response = coordinator_agent(user_query)
     
@@ -48,29 +183,15 @@ def handle_request(user_query: str) -> str:
     else:
         planning_result = str(planning_response)
     
-    # Analizar el resultado para determinar qué agente usar
-    agent_mapping = {
-        "aws expert": query_aws_expert,
-        "networking expert": query_networking_expert,
-        "ci/cd expert": query_cicd_expert,
-        "iac expert": query_iac_expert,
-        "kubernetes expert": query_kubernetes_expert
-    }
-    
-    # Determinar el agente principal a usar
-    selected_agent = None
-    
     # Asegurarse de que planning_result sea una cadena de texto
     if not isinstance(planning_result, str):
         planning_result = str(planning_result)
     
-    for agent_name, agent_func in agent_mapping.items():
-        if agent_name.lower() in planning_result.lower():
-            selected_agent = agent_func
-            break
+    # Determinar los agentes a usar
+    selected = _specialists_in_plan(planning_result)
     
     # Si no se identificó ningún agente específico, usar el coordinador
-    if selected_agent is None:
+    if not selected:
         response = coordinator_agent(f"""
         No pude determinar un agente especializado para tu consulta. 
         Por favor, intenta ser más específico o reformula tu pregunta.
@@ -78,36 +199,67 @@ def handle_request(user_query: str) -> str:
         Tu consulta original fue:
         {user_query}
         """)
-        return response.message
+        return _as_text(response)
     
-    # Usar el agente seleccionado para responder
-    try:
-        result = selected_agent(f"""
+    # Usar los agentes seleccionados para responder
+    return _query_specialists(selected, user_query, f"""
         {user_query}
         
         Contexto adicional del coordinador:
         {planning_result}
         """)
-        
-        # Asegurarse de que el resultado sea una cadena de texto
-        if not isinstance(result, str):
-            if hasattr(result, 'message'):
-                result = result.message
-            else:
-                result = str(result)
-        
+
+def _as_text(result) -> str:
+    """Texto de la respuesta de un especialista (cadena, AgentResult o mensaje de Strands)."""
+    if isinstance(result, str):
         return result
-    except Exception as e:
+    if hasattr(result, 'message'):
+        result = result.message
+    if isinstance(result, dict):
+        return "".join(block.get("text", "") for block in result.get("content", []))
+    return str(result)
+
+def _query_specialists(specialist_ids: list, user_query: str, specialist_query: str) -> str:
+    """
+    Consulta a los especialistas en paralelo y combina sus respuestas.
+    
+    Si ninguno responde, el coordinador contesta pidiendo más detalles.
+    """
+    calls = {spec_id: partial(_ask_specialist, spec_id, specialist_query) for spec_id in specialist_ids}
+    results = _get_dispatcher().fan_out(calls, deadline=HANDLE_REQUEST_DEADLINE)
+    
+    answers = {}
+    failures = {}
+    for spec_id in specialist_ids:
+        result = results[spec_id]
+        if isinstance(result, Exception):
+            logger.error(f"Error al usar el agente especializado {spec_id}: {str(result)}")
+            failures[spec_id] = result
+        else:
+            answers[spec_id] = _as_text(result)
+    
+    if not answers:
         # En caso de error, usar el coordinador como fallback
-        logger.error(f"Error al usar el agente especializado: {str(e)}")
-        response = coordinator_agent(f"""
+        response = get_coordinator_agent()(f"""
         Hubo un problema al procesar tu consulta con el agente especializado.
         Por favor, reformula tu pregunta o proporciona más detalles.
         
         Tu consulta original fue:
         {user_query}
         """)
-        return response.message
+        return _as_text(response)
+    
+    if len(answers) == 1 and not failures:
+        return next(iter(answers.values()))
+    
+    sections = [f"## {SPECIALIST_TITLES[spec_id]}\n\n{answer}" for spec_id, answer in answers.items()]
+    if failures:
+        missing = ", ".join(
+            f"{SPECIALIST_TITLES[spec_id]} ({'sin respuesta a tiempo' if isinstance(error, TimeoutError) else 'error'})"
+            for spec_id, error in failures.items()
+        )
+        sections.append(f"⚠️ Respuesta parcial: faltan las aportaciones de {missing}.")
+    return "\n\n".join(sections)
 
 # Función para usar el agente directamente
 def query_coordinator(question: str) -> str:
@@ -1,27 +1,63 @@
 """
 Agente experto en IaC (Terraform, CloudFormation).
 """
-from strands import Agent, tool
-from strands_tools import file_read, file_write, shell, python_repl
+from strands import Agent
 import sys
 import os
+import threading
 
 # Añadir el directorio raíz al path para importar módulos comunes
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from config.settings import DEFAULT_MODEL
+from common.utils.approval_policy import approval_hooks
+from common.utils.output_governor import governed_tools, governor_hooks
 from agents.iac.prompts import IAC_EXPERT_SYSTEM_PROMPT
-# Definir el agente experto en IaC
-iac_agent = Agent(
-    model=DEFAULT_MODEL,
-    tools=[
-        file_read, 
-        file_write, 
-        shell, 
-        python_repl
-    ],
-    system_prompt=IAC_EXPERT_SYSTEM_PROMPT
-)
+
+def create_iac_agent(**agent_kwargs) -> Agent:
+    """
+    Crea una nueva instancia del agente experto en IaC.
+    
+    Args:
+        **agent_kwargs: Argumentos adicionales para Agent (ej. callback_handler)
+        
+    Returns:
+        Agent: Nueva instancia del agente
+    """
+    # Las herramientas se cargan al materializar el agente, no al importar el módulo
+    from strands_tools import file_read, file_write, shell, python_repl
+    
+    return Agent(
+        model=DEFAULT_MODEL,
+        tools=governed_tools([
+            file_read, 
+            file_write, 
+            shell, 
+            python_repl
+        ]),
+        hooks=governor_hooks() + approval_hooks("iac"),
+        system_prompt=IAC_EXPERT_SYSTEM_PROMPT,
+        **agent_kwargs
+    )
+
+# Definir el agente experto en IaC (se construye en el primer uso)
+_iac_agent = None
+_iac_agent_lock = threading.Lock()
+
+def get_iac_agent() -> Agent:
+    """Obtiene la instancia compartida del agente experto en IaC, creándola en el primer uso."""
+    global _iac_agent
+    if _iac_agent is None:
+        with _iac_agent_lock:
+            if _iac_agent is None:
+                _iac_agent = create_iac_agent()
+    return _iac_agent
+
+def __getattr__(name):
+    # Compatibilidad: `iac_agent` se materializa al accederlo por primera vez
+    if name == "iac_agent":
+        return get_iac_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Función para usar el agente directamente
 def query_iac_expert(question: str) -> str:
@@ -34,7 +70,7 @@ def query_iac_expert(question: str) -> str:
     Returns:
         str: Respuesta del agente
     """
-    response = iac_agent(question)
+    response = get_iac_agent()(question)
     return response.message
 
 if __name__ == "__main__":
@@ -1,29 +1,64 @@
 """
 Agente experto en Kubernetes/EKS.
 """
-from strands import Agent, tool
-from strands_tools import file_read, file_write, shell, use_aws
+from strands import Agent
 import sys
 import os
+import threading
 
 
 # Añadir el directorio raíz al path para importar módulos comunes
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from config.settings import DEFAULT_MODEL
+from common.utils.approval_policy import approval_hooks
+from common.utils.output_governor import governed_tools, governor_hooks
 from agents.kubernetes.prompts import KUBERNETES_EXPERT_SYSTEM_PROMPT
 
-# Definir el agente experto en Kubernetes/EKS
-kubernetes_agent = Agent(
-    model=DEFAULT_MODEL,
-    tools=[
-        file_read, 
-        file_write, 
-        shell, 
-        use_aws
-    ],
-    system_prompt=KUBERNETES_EXPERT_SYSTEM_PROMPT
-)
+def create_kubernetes_agent(**agent_kwargs) -> Agent:
+    """
+    Crea una nueva instancia del agente experto en Kubernetes/EKS.
+    
+    Args:
+        **agent_kwargs: Argumentos adicionales para Agent (ej. callback_handler)
+        
+    Returns:
+        Agent: Nueva instancia del agente
+    """
+    # Las herramientas se cargan al materializar el agente, no al importar el módulo
+    from strands_tools import file_read, file_write, shell, use_aws
+    
+    return Agent(
+        model=DEFAULT_MODEL,
+        tools=governed_tools([
+            file_read, 
+            file_write, 
+            shell, 
+            use_aws
+        ]),
+        hooks=governor_hooks() + approval_hooks("kubernetes"),
+        system_prompt=KUBERNETES_EXPERT_SYSTEM_PROMPT,
+        **agent_kwargs
+    )
+
+# Definir el agente experto en Kubernetes/EKS (se construye en el primer uso)
+_kubernetes_agent = None
+_kubernetes_agent_lock = threading.Lock()
+
+def get_kubernetes_agent() -> Agent:
+    """Obtiene la instancia compartida del agente experto en Kubernetes/EKS, creándola en el primer uso."""
+    global _kubernetes_agent
+    if _kubernetes_agent is None:
+        with _kubernetes_agent_lock:
+            if _kubernetes_agent is None:
+                _kubernetes_agent = create_kubernetes_agent()
+    return _kubernetes_agent
+
+def __getattr__(name):
+    # Compatibilidad: `kubernetes_agent` se materializa al accederlo por primera vez
+    if name == "kubernetes_agent":
+        return get_kubernetes_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Función para usar el agente directamente
 def query_kubernetes_expert(question: str) -> str:
@@ -36,7 +71,7 @@ def query_kubernetes_expert(question: str) -> str:
     Returns:
         str: Respuesta del agente
     """
-    response = kubernetes_agent(question)
+    response = get_kubernetes_agent()(question)
     return response.message
 
 if __name__ == "__main__":
@@ -1,27 +1,62 @@
 """
 Agente experto en redes de AWS.
 """
-from strands import Agent, tool
-from strands_tools import use_aws, shell, python_repl
+from strands import Agent
 import sys
 import os
+import threading
 
 # Añadir el directorio raíz al path para importar módulos comunes
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from config.settings import DEFAULT_MODEL
+from common.utils.approval_policy import approval_hooks
+from common.utils.output_governor import governed_tools, governor_hooks
 from agents.networking.prompts import NETWORKING_EXPERT_SYSTEM_PROMPT
 
-# Definir el agente experto en redes de AWS
-networking_agent = Agent(
-    model=DEFAULT_MODEL,
-    tools=[
-        use_aws, 
-        shell, 
-        python_repl
-    ],
-    system_prompt=NETWORKING_EXPERT_SYSTEM_PROMPT
-)
+def create_networking_agent(**agent_kwargs) -> Agent:
+    """
+    Crea una nueva instancia del agente experto en redes de AWS.
+    
+    Args:
+        **agent_kwargs: Argumentos adicionales para Agent (ej. callback_handler)
+        
+    Returns:
+        Agent: Nueva instancia del agente
+    """
+    # Las herramientas se cargan al materializar el agente, no al importar el módulo
+    from strands_tools import use_aws, shell, python_repl
+    
+    return Agent(
+        model=DEFAULT_MODEL,
+        tools=governed_tools([
+            use_aws, 
+            shell, 
+            python_repl
+        ]),
+        hooks=governor_hooks() + approval_hooks("networking"),
+        system_prompt=NETWORKING_EXPERT_SYSTEM_PROMPT,
+        **agent_kwargs
+    )
+
+# Definir el agente experto en redes de AWS (se construye en el primer uso)
+_networking_agent = None
+_networking_agent_lock = threading.Lock()
+
+def get_networking_agent() -> Agent:
+    """Obtiene la instancia compartida del agente experto en redes de AWS, creándola en el primer uso."""
+    global _networking_agent
+    if _networking_agent is None:
+        with _networking_agent_lock:
+            if _networking_agent is None:
+                _networking_agent = create_networking_agent()
+    return _networking_agent
+
+def __getattr__(name):
+    # Compatibilidad: `networking_agent` se materializa al accederlo por primera vez
+    if name == "networking_agent":
+        return get_networking_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Función para usar el agente directamente
 def query_networking_expert(question: str) -> str:
@@ -34,7 +69,7 @@ def query_networking_expert(question: str) -> str:
     Returns:
         str: Respuesta del agente
     """
-    response = networking_agent(question)
+    response = get_networking_agent()(question)
     return response.message
 
 if __name__ == "__main__":
@@ -0,0 +1,4 @@
+"""
+Micro-benchmarks del ecosistema de agentes.
+Se ejecutan desde la raíz del proyecto, por ejemplo: python -m benchmarks.aws_client_pool
+"""
@@ -0,0 +1,106 @@
+"""
+Micro-benchmark de la caché de clientes boto3 (common/tools/aws_clients.py).
+
+Compara el coste por llamada de crear una boto3.Session y un cliente nuevos en
+cada invocación (comportamiento anterior de aws_tools) frente a reutilizar los
+clientes de AWSClientPool, contra un endpoint local simulado.
+
+Por defecto levanta un servidor moto en local (pip install "moto[server]");
+con --endpoint-url se puede usar cualquier otro stub compatible.
+
+Uso:
+    python -m benchmarks.aws_client_pool --calls 200 --threads 1 4
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+import boto3
+
+from common.tools.aws_clients import AWSClientPool
+
+REGION = "us-east-1"
+
+
+def _start_moto_server(port: int) -> str:
+    """Arranca un servidor moto en segundo plano y devuelve su URL."""
+    try:
+        from moto.server import ThreadedMotoServer
+    except ImportError:
+        sys.exit('moto no está instalado: pip install "moto[server]" o usa --endpoint-url')
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=port, verbose=False)
+    server.start()
+    return f"http://127.0.0.1:{port}"
+
+
+def _fresh_client_call():
+    """Comportamiento anterior: sesión y cliente nuevos en cada llamada."""
+    session = boto3.Session(region_name=REGION)
+    session.client("ec2").describe_vpcs()
+
+
+def _measure(call: Callable[[], None], calls: int, threads: int) -> Dict[str, float]:
+    """Ejecuta `calls` llamadas repartidas en `threads` hilos y devuelve sus latencias."""
+    def timed(_):
+        started = time.perf_counter()
+        call()
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    if threads == 1:
+        latencies: List[float] = [timed(i) for i in range(calls)]
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            latencies = list(executor.map(timed, range(calls)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "calls_per_s": calls / wall
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200, help="Llamadas por escenario")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4], help="Niveles de concurrencia")
+    parser.add_argument("--endpoint-url", help="Endpoint stub existente (por defecto se arranca moto)")
+    parser.add_argument("--port", type=int, default=5055, help="Puerto del servidor moto")
+    args = parser.parse_args()
+
+    endpoint = args.endpoint_url or _start_moto_server(args.port)
+
+    # botocore dirige todos los clientes al stub con AWS_ENDPOINT_URL
+    os.environ["AWS_ENDPOINT_URL"] = endpoint
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    os.environ.pop("AWS_PROFILE", None)
+
+    print(f"Endpoint: {endpoint} | {args.calls} llamadas ec2.describe_vpcs por escenario\n")
+    print(f"{'escenario':<22}{'hilos':>6}{'media ms':>11}{'p50 ms':>10}{'p95 ms':>10}{'llamadas/s':>12}")
+
+    for threads in args.threads:
+        pool = AWSClientPool(max_pool_connections=max(10, threads))
+        pooled_call = lambda: pool.get_client("ec2", REGION).describe_vpcs()
+        pooled_call()  # calentar el cliente y la conexión
+
+        for name, call in (("sesión nueva/llamada", _fresh_client_call), ("AWSClientPool", pooled_call)):
+            result = _measure(call, args.calls, threads)
+            print(f"{name:<22}{threads:>6}{result['mean_ms']:>11.2f}{result['p50_ms']:>10.2f}"
+                  f"{result['p95_ms']:>10.2f}{result['calls_per_s']:>12.1f}")
+
+    os._exit(0)  # el servidor moto corre en un hilo no daemon
+
+
+if __name__ == "__main__":
+    main()
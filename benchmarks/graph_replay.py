@@ -0,0 +1,317 @@
+"""
+Benchmark offline de la orquestación del grafo de agentes.
+
+Reproduce una traza de consultas a través de las topologías estrella y
+jerárquica (AgentGraph + aexecute_workflow), de handle_request y del flujo
+declarativo VPC -> Terraform -> pipeline (en paralelo por dependencias y, como
+referencia, en serie), con los
+agentes reales (prompts, herramientas y hooks) pero un modelo simulado y
+determinista (benchmarks/mock_model.py). No necesita red ni credenciales.
+
+Por escenario informa de:
+- throughput (consultas/s) y percentiles de latencia
+- sobrecarga de orquestación por consulta: latencia menos el tiempo cubierto por
+  llamadas simuladas al modelo (las que corren en paralelo cuentan una vez); con
+  concurrencia > 1 incluye la espera por la instancia de cada nodo
+- crecimiento de memoria (tracemalloc) en una segunda pasada sobre la traza
+
+La traza es un fichero JSON Lines con un campo "query" (o "text", "body",
+"title") por línea, o un fichero de texto con una consulta por línea. Sin
+--trace se usa un conjunto de consultas de ejemplo.
+
+Uso:
+    python -m benchmarks.graph_replay --trace consultas.jsonl --repeat 3 --concurrency 1 4
+"""
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import math
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from benchmarks.mock_model import MockLatency, ScriptedModel, covered_time, model_ledger
+
+# Consultas de ejemplo cuando no se indica --trace
+SAMPLE_QUERIES = [
+    "¿Cómo diseño una VPC con subredes públicas y privadas y un NAT gateway por AZ?",
+    "Crea un módulo de Terraform para un bucket S3 cifrado con versionado",
+    "Configura un pipeline de GitHub Actions que despliegue en EKS con Helm",
+    "¿Qué instancias EC2 debería usar para una base de datos RDS de alto rendimiento?",
+    "Explícame cómo exponer un servicio de Kubernetes con un ingress y DNS en Route 53",
+    "Diseña la red, el clúster EKS y la infraestructura como código para una app de microservicios",
+    "¿Cómo reduzco el coste de Lambda y S3 en mi cuenta AWS?",
+    "Migra este stack de CloudFormation a Terraform",
+    "Necesito un pipeline CI/CD con pruebas y despliegue blue/green",
+    "Revisa los security groups y las rutas de mi VPC",
+    "¿Cómo escalo pods automáticamente en un cluster de Kubernetes?",
+    "Arquitectura serverless en AWS con API Gateway, Lambda y DynamoDB desplegada con CDK",
+]
+
+def load_queries(path: str) -> List[str]:
+    """Lee las consultas de una traza JSON Lines o de texto plano."""
+    queries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                queries.append(line)
+                continue
+            if isinstance(record, dict):
+                text = next((record[key] for key in ("query", "text", "body", "title") if record.get(key)), None)
+                if text:
+                    queries.append(str(text))
+            elif isinstance(record, str):
+                queries.append(record)
+    return queries
+
+
+def _agent_factories() -> Dict[str, Callable[..., Any]]:
+    from agents.aws_expert.agent import create_aws_expert_agent
+    from agents.cicd.agent import create_cicd_agent
+    from agents.coordinator.agent import create_coordinator_agent
+    from agents.iac.agent import create_iac_agent
+    from agents.kubernetes.agent import create_kubernetes_agent
+    from agents.networking.agent import create_networking_agent
+
+    return {
+        "coordinator": create_coordinator_agent,
+        "aws_expert": create_aws_expert_agent,
+        "networking": create_networking_agent,
+        "cicd": create_cicd_agent,
+        "iac": create_iac_agent,
+        "kubernetes": create_kubernetes_agent,
+    }
+
+
+def _mocked_factory(agent_id: str, factory: Callable[..., Any], latency: MockLatency) -> Callable[[], Any]:
+    """Factoría del agente real con el modelo sustituido por el simulado."""
+    def build():
+        agent = factory(callback_handler=None)
+        agent.model = ScriptedModel(agent_id, latency)
+        return agent
+    return build
+
+
+def build_star(latency: MockLatency):
+    from orchestrator.agent_graph import create_agent_graph
+
+    factories = {agent_id: _mocked_factory(agent_id, factory, latency)
+                 for agent_id, factory in _agent_factories().items()}
+    return create_agent_graph(agent_factories=factories, use_pool=False)
+
+
+def build_hierarchical(latency: MockLatency):
+    from config.settings import ENABLE_CONCURRENT_DISPATCH, SPECIALIST_MAX_CONCURRENCY, SPECIALIST_TIMEOUT
+    from orchestrator.agent_graph import AgentGraph, create_aws_architecture_hierarchy
+
+    config = create_aws_architecture_hierarchy()
+    node_ids = [node["id"] for level in config["levels"] for node in level["nodes"]]
+
+    graph = AgentGraph("bench_hierarchical")
+    if ENABLE_CONCURRENT_DISPATCH:
+        graph.enable_concurrent_dispatch(SPECIALIST_MAX_CONCURRENCY, SPECIALIST_TIMEOUT)
+    factories = _agent_factories()
+    for node_id in node_ids:
+        graph.register_agent_factory(node_id, node_id, _mocked_factory(node_id, factories[node_id], latency))
+    graph.create_hierarchical_topology_from_existing(config)
+    graph.activate()
+    return graph
+
+
+def build_workflow(latency: MockLatency, max_concurrency: int) -> Callable[[str], Awaitable[Any]]:
+    """Flujo VPC -> Terraform -> pipeline sobre los especialistas; sin memorización para medir cada tarea."""
+    from orchestrator.workflow import Workflow, WorkflowExecutor, create_vpc_delivery_workflow
+
+    graph = build_star(latency)
+    workflow = Workflow.from_dict(create_vpc_delivery_workflow())
+    executor = WorkflowExecutor(graph, max_concurrency=max_concurrency, memo_size=0)
+    return lambda query: executor.arun(workflow, query)
+
+
+def build_handle_request(latency: MockLatency) -> Callable[[str], str]:
+    """handle_request con el coordinador compartido y los pools de especialistas usando el modelo simulado."""
+    import agents.coordinator.agent as coordinator_module
+    from strands.handlers.callback_handler import null_callback_handler
+
+    coordinator = coordinator_module.get_coordinator_agent()
+    coordinator.model = ScriptedModel("coordinator", latency)
+    coordinator.callback_handler = null_callback_handler
+
+    factories = _agent_factories()
+    for spec_id in coordinator_module.SPECIALIST_FACTORIES:
+        coordinator_module.SPECIALIST_FACTORIES[spec_id] = _mocked_factory(spec_id, factories[spec_id], latency)
+    # Los pools ya creados conservarían la factoría anterior
+    coordinator_module._specialist_pools.clear()
+    return coordinator_module.handle_request
+
+
+async def _replay(call: Callable[[str], Awaitable[Any]], queries: List[str],
+                  concurrency: int) -> Tuple[List[Tuple[float, float]], int, float]:
+    """
+    Reproduce las consultas con como mucho `concurrency` en curso.
+
+    Returns:
+        ([(latencia, sobrecarga)], errores, tiempo total)
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    samples: List[Tuple[float, float]] = []
+    errors = 0
+
+    async def one(query: str):
+        nonlocal errors
+        async with semaphore:
+            with model_ledger() as ledger:
+                started = time.perf_counter()
+                try:
+                    await call(query)
+                except Exception as e:
+                    errors += 1
+                    logging.getLogger(__name__).warning(f"Error en la consulta: {str(e)}")
+                latency = time.perf_counter() - started
+            samples.append((latency, max(0.0, latency - covered_time(ledger))))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(query) for query in queries))
+    return samples, errors, time.perf_counter() - started
+
+
+def _percentile(values: List[float], quantile: float) -> float:
+    """Percentil por el método del rango más cercano."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(quantile * len(ordered)) - 1)] if ordered else 0.0
+
+
+def run_scenario(name: str, call: Callable[[str], Awaitable[Any]], queries: List[str],
+                 concurrency: int, measure_memory: bool) -> Dict[str, Any]:
+    """Pasada de tiempos y, opcionalmente, pasada de memoria sobre las mismas consultas."""
+    samples, errors, wall = asyncio.run(_replay(call, queries, concurrency))
+    latencies = [latency for latency, _ in samples]
+    overheads = [overhead for _, overhead in samples]
+
+    result = {
+        "scenario": name,
+        "concurrency": concurrency,
+        "queries": len(queries),
+        "errors": errors,
+        "wall_s": round(wall, 3),
+        "throughput_qps": round(len(queries) / wall, 2) if wall else 0.0,
+        "latency_ms": {f"p{int(q * 100)}": round(_percentile(latencies, q) * 1000, 1) for q in (0.5, 0.95, 0.99)},
+        "overhead_ms": {
+            "mean": round(statistics.mean(overheads) * 1000, 2) if overheads else 0.0,
+            **{f"p{int(q * 100)}": round(_percentile(overheads, q) * 1000, 2) for q in (0.5, 0.95, 0.99)}
+        },
+        "overhead_pct": round(sum(overheads) / sum(latencies) * 100, 2) if sum(latencies) else 0.0
+    }
+
+    if measure_memory:
+        # Segunda pasada con tracemalloc (que ralentiza) solo para medir el crecimiento
+        gc.collect()
+        tracemalloc.start()
+        baseline, _ = tracemalloc.get_traced_memory()
+        asyncio.run(_replay(call, queries, concurrency))
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["memory"] = {
+            "growth_kb": round((current - baseline) / 1024, 1),
+            "growth_per_query_kb": round((current - baseline) / 1024 / max(1, len(queries)), 2),
+            "peak_kb": round((peak - baseline) / 1024, 1)
+        }
+
+    return result
+
+
+def _print_result(result: Dict[str, Any]):
+    latency, overhead = result["latency_ms"], result["overhead_ms"]
+    # Sin la pasada de memoria (--no-memory) la columna queda en "-"
+    memory = result.get("memory")
+    growth = f"{memory['growth_per_query_kb']:.1f}" if memory else "-"
+    print(f"{result['scenario']:<16}{result['concurrency']:>5}{result['queries']:>6}{result['errors']:>5}"
+          f"{result['throughput_qps']:>9.2f}{latency['p50']:>9.0f}{latency['p95']:>9.0f}{latency['p99']:>9.0f}"
+          f"{overhead['p50']:>10.1f}{overhead['p95']:>10.1f}{result['overhead_pct']:>8.1f}%"
+          f"{growth:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trace", help="Traza de consultas (JSON Lines o texto, una por línea)")
+    parser.add_argument("--limit", type=int, default=0, help="Máximo de consultas de la traza (0 = todas)")
+    parser.add_argument("--repeat", type=int, default=1, help="Veces que se reproduce la traza")
+    parser.add_argument("--scenarios", nargs="+", default=["star", "hierarchical", "handle_request"],
+                        choices=["star", "hierarchical", "handle_request", "workflow", "workflow_serial"],
+                        help="Escenarios a medir")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4],
+                        help="Consultas en curso a la vez (handle_request siempre usa 1)")
+    parser.add_argument("--first-token", type=float, default=0.1, help="Latencia simulada hasta el primer token (s)")
+    parser.add_argument("--per-token", type=float, default=0.002, help="Latencia simulada por token (s)")
+    parser.add_argument("--tokens", type=int, default=150, help="Tokens de cada respuesta simulada")
+    parser.add_argument("--no-memory", action="store_true", help="No hacer la pasada de memoria")
+    parser.add_argument("--json", help="Guardar los resultados en este fichero JSON")
+    parser.add_argument("--log-level", default="WARNING", help="Nivel de logging durante el benchmark")
+    args = parser.parse_args()
+
+    from common.utils.helpers import setup_logging
+    setup_logging(args.log_level)
+
+    queries = load_queries(args.trace) if args.trace else list(SAMPLE_QUERIES)
+    if args.limit:
+        queries = queries[:args.limit]
+    if not queries:
+        sys.exit("La traza no contiene consultas")
+    queries = queries * max(1, args.repeat)
+
+    latency = MockLatency(args.first_token, args.per_token, args.tokens)
+    print(f"{len(queries)} consultas | modelo simulado: {args.first_token * 1000:.0f} ms primer token, "
+          f"{args.per_token * 1000:.1f} ms/token, {args.tokens} tokens\n")
+
+    builders = {
+        "star": lambda: build_star(latency),
+        "hierarchical": lambda: build_hierarchical(latency),
+    }
+
+    results = []
+    print(f"{'escenario':<16}{'conc':>5}{'cons':>6}{'err':>5}{'cons/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'sobr p50':>10}{'sobr p95':>10}{'sobr %':>9}{'KB/consulta':>12}")
+
+    for scenario in args.scenarios:
+        if scenario == "handle_request":
+            handle_request = build_handle_request(latency)
+            call = lambda query: asyncio.to_thread(handle_request, query)
+            levels = [1]
+        elif scenario in ("workflow", "workflow_serial"):
+            from config.settings import WORKFLOW_MAX_CONCURRENCY
+
+            call = build_workflow(latency, 1 if scenario == "workflow_serial" else WORKFLOW_MAX_CONCURRENCY)
+            levels = args.concurrency
+        else:
+            from orchestrator.agent_graph import aexecute_workflow
+
+            graph = builders[scenario]()
+            call = lambda query, graph=graph: aexecute_workflow(graph, query)
+            levels = args.concurrency
+
+        # Calentamiento: materializa los especialistas que se construyen en el primer uso
+        asyncio.run(_replay(call, list(dict.fromkeys(queries)), 1))
+
+        for concurrency in levels:
+            result = run_scenario(scenario, call, queries, concurrency, not args.no_memory)
+            results.append(result)
+            _print_result(result)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados guardados en {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Modelo simulado, determinista y sin red para benchmarks del grafo de agentes.
+
+ScriptedModel implementa la interfaz Model de Strands y responde según el rol
+del agente:
+
+- Si el agente tiene herramientas de especialistas (`<id>_tool`), en el primer
+  turno las invoca según las palabras clave de la consulta (en paralelo con
+  parallel_specialists_tool si hay varias) y en el segundo sintetiza.
+- Si no, responde con texto; el coordinador sin herramientas (handle_request)
+  nombra al especialista elegido ("networking expert", ...).
+
+La latencia simulada es `first_token + tokens * per_token` y el texto se emite
+en fragmentos como un stream real. Cada espera simulada se anota en el registro
+de la consulta activa (ver `model_ledger`) para separar el tiempo de modelo de
+la sobrecarga de orquestación.
+"""
+import asyncio
+import contextvars
+import json
+import time
+import uuid
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from strands.models.model import Model
+
+# Palabras clave con las que el coordinador simulado elige especialistas
+SPECIALIST_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "aws_expert": ("aws", "ec2", "s3", "lambda", "rds", "iam", "coste", "cost", "bedrock", "cloud"),
+    "networking": ("vpc", "subnet", "subred", "red", "network", "nat", "dns", "cidr", "gateway", "route"),
+    "cicd": ("pipeline", "ci/cd", "cicd", "github", "deploy", "despliegue", "build", "actions"),
+    "iac": ("terraform", "cloudformation", "iac", "cdk", "módulo", "module", "stack"),
+    "kubernetes": ("kubernetes", "k8s", "eks", "pod", "helm", "cluster", "contenedor", "container"),
+}
+
+# Nombre con el que handle_request reconoce a cada especialista en el plan del coordinador
+SPECIALIST_NAMES = {
+    "aws_expert": "aws expert",
+    "networking": "networking expert",
+    "cicd": "ci/cd expert",
+    "iac": "iac expert",
+    "kubernetes": "kubernetes expert",
+}
+
+FAN_OUT_TOOL = "parallel_specialists_tool"
+
+# Registro de llamadas al modelo de la consulta que se está reproduciendo
+_ledger: contextvars.ContextVar[Optional[List[Tuple[float, float]]]] = contextvars.ContextVar(
+    "model_ledger", default=None
+)
+
+
+@contextmanager
+def model_ledger() -> Iterator[List[Tuple[float, float]]]:
+    """
+    Recoge los intervalos (inicio, fin) de las llamadas simuladas al modelo del bloque.
+
+    El registro viaja en el contexto, así que incluye las llamadas de los
+    especialistas ejecutadas en otros hilos o tareas.
+    """
+    ledger: List[Tuple[float, float]] = []
+    token = _ledger.set(ledger)
+    try:
+        yield ledger
+    finally:
+        _ledger.reset(token)
+
+
+def covered_time(intervals: List[Tuple[float, float]]) -> float:
+    """Tiempo cubierto por la unión de los intervalos (llamadas en paralelo cuentan una vez)."""
+    total = 0.0
+    current_start = current_end = None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+async def _simulate(seconds: float):
+    """Espera la latencia simulada y la anota en el registro de la consulta activa."""
+    started = time.perf_counter()
+    await asyncio.sleep(seconds)
+    ledger = _ledger.get()
+    if ledger is not None:
+        ledger.append((started, time.perf_counter()))
+
+
+def choose_specialists(query: str, available: List[str], max_specialists: int = 3) -> List[str]:
+    """Especialistas cuyas palabras clave aparecen en la consulta (al menos uno, elegido por hash)."""
+    text = query.lower()
+    scored = []
+    for spec_id in available:
+        hits = sum(1 for keyword in SPECIALIST_KEYWORDS.get(spec_id, ()) if keyword in text)
+        if hits:
+            scored.append((-hits, available.index(spec_id), spec_id))
+    chosen = [spec_id for _, _, spec_id in sorted(scored)[:max_specialists]]
+    if not chosen and available:
+        chosen = [available[zlib.crc32(text.encode("utf-8")) % len(available)]]
+    return chosen
+
+
+@dataclass
+class MockLatency:
+    """Latencia simulada de una llamada al modelo."""
+    first_token: float = 0.3
+    per_token: float = 0.01
+    response_tokens: int = 150
+    chunk_tokens: int = 25
+
+
+class ScriptedModel(Model):
+    """Proveedor de modelo simulado y determinista (ver docstring del módulo)."""
+
+    def __init__(self, role: str, latency: Optional[MockLatency] = None):
+        self.role = role
+        self.latency = latency or MockLatency()
+        self.config: Dict[str, Any] = {"model_id": f"mock-{role}"}
+        self.calls = 0
+
+    def update_config(self, **model_config: Any) -> None:
+        self.config.update(model_config)
+
+    def get_config(self) -> Dict[str, Any]:
+        return self.config
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        raise NotImplementedError("ScriptedModel no implementa structured_output")
+        yield  # hace del método un generador asíncrono, como exige la interfaz
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        self.calls += 1
+        tool_names = [spec["name"] for spec in tool_specs or []]
+        tool_calls, text = self._script(messages, tool_names)
+        output_tokens = self.latency.response_tokens if text else 20
+        input_tokens = sum(len(json.dumps(message.get("content", ""), default=str)) for message in messages) // 4
+
+        started = time.perf_counter()
+        yield {"messageStart": {"role": "assistant"}}
+        await _simulate(self.latency.first_token)
+
+        if text:
+            words = text.split(" ")
+            step = max(1, self.latency.chunk_tokens)
+            yield {"contentBlockStart": {"start": {}}}
+            for i in range(0, len(words), step):
+                chunk = " ".join(words[i:i + step]) + (" " if i + step < len(words) else "")
+                await _simulate(len(words[i:i + step]) * self.latency.per_token)
+                yield {"contentBlockDelta": {"delta": {"text": chunk}}}
+            yield {"contentBlockStop": {}}
+            stop_reason = "end_turn"
+        else:
+            await _simulate(output_tokens * self.latency.per_token)
+            for name, tool_input in tool_calls:
+                tool_use_id = f"tooluse_{uuid.uuid4().hex[:16]}"
+                yield {"contentBlockStart": {"start": {"toolUse": {"toolUseId": tool_use_id, "name": name}}}}
+                yield {"contentBlockDelta": {"delta": {"toolUse": {"input": json.dumps(tool_input)}}}}
+                yield {"contentBlockStop": {}}
+            stop_reason = "tool_use"
+
+        yield {"messageStop": {"stopReason": stop_reason}}
+        yield {"metadata": {
+            "usage": {"inputTokens": input_tokens, "outputTokens": output_tokens,
+                      "totalTokens": input_tokens + output_tokens},
+            "metrics": {"latencyMs": int((time.perf_counter() - started) * 1000)}
+        }}
+
+    def _script(self, messages: List[Dict[str, Any]], tool_names: List[str]) -> Tuple[List[Tuple[str, Dict]], str]:
+        """Decide la respuesta: (llamadas a herramientas, texto)."""
+        last = messages[-1] if messages else {"content": []}
+        is_tool_result = any("toolResult" in block for block in last.get("content", []))
+        query = _last_user_text(messages)
+        specialists = [name[:-len("_tool")] for name in tool_names
+                       if name.endswith("_tool") and name != FAN_OUT_TOOL]
+
+        if specialists and not is_tool_result:
+            chosen = choose_specialists(query, specialists)
+            if len(chosen) > 1 and FAN_OUT_TOOL in tool_names:
+                return [(FAN_OUT_TOOL, {"queries": {spec_id: query for spec_id in chosen}})], ""
+            return [(f"{spec_id}_tool", {"query": query}) for spec_id in chosen], ""
+
+        if self.role == "coordinator" and not specialists:
+            chosen = choose_specialists(query, list(SPECIALIST_NAMES), max_specialists=1)
+            return [], self._filler(f"Plan: esta consulta corresponde al {SPECIALIST_NAMES[chosen[0]]}.")
+
+        prefix = "Síntesis final" if is_tool_result else f"Respuesta de {self.role}"
+        return [], self._filler(f"{prefix} para: {query[:80]}")
+
+    def _filler(self, head: str) -> str:
+        """Texto de `response_tokens` palabras (una palabra ≈ un token)."""
+        words = head.split(" ")
+        filler = max(0, self.latency.response_tokens - len(words))
+        return " ".join(words + [f"w{i % 97}" for i in range(filler)])
+
+
+def _last_user_text(messages: List[Dict[str, Any]]) -> str:
+    """Texto del último mensaje de usuario que no es un resultado de herramienta."""
+    for message in reversed(messages):
+        if message.get("role") != "user":
+            continue
+        texts = [block["text"] for block in message.get("content", []) if "text" in block]
+        if texts:
+            return " ".join(texts).strip()
+    return ""
@@ -0,0 +1,121 @@
+"""
+Benchmark del tiempo de construcción del grafo de agentes y de cambio de topología.
+
+Mide, con los agentes reales (prompts, herramientas y hooks) y el modelo simulado
+de benchmarks/mock_model.py:
+
+- build: create_agent_graph completo (registro de nodos y topología estrella)
+- switch: cambio de topología que un servicio haría por solicitud, rotando entre
+  la estrella y las jerarquías de AWS y DevOps, con la caché de topologías
+  compiladas (TOPOLOGY_CACHE_SIZE) y sin ella (cada cambio reconstruye los
+  agentes y las herramientas de la topología)
+
+Uso:
+    python -m benchmarks.topology_build --rounds 20
+"""
+import argparse
+import json
+import statistics
+import time
+from typing import Any, Callable, Dict, List
+
+from benchmarks.graph_replay import _agent_factories, _mocked_factory, _percentile
+from benchmarks.mock_model import MockLatency
+
+
+def _factories(latency: MockLatency) -> Dict[str, Callable[[], Any]]:
+    return {agent_id: _mocked_factory(agent_id, factory, latency)
+            for agent_id, factory in _agent_factories().items()}
+
+
+def _topologies(specialist_ids: List[str]) -> List[tuple]:
+    from orchestrator.agent_graph import create_aws_architecture_hierarchy, create_devops_hierarchy
+
+    return [
+        ("star", {"coordinator": "coordinator", "specialists": specialist_ids}),
+        ("hierarchical", create_aws_architecture_hierarchy()),
+        ("hierarchical", create_devops_hierarchy()),
+    ]
+
+
+def _summary(name: str, samples: List[float]) -> Dict[str, Any]:
+    return {
+        "scenario": name,
+        "samples": len(samples),
+        "mean_ms": round(statistics.mean(samples) * 1000, 2),
+        "p50_ms": round(_percentile(samples, 0.5) * 1000, 2),
+        "p95_ms": round(_percentile(samples, 0.95) * 1000, 2),
+        "max_ms": round(max(samples) * 1000, 2)
+    }
+
+
+def measure_build(latency: MockLatency, repeat: int) -> List[float]:
+    """Tiempo de create_agent_graph (los especialistas se construyen en su primer uso)."""
+    from orchestrator.agent_graph import create_agent_graph
+
+    samples = []
+    for _ in range(repeat):
+        factories = _factories(latency)
+        started = time.perf_counter()
+        create_agent_graph(agent_factories=factories, use_pool=False)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def measure_switch(latency: MockLatency, rounds: int, cache_size: int) -> List[float]:
+    """Tiempo de cada cambio de topología rotando estrella -> jerarquía AWS -> jerarquía DevOps."""
+    from orchestrator.agent_graph import create_agent_graph
+
+    graph = create_agent_graph(agent_factories=_factories(latency), use_pool=False)
+    graph.topology_cache_size = cache_size
+    topologies = _topologies([node_id for node_id in graph.nodes if node_id != "coordinator"])
+
+    # Materializa los agentes una vez: solo se mide el trabajo propio del cambio
+    for topology_type, config in topologies:
+        graph.use_topology(topology_type, config)
+
+    samples = []
+    for _ in range(rounds):
+        for topology_type, config in topologies:
+            started = time.perf_counter()
+            graph.use_topology(topology_type, config)
+            samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20, help="Vueltas por las tres topologías")
+    parser.add_argument("--builds", type=int, default=5, help="Construcciones completas del grafo a medir")
+    parser.add_argument("--json", help="Guardar los resultados en este fichero JSON")
+    parser.add_argument("--log-level", default="WARNING", help="Nivel de logging durante el benchmark")
+    args = parser.parse_args()
+
+    from common.utils.helpers import setup_logging
+    from config.settings import TOPOLOGY_CACHE_SIZE
+    setup_logging(args.log_level)
+
+    latency = MockLatency(0.0, 0.0, 1)
+
+    # Calentamiento: importaciones de agentes y herramientas
+    measure_build(latency, 1)
+
+    results = [
+        _summary("build", measure_build(latency, args.builds)),
+        _summary("switch_cached", measure_switch(latency, args.rounds, max(1, TOPOLOGY_CACHE_SIZE))),
+        _summary("switch_uncached", measure_switch(latency, args.rounds, 0)),
+    ]
+
+    print(f"{'escenario':<18}{'muestras':>9}{'media ms':>10}{'p50 ms':>9}{'p95 ms':>9}{'máx ms':>9}")
+    for result in results:
+        print(f"{result['scenario']:<18}{result['samples']:>9}{result['mean_ms']:>10.2f}{result['p50_ms']:>9.2f}"
+              f"{result['p95_ms']:>9.2f}{result['max_ms']:>9.2f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados guardados en {args.json}")
+
+
+if __name__ == "__main__":
+    main()
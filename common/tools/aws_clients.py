@@ -0,0 +1,181 @@
+"""
+Caché compartida de sesiones y clientes boto3 para las herramientas AWS.
+Evita resolver credenciales, cargar endpoints y abrir conexiones en cada llamada.
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from config.settings import (
+    AWS_CLIENT_CONNECT_TIMEOUT,
+    AWS_CLIENT_MAX_AGE,
+    AWS_CLIENT_MAX_POOL_CONNECTIONS,
+    AWS_CLIENT_READ_TIMEOUT,
+)
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Códigos de error de AWS que indican credenciales caducadas
+EXPIRED_CREDENTIAL_ERRORS = frozenset({
+    "ExpiredToken",
+    "ExpiredTokenException",
+    "RequestExpired",
+    "InvalidClientTokenId",
+    "UnrecognizedClientException",
+})
+
+ClientKey = Tuple[str, Optional[str], Optional[str]]
+
+
+def is_expired_credentials_error(error: Exception) -> bool:
+    """Indica si un error de AWS se debe a credenciales caducadas o inválidas."""
+    if not isinstance(error, ClientError):
+        return False
+    return error.response.get("Error", {}).get("Code") in EXPIRED_CREDENTIAL_ERRORS
+
+
+@dataclass
+class _SessionEntry:
+    """Sesión boto3 de un perfil con sus clientes ya creados."""
+    session: boto3.Session
+    created_at: float
+    clients: Dict[Tuple[str, Optional[str]], Any] = field(default_factory=dict)
+    # boto3.Session no es thread-safe al crear clientes; los clientes sí lo son
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+
+class AWSClientPool:
+    """
+    Caché thread-safe de clientes boto3 por (servicio, región, perfil).
+
+    - Una sesión por perfil: las credenciales se resuelven una sola vez y las
+      credenciales renovables (roles, SSO, IMDS) se refrescan solas
+    - Los clientes comparten un pool HTTP de hasta max_pool_connections conexiones
+    - Las sesiones se recrean pasados max_age segundos o al detectar
+      credenciales caducadas (ver `call`)
+    """
+
+    def __init__(self, max_pool_connections: int = 10, max_age: float = 3600.0,
+                 connect_timeout: float = 10.0, read_timeout: float = 60.0):
+        self.max_age = max_age
+        self.config = Config(
+            max_pool_connections=max_pool_connections,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            retries={"mode": "standard"}
+        )
+
+        self._sessions: Dict[Optional[str], _SessionEntry] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def get_client(self, service: str, region: Optional[str] = None, profile: Optional[str] = None) -> Any:
+        """Obtiene (o crea) el cliente de un servicio para una región y perfil."""
+        entry = self._get_session_entry(profile)
+        client_key = (service, region)
+
+        client = entry.clients.get(client_key)
+        if client is not None:
+            self.hits += 1
+            return client
+
+        with entry.lock:
+            client = entry.clients.get(client_key)
+            if client is None:
+                self.misses += 1
+                client = entry.session.client(service, region_name=region, config=self.config)
+                entry.clients[client_key] = client
+                logger.debug(f"Cliente boto3 creado: {service} ({region or 'región por defecto'})")
+            else:
+                self.hits += 1
+        return client
+
+    def call(self, service: str, operation: Callable[[Any], T], region: Optional[str] = None,
+             profile: Optional[str] = None) -> T:
+        """
+        Ejecuta `operation(client)` reintentando una vez con una sesión nueva si
+        las credenciales han caducado.
+        """
+        client = self.get_client(service, region, profile)
+        try:
+            return operation(client)
+        except ClientError as e:
+            if not is_expired_credentials_error(e):
+                raise
+            logger.info(f"Credenciales caducadas para el perfil '{profile or 'default'}', renovando sesión")
+            self.invalidate(profile)
+            return operation(self.get_client(service, region, profile))
+
+    def invalidate(self, profile: Optional[str] = None):
+        """Descarta la sesión de un perfil y todos sus clientes."""
+        with self._lock:
+            if self._sessions.pop(profile, None) is not None:
+                self.refreshes += 1
+
+    def clear(self):
+        """Descarta todas las sesiones y clientes."""
+        with self._lock:
+            self._sessions.clear()
+
+    def stats(self) -> Dict:
+        """Obtiene el estado de la caché."""
+        with self._lock:
+            clients = sum(len(entry.clients) for entry in self._sessions.values())
+            return {
+                "sessions": len(self._sessions),
+                "clients": clients,
+                "hits": self.hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+                "max_pool_connections": self.config.max_pool_connections
+            }
+
+    def _get_session_entry(self, profile: Optional[str]) -> _SessionEntry:
+        """Devuelve la sesión vigente de un perfil, recreándola si ha superado max_age."""
+        with self._lock:
+            entry = self._sessions.get(profile)
+            now = time.monotonic()
+            if entry is not None and now - entry.created_at <= self.max_age:
+                return entry
+
+            if entry is not None:
+                self.refreshes += 1
+            entry = _SessionEntry(boto3.Session(profile_name=profile), now)
+            self._sessions[profile] = entry
+            return entry
+
+
+_default_pool: Optional[AWSClientPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_client_pool() -> AWSClientPool:
+    """Devuelve la caché de clientes compartida por todas las herramientas."""
+    global _default_pool
+    if _default_pool is None:
+        with _default_pool_lock:
+            if _default_pool is None:
+                _default_pool = AWSClientPool(
+                    max_pool_connections=AWS_CLIENT_MAX_POOL_CONNECTIONS,
+                    max_age=AWS_CLIENT_MAX_AGE,
+                    connect_timeout=AWS_CLIENT_CONNECT_TIMEOUT,
+                    read_timeout=AWS_CLIENT_READ_TIMEOUT
+                )
+    return _default_pool
+
+
+def get_aws_client(service: str, region: Optional[str] = None, profile: Optional[str] = None) -> Any:
+    """Atajo para obtener un cliente de la caché compartida."""
+    return get_client_pool().get_client(service, region, profile)
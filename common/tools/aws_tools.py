@@ -2,141 +2,317 @@
 Herramientas personalizadas para interactuar con AWS.
 """
 from strands import tool
-import boto3
+import datetime
 import json
+import os
+from collections import Counter
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from common.tools.aws_clients import get_client_pool
+from common.tools.cost_store import GRANULARITY_DAILY, days_between, get_cost_store
+from common.tools.cost_summary import CostMatrix, summarize_costs, to_budgeted_json
+from config.settings import COST_SUMMARY_MAX_CHARS
+
+# Valor por defecto de max_items en list_aws_resources
+DEFAULT_MAX_ITEMS = 50
+
+
+@dataclass(frozen=True)
+class ResourceSpec:
+    """Cómo listar y proyectar un tipo de recurso AWS."""
+    method: str
+    # Ruta hasta los elementos en cada página; varios niveles se aplanan (Reservations -> Instances)
+    items_path: Tuple[str, ...]
+    # Campo proyectado -> ruta con puntos en el elemento original ("tag:Name" lee la etiqueta Name)
+    fields: Dict[str, str]
+    # Campos proyectados por los que se agrupa en modo resumen
+    summary_fields: Tuple[str, ...] = ()
+    # Si la API acepta Filters=[{"Name": ..., "Values": [...]}] (filtrado en servidor)
+    server_filters: bool = False
+    # Los recursos globales (ej. buckets S3) se listan igual desde cualquier región
+    regional: bool = True
+
+
+RESOURCE_SPECS: Dict[str, Dict[str, ResourceSpec]] = {
+    "ec2": {
+        "instances": ResourceSpec(
+            "describe_instances", ("Reservations", "Instances"),
+            {"id": "InstanceId", "name": "tag:Name", "type": "InstanceType", "state": "State.Name",
+             "az": "Placement.AvailabilityZone", "private_ip": "PrivateIpAddress",
+             "public_ip": "PublicIpAddress", "launch_time": "LaunchTime"},
+            summary_fields=("state", "type", "az"), server_filters=True
+        ),
+        "security_groups": ResourceSpec(
+            "describe_security_groups", ("SecurityGroups",),
+            {"id": "GroupId", "name": "GroupName", "vpc_id": "VpcId", "description": "Description"},
+            summary_fields=("vpc_id",), server_filters=True
+        ),
+        "vpcs": ResourceSpec(
+            "describe_vpcs", ("Vpcs",),
+            {"id": "VpcId", "name": "tag:Name", "cidr": "CidrBlock", "state": "State", "is_default": "IsDefault"},
+            summary_fields=("state", "is_default"), server_filters=True
+        ),
+        "subnets": ResourceSpec(
+            "describe_subnets", ("Subnets",),
+            {"id": "SubnetId", "name": "tag:Name", "vpc_id": "VpcId", "cidr": "CidrBlock",
+             "az": "AvailabilityZone", "available_ips": "AvailableIpAddressCount"},
+            summary_fields=("vpc_id", "az"), server_filters=True
+        ),
+    },
+    "s3": {
+        "buckets": ResourceSpec(
+            "list_buckets", ("Buckets",),
+            {"name": "Name", "creation_date": "CreationDate", "region": "BucketRegion"},
+            summary_fields=("region",), regional=False
+        ),
+    },
+    "lambda": {
+        "functions": ResourceSpec(
+            "list_functions", ("Functions",),
+            {"name": "FunctionName", "runtime": "Runtime", "memory": "MemorySize", "timeout": "Timeout",
+             "last_modified": "LastModified", "code_size": "CodeSize"},
+            summary_fields=("runtime", "memory")
+        ),
+    },
+    "rds": {
+        "instances": ResourceSpec(
+            "describe_db_instances", ("DBInstances",),
+            {"id": "DBInstanceIdentifier", "engine": "Engine", "engine_version": "EngineVersion",
+             "class": "DBInstanceClass", "status": "DBInstanceStatus", "multi_az": "MultiAZ",
+             "storage_gb": "AllocatedStorage"},
+            summary_fields=("status", "engine", "class"), server_filters=True
+        ),
+    },
+}
+
+
+def _lookup(item: Dict, path: str) -> Any:
+    """Obtiene un valor por ruta con puntos; "tag:Clave" lee una etiqueta."""
+    if path.startswith("tag:"):
+        key = path[4:]
+        return next((tag.get("Value") for tag in item.get("Tags", []) if tag.get("Key") == key), None)
+
+    value: Any = item
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def project_resource(item: Dict, spec: ResourceSpec, fields: Optional[List[str]] = None) -> Dict:
+    """
+    Proyecta un elemento de la API a un registro compacto.
+    
+    Los campos que no están en la especificación se interpretan como rutas con
+    puntos sobre el elemento original. Los valores vacíos se omiten.
+    """
+    selected = fields or list(spec.fields)
+    record = {}
+    for name in selected:
+        value = _lookup(item, spec.fields.get(name, name))
+        if value is not None and value != "":
+            record[name] = value
+    return record
+
+
+def _iter_items(page: Dict, path: Tuple[str, ...]) -> Iterator[Dict]:
+    """Recorre (aplanando) los elementos de una página de resultados."""
+    items = page.get(path[0], [])
+    if len(path) == 1:
+        yield from items
+        return
+    for item in items:
+        yield from _iter_items(item, path[1:])
+
+
+def matches_filters(record: Dict, filters: Dict[str, List[str]]) -> bool:
+    """Filtro en cliente sobre los campos proyectados (igualdad sin distinguir mayúsculas)."""
+    for name, values in filters.items():
+        value = str(record.get(name, "")).lower()
+        if value not in (str(v).lower() for v in values):
+            return False
+    return True
+
+
+def iter_resources(client, spec: ResourceSpec, filters: Optional[Dict[str, Any]] = None,
+                   page_size: Optional[int] = None,
+                   throttle: Optional[Callable[[], None]] = None) -> Iterator[Dict]:
+    """
+    Recorre todas las páginas de un listado devolviendo los elementos originales.
+    
+    Con server_filters los filtros se envían a la API (nombres de filtro de AWS,
+    ej. "instance-state-name"); en otro caso se devuelven sin filtrar y el
+    llamante filtra sobre los registros proyectados. Si se indica `throttle`,
+    se invoca antes de pedir cada página (limitación de tasa).
+    """
+    kwargs: Dict[str, Any] = {}
+    if filters and spec.server_filters:
+        kwargs["Filters"] = [{"Name": name, "Values": values} for name, values in filters.items()]
+
+    if not client.can_paginate(spec.method):
+        if throttle:
+            throttle()
+        yield from _iter_items(getattr(client, spec.method)(**kwargs), spec.items_path)
+        return
+
+    if page_size:
+        kwargs["PaginationConfig"] = {"PageSize": page_size}
+    pages = iter(client.get_paginator(spec.method).paginate(**kwargs))
+    while True:
+        if throttle:
+            throttle()
+        page = next(pages, None)
+        if page is None:
+            return
+        yield from _iter_items(page, spec.items_path)
+
+
+def normalize_filters(filters: Optional[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """Acepta valores sueltos o listas en los filtros."""
+    return {
+        name: [str(v) for v in (values if isinstance(values, list) else [values])]
+        for name, values in (filters or {}).items()
+    }
+
 
 @tool
-def list_aws_resources(service: str, resource_type: str, region: str = "us-west-2") -> str:
+def list_aws_resources(service: str, resource_type: str, region: str = "us-west-2",
+                       filters: Optional[Dict[str, Any]] = None, max_items: int = DEFAULT_MAX_ITEMS,
+                       fields: Optional[List[str]] = None, summary: bool = False) -> str:
     """
-    Lista recursos AWS de un tipo específico.
+    Lista recursos AWS de un tipo específico recorriendo todas las páginas.
+    
+    Devuelve registros compactos; con summary=True devuelve solo conteos por
+    estado/tipo, de modo que la salida es pequeña sea cual sea el tamaño de la cuenta.
     
     Args:
-        service (str): Servicio AWS (ej. "ec2", "s3", "lambda")
+        service (str): Servicio AWS (ej. "ec2", "s3", "lambda", "rds")
         resource_type (str): Tipo de recurso a listar (ej. "instances", "buckets", "functions")
         region (str): Región AWS (por defecto "us-west-2")
+        filters (dict, optional): Filtros. En EC2 y RDS se aplican en el servidor con los nombres
+            de filtro de AWS (ej. {"instance-state-name": ["running"]}); en el resto se comparan
+            con los campos proyectados (ej. {"runtime": "python3.12"})
+        max_items (int): Máximo de registros devueltos (por defecto 50)
+        fields (list, optional): Campos a devolver (ej. ["id", "state"]); admite rutas con
+            puntos del objeto original
+        summary (bool): Devolver solo el total y los conteos agrupados
         
     Returns:
-        str: Lista de recursos en formato JSON
+        str: Recursos o resumen en formato JSON compacto
     """
     try:
-        session = boto3.Session(region_name=region)
-        client = session.client(service)
-        
-        # Mapeo de servicios y métodos para listar recursos
-        resource_methods = {
-            "ec2": {
-                "instances": "describe_instances",
-                "security_groups": "describe_security_groups",
-                "vpcs": "describe_vpcs",
-                "subnets": "describe_subnets"
-            },
-            "s3": {
-                "buckets": "list_buckets"
-            },
-            "lambda": {
-                "functions": "list_functions"
-            },
-            "rds": {
-                "instances": "describe_db_instances"
-            }
-        }
-        
-        if service not in resource_methods or resource_type not in resource_methods[service]:
+        spec = RESOURCE_SPECS.get(service, {}).get(resource_type)
+        if spec is None:
             return f"Error: Combinación de servicio '{service}' y tipo de recurso '{resource_type}' no soportada."
         
-        method_name = resource_methods[service][resource_type]
-        method = getattr(client, method_name)
-        response = method()
+        normalized_filters = normalize_filters(filters)
+        client_filters = {} if spec.server_filters else normalized_filters
+        max_items = max(1, max_items)
         
-        # Simplificar la respuesta para hacerla más legible
-        simplified = {"resources": []}
+        def collect(client) -> Dict:
+            total = 0
+            kept: List[Dict] = []
+            # Conteos incrementales: el modo resumen no retiene los registros
+            counters = {name: Counter() for name in spec.summary_fields}
+            for item in iter_resources(client, spec, normalized_filters):
+                record = project_resource(item, spec)
+                if client_filters and not matches_filters(record, client_filters):
+                    continue
+                total += 1
+                if summary:
+                    for name, counter in counters.items():
+                        counter[str(record.get(name, "N/A"))] += 1
+                elif len(kept) < max_items:
+                    kept.append(project_resource(item, spec, fields) if fields else record)
+                else:
+                    # No hace falta seguir paginando: basta con saber que hay más
+                    break
+            
+            result = {"service": service, "resource_type": resource_type, "region": region}
+            if summary:
+                result["total"] = total
+                result.update({f"by_{name}": dict(counter.most_common(10)) for name, counter in counters.items()})
+            else:
+                result["count"] = len(kept)
+                result["truncated"] = total > len(kept)
+                result["resources"] = kept
+            return result
         
-        if service == "ec2" and resource_type == "instances":
-            for reservation in response.get("Reservations", []):
-                for instance in reservation.get("Instances", []):
-                    simplified["resources"].append({
-                        "id": instance.get("InstanceId"),
-                        "type": instance.get("InstanceType"),
-                        "state": instance.get("State", {}).get("Name"),
-                        "private_ip": instance.get("PrivateIpAddress", "N/A"),
-                        "public_ip": instance.get("PublicIpAddress", "N/A")
-                    })
-        elif service == "s3" and resource_type == "buckets":
-            for bucket in response.get("Buckets", []):
-                simplified["resources"].append({
-                    "name": bucket.get("Name"),
-                    "creation_date": bucket.get("CreationDate").isoformat() if bucket.get("CreationDate") else "N/A"
-                })
-        else:
-            # Respuesta genérica para otros tipos de recursos
-            simplified = response
-        
-        return json.dumps(simplified, indent=2, default=str)
+        result = get_client_pool().call(service, collect, region)
+        return json.dumps(result, separators=(",", ":"), default=str)
     except Exception as e:
         return f"Error al listar recursos: {str(e)}"
 
+def _fetch_daily_costs(region: str, start: str, end: str) -> List[Dict[str, Any]]:
+    """Pide a Cost Explorer los costes diarios por servicio de [start, end), con todas sus páginas."""
+    def get_cost_and_usage(client) -> List[Dict[str, Any]]:
+        results: List[Dict[str, Any]] = []
+        kwargs: Dict[str, Any] = {
+            "TimePeriod": {"Start": start, "End": end},
+            "Granularity": GRANULARITY_DAILY,
+            "Metrics": ["BlendedCost", "UsageQuantity"],
+            "GroupBy": [{"Type": "DIMENSION", "Key": "SERVICE"}]
+        }
+        while True:
+            response = client.get_cost_and_usage(**kwargs)
+            results.extend(response.get("ResultsByTime", []))
+            token = response.get("NextPageToken")
+            if not token:
+                return results
+            kwargs["NextPageToken"] = token
+    
+    return get_client_pool().call("ce", get_cost_and_usage, region)
+
+
 @tool
-def analyze_aws_costs(service: str = None, period: str = "MONTHLY", region: str = "us-west-2") -> str:
+def analyze_aws_costs(service: str = None, period: str = "MONTHLY", region: str = "us-west-2",
+                      top_n: int = 5, output_mode: str = "summary") -> str:
     """
     Analiza los costos de AWS para un servicio específico o todos los servicios.
     
+    Los costes diarios se guardan en un almacén local: solo se consultan a Cost
+    Explorer los días que faltan o que aún se están consolidando. La respuesta es
+    un resumen (totales, top-N, tendencia y anomalías) de tamaño acotado.
+    
     Args:
-        service (str, optional): Servicio AWS específico (ej. "EC2", "S3")
+        service (str, optional): Servicio AWS específico (ej. "EC2", "S3"); se busca
+            dentro del nombre del servicio de Cost Explorer
         period (str): Período de tiempo ("DAILY", "WEEKLY", "MONTHLY")
         region (str): Región AWS (por defecto "us-west-2")
+        top_n (int): Número de servicios más costosos a incluir (por defecto 5)
+        output_mode (str): "summary" (por defecto) o "detailed", que añade la serie
+            diaria de cada servicio del top-N con un presupuesto de salida 3 veces mayor
         
     Returns:
         str: Análisis de costos en formato JSON
     """
     try:
-        session = boto3.Session(region_name=region)
-        client = session.client('ce')  # Cost Explorer
-        
-        # Configurar el período de tiempo
-        import datetime
-        end = datetime.datetime.now()
-        
-        if period == "DAILY":
-            start = end - datetime.timedelta(days=1)
-            granularity = "HOURLY"
-        elif period == "WEEKLY":
-            start = end - datetime.timedelta(days=7)
-            granularity = "DAILY"
-        else:  # MONTHLY
-            start = end - datetime.timedelta(days=30)
-            granularity = "DAILY"
+        # Configurar el período de tiempo (el día en curso aún no tiene costes completos)
+        end = datetime.date.today()
+        days = {"DAILY": 1, "WEEKLY": 7}.get(period, 30)
+        start = end - datetime.timedelta(days=days)
         
-        # Formatear fechas para la API
-        start_str = start.strftime('%Y-%m-%d')
-        end_str = end.strftime('%Y-%m-%d')
+        # Cada perfil de AWS tiene sus propios costes en el almacén
+        scope = os.getenv("AWS_PROFILE") or "default"
+        store = get_cost_store()
+        fetched_days = store.sync(scope, start, end, partial(_fetch_daily_costs, region))
         
-        # Configurar filtros
-        filters = {}
-        if service:
-            filters = {
-                "Dimensions": {
-                    "Key": "SERVICE",
-                    "Values": [service]
-                }
-            }
+        # Agregación por columnas sobre la matriz día × servicio del almacén local
+        matrix = CostMatrix.from_rows(days_between(start, end), store.daily_costs(scope, start, end, service))
+        detailed = output_mode == "detailed"
+        summary = summarize_costs(matrix, top_n, detailed=detailed)
         
-        # Hacer la solicitud a Cost Explorer
-        response = client.get_cost_and_usage(
-            TimePeriod={
-                'Start': start_str,
-                'End': end_str
-            },
-            Granularity=granularity,
-            Metrics=['BlendedCost', 'UsageQuantity'],
-            GroupBy=[
-                {
-                    'Type': 'DIMENSION',
-                    'Key': 'SERVICE'
-                }
-            ],
-            Filter=filters if service else {}
-        )
-        
-        return json.dumps(response, indent=2, default=str)
+        result = {
+            "period": period,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "service": service or "ALL",
+            **summary,
+            "source": {"days_fetched_from_api": fetched_days, "days_from_cache": days - fetched_days}
+        }
+        return to_budgeted_json(result, COST_SUMMARY_MAX_CHARS * (3 if detailed else 1))
     except Exception as e:
         return f"Error al analizar costos: {str(e)}"
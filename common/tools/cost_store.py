@@ -0,0 +1,198 @@
+"""
+Almacén local (SQLite) de costes diarios de Cost Explorer.
+Los días ya consolidados no cambian, así que solo se piden a la API los días
+que faltan o que todavía se están consolidando.
+"""
+import datetime
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from config.settings import COST_REFRESH_INTERVAL, COST_SETTLE_DAYS, COST_STORE_PATH
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+GRANULARITY_DAILY = "DAILY"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS costs (
+    scope TEXT NOT NULL,
+    day TEXT NOT NULL,
+    service TEXT NOT NULL,
+    granularity TEXT NOT NULL,
+    amount REAL NOT NULL,
+    usage_quantity REAL NOT NULL,
+    unit TEXT NOT NULL,
+    PRIMARY KEY (scope, day, service, granularity)
+);
+CREATE TABLE IF NOT EXISTS fetched_days (
+    scope TEXT NOT NULL,
+    day TEXT NOT NULL,
+    granularity TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    settled INTEGER NOT NULL,
+    PRIMARY KEY (scope, day, granularity)
+);
+"""
+
+# Función que consulta Cost Explorer para [start, end) y devuelve las páginas de ResultsByTime
+Fetcher = Callable[[str, str], List[Dict[str, Any]]]
+
+
+def days_between(start: datetime.date, end: datetime.date) -> List[str]:
+    """Días en formato ISO del intervalo [start, end)."""
+    return [(start + datetime.timedelta(days=i)).isoformat() for i in range((end - start).days)]
+
+
+def _contiguous_ranges(days: Sequence[str]) -> List[Tuple[str, str]]:
+    """Agrupa días ISO ordenados en intervalos contiguos [inicio, fin)."""
+    ranges: List[Tuple[str, str]] = []
+    for day in days:
+        date = datetime.date.fromisoformat(day)
+        if ranges and ranges[-1][1] == day:
+            ranges[-1] = (ranges[-1][0], (date + datetime.timedelta(days=1)).isoformat())
+        else:
+            ranges.append((day, (date + datetime.timedelta(days=1)).isoformat()))
+    return ranges
+
+
+class CostStore:
+    """
+    Costes diarios por servicio indexados por (ámbito, día, servicio, granularidad).
+
+    - `scope` separa cuentas/perfiles que comparten el mismo fichero
+    - Un día se considera consolidado cuando Cost Explorer ya no lo marca como
+      estimado y han pasado `settle_days` días; hasta entonces se vuelve a pedir
+      como mucho cada `refresh_interval` segundos
+    - `sync` pide a la API solo los días pendientes, agrupados en intervalos contiguos
+    """
+
+    def __init__(self, path: str, settle_days: int = 3, refresh_interval: float = 6 * 3600):
+        self.path = path
+        self.settle_days = settle_days
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(_SCHEMA)
+
+        self.api_calls = 0
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Conexión serializada entre hilos dentro de una transacción."""
+        with self._lock, self._connection:
+            yield self._connection
+
+    def pending_days(self, scope: str, start: datetime.date, end: datetime.date,
+                     granularity: str = GRANULARITY_DAILY) -> List[str]:
+        """Días del intervalo que faltan o que siguen consolidándose y hay que refrescar."""
+        with self._transaction() as connection:
+            rows = connection.execute(
+                "SELECT day, fetched_at, settled FROM fetched_days "
+                "WHERE scope = ? AND granularity = ? AND day >= ? AND day < ?",
+                (scope, granularity, start.isoformat(), end.isoformat())
+            ).fetchall()
+
+        fresh_after = time.time() - self.refresh_interval
+        known = {day for day, fetched_at, settled in rows if settled or fetched_at >= fresh_after}
+        return [day for day in days_between(start, end) if day not in known]
+
+    def sync(self, scope: str, start: datetime.date, end: datetime.date, fetcher: Fetcher,
+             granularity: str = GRANULARITY_DAILY) -> int:
+        """
+        Trae de la API los días pendientes del intervalo [start, end).
+
+        Returns:
+            int: Número de días pedidos a la API
+        """
+        pending = self.pending_days(scope, start, end, granularity)
+        if not pending:
+            return 0
+
+        settle_limit = (datetime.date.today() - datetime.timedelta(days=self.settle_days)).isoformat()
+
+        for range_start, range_end in _contiguous_ranges(pending):
+            results = fetcher(range_start, range_end)
+            self.api_calls += 1
+            self._store(scope, granularity, days_between(datetime.date.fromisoformat(range_start),
+                                                   datetime.date.fromisoformat(range_end)),
+                        results, settle_limit)
+
+        logger.info(f"Costes: {len(pending)} días sincronizados con Cost Explorer")
+        return len(pending)
+
+    def _store(self, scope: str, granularity: str, days: List[str],
+               results: List[Dict[str, Any]], settle_limit: str):
+        """Sustituye los costes de `days` por los resultados recibidos."""
+        now = time.time()
+        cost_rows = []
+        estimated_days = set()
+
+        for result in results:
+            day = result["TimePeriod"]["Start"][:10]
+            if result.get("Estimated"):
+                estimated_days.add(day)
+            for group in result.get("Groups", []):
+                metrics = group.get("Metrics", {})
+                cost = metrics.get("BlendedCost", {})
+                usage = metrics.get("UsageQuantity", {})
+                cost_rows.append((
+                    scope, day, group["Keys"][0], granularity,
+                    float(cost.get("Amount", 0)), float(usage.get("Amount", 0)), cost.get("Unit", "USD")
+                ))
+
+        fetched_rows = [
+            (scope, day, granularity, now, int(day < settle_limit and day not in estimated_days))
+            for day in days
+        ]
+
+        with self._transaction() as connection:
+            connection.executemany(
+                "DELETE FROM costs WHERE scope = ? AND day = ? AND granularity = ?",
+                [(scope, day, granularity) for day in days]
+            )
+            connection.executemany("INSERT OR REPLACE INTO costs VALUES (?, ?, ?, ?, ?, ?, ?)", cost_rows)
+            connection.executemany("INSERT OR REPLACE INTO fetched_days VALUES (?, ?, ?, ?, ?)", fetched_rows)
+
+    def daily_costs(self, scope: str, start: datetime.date, end: datetime.date,
+                    service: Optional[str] = None,
+                    granularity: str = GRANULARITY_DAILY) -> List[Tuple[str, str, float]]:
+        """Filas (día, servicio, importe) del intervalo, opcionalmente de los servicios que contienen `service`."""
+        query, params = self._where(scope, start, end, service, granularity)
+        with self._transaction() as connection:
+            return connection.execute(
+                f"SELECT day, service, amount FROM costs WHERE {query} ORDER BY day, service", params
+            ).fetchall()
+
+    @staticmethod
+    def _where(scope: str, start: datetime.date, end: datetime.date, service: Optional[str],
+               granularity: str) -> Tuple[str, List[Any]]:
+        """Condición SQL común; `service` se busca dentro del nombre sin distinguir mayúsculas."""
+        query = "scope = ? AND granularity = ? AND day >= ? AND day < ?"
+        params: List[Any] = [scope, granularity, start.isoformat(), end.isoformat()]
+        if service:
+            query += " AND LOWER(service) LIKE ?"
+            params.append(f"%{service.lower()}%")
+        return query, params
+
+
+_default_store: Optional[CostStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_cost_store() -> CostStore:
+    """Devuelve el almacén de costes compartido configurado en settings."""
+    global _default_store
+    if _default_store is None:
+        with _default_store_lock:
+            if _default_store is None:
+                _default_store = CostStore(COST_STORE_PATH, COST_SETTLE_DAYS, COST_REFRESH_INTERVAL)
+    return _default_store
@@ -0,0 +1,243 @@
+"""
+Resúmenes compactos de costes para los agentes.
+Agrega por columnas la matriz día × servicio y calcula totales, top-N,
+tendencias y anomalías antes de devolver nada al modelo.
+"""
+import json
+import statistics
+from array import array
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Escala de la MAD para aproximar la desviación típica de una normal
+_MAD_SCALE = 1.4826
+
+
+@dataclass
+class CostMatrix:
+    """Costes diarios por servicio en formato columnar (una columna de importes por servicio)."""
+    days: List[str]
+    columns: Dict[str, array]
+
+    @classmethod
+    def from_rows(cls, days: List[str], rows: Sequence[Tuple[str, str, float]]) -> "CostMatrix":
+        """Construye la matriz a partir de filas (día, servicio, importe)."""
+        index = {day: i for i, day in enumerate(days)}
+        columns: Dict[str, array] = {}
+        for day, service, amount in rows:
+            position = index.get(day)
+            if position is None:
+                continue
+            column = columns.get(service)
+            if column is None:
+                column = columns[service] = array("d", bytes(8 * len(days)))
+            column[position] += amount
+        return cls(days, columns)
+
+    def service_totals(self) -> Dict[str, float]:
+        """Coste acumulado de cada servicio."""
+        return {service: sum(column) for service, column in self.columns.items()}
+
+    def daily_totals(self) -> array:
+        """Coste total de cada día (suma de todas las columnas)."""
+        totals = array("d", bytes(8 * len(self.days)))
+        for column in self.columns.values():
+            for i, value in enumerate(column):
+                totals[i] += value
+        return totals
+
+
+def linear_slope(values: Sequence[float]) -> float:
+    """Pendiente por mínimos cuadrados (variación media por día)."""
+    n = len(values)
+    if n < 2:
+        return 0.0
+    mean_x = (n - 1) / 2
+    mean_y = sum(values) / n
+    numerator = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(values))
+    denominator = sum((x - mean_x) ** 2 for x in range(n))
+    return numerator / denominator
+
+
+def change_pct(values: Sequence[float]) -> Optional[float]:
+    """Variación porcentual entre la media de la segunda y la primera mitad del periodo."""
+    half = len(values) // 2
+    if half == 0:
+        return None
+    before = sum(values[:half]) / half
+    after = sum(values[-half:]) / half
+    if before == 0:
+        return None
+    return (after - before) / before * 100
+
+
+def find_anomalies(days: List[str], values: Sequence[float], threshold: float = 3.5,
+                   min_amount: float = 1.0) -> List[Tuple[str, float, float]]:
+    """
+    Días cuyo coste se aleja de la mediana más de `threshold` MADs escaladas.
+
+    Se usa mediana/MAD en lugar de media/desviación para que la propia anomalía
+    no desplace la referencia. Se ignoran desviaciones menores que `min_amount`.
+
+    Returns:
+        Lista de (día, importe, importe esperado)
+    """
+    if len(values) < 5:
+        return []
+    median = statistics.median(values)
+    mad = statistics.median(abs(value - median) for value in values) * _MAD_SCALE
+    anomalies = []
+    for day, value in zip(days, values):
+        deviation = abs(value - median)
+        if deviation >= min_amount and deviation > threshold * max(mad, 0.01 * median, 1e-9):
+            anomalies.append((day, value, median))
+    return anomalies
+
+
+def _round(value: Optional[float], digits: int = 2) -> Optional[float]:
+    return None if value is None else round(value, digits)
+
+
+def summarize_costs(matrix: CostMatrix, top_n: int = 5, detailed: bool = False) -> Dict[str, Any]:
+    """
+    Resumen de costes: total, tendencia, top-N servicios con su cuota y evolución,
+    anomalías por día y la serie diaria (por servicio solo en modo detallado).
+    """
+    totals = matrix.daily_totals()
+    service_totals = matrix.service_totals()
+    grand_total = sum(totals)
+    top = sorted(service_totals.items(), key=lambda item: item[1], reverse=True)[:max(1, top_n)]
+
+    slope = linear_slope(totals)
+    overall_change = change_pct(totals)
+
+    top_services = []
+    anomalies = []
+    for service, total in top:
+        column = matrix.columns[service]
+        top_services.append([
+            service,
+            round(total, 2),
+            _round(total / grand_total * 100 if grand_total else 0.0, 1),
+            _round(change_pct(column), 1)
+        ])
+
+    # Las anomalías se buscan en todos los servicios, no solo en el top-N
+    for service, column in matrix.columns.items():
+        for day, amount, expected in find_anomalies(matrix.days, column):
+            anomalies.append([day, service, round(amount, 2), round(expected, 2)])
+
+    # Las anomalías más grandes primero
+    anomalies.sort(key=lambda row: abs(row[2] - row[3]), reverse=True)
+
+    daily = []
+    previous = None
+    for day, amount in zip(matrix.days, totals):
+        daily.append([day, round(amount, 2), None if previous is None else round(amount - previous, 2)])
+        previous = amount
+
+    summary: Dict[str, Any] = {
+        "total": round(grand_total, 2),
+        "avg_daily": round(grand_total / len(totals), 2) if len(totals) else 0.0,
+        "services_count": sum(1 for total in service_totals.values() if total > 0),
+        "trend": {
+            "slope_per_day": round(slope, 2),
+            "change_pct": _round(overall_change, 1),
+            "direction": "up" if slope > 0.01 else "down" if slope < -0.01 else "flat"
+        },
+        "top_services": top_services,
+        "anomalies": anomalies,
+        "daily": daily,
+        "columns": {
+            "top_services": ["service", "total", "share_pct", "change_pct"],
+            "anomalies": ["day", "service", "cost", "expected"],
+            "daily": ["day", "cost", "delta"]
+        }
+    }
+
+    if detailed:
+        summary["series"] = {service: [round(v, 2) for v in matrix.columns[service]] for service, _ in top}
+
+    return summary
+
+
+def _weekly(daily: List[List[Any]]) -> List[List[Any]]:
+    """Agrupa la serie diaria en semanas (día inicial, coste)."""
+    return [[week[0][0], round(sum(row[1] for row in week), 2)]
+            for week in (daily[i:i + 7] for i in range(0, len(daily), 7))]
+
+
+def _drop_series(result: Dict[str, Any]) -> bool:
+    return result.pop("series", None) is not None
+
+
+def _weekly_daily(result: Dict[str, Any]) -> bool:
+    if "daily" not in result or result["columns"].get("daily") == ["week_start", "cost"]:
+        return False
+    result["daily"] = _weekly(result["daily"])
+    result["columns"]["daily"] = ["week_start", "cost"]
+    return True
+
+
+def _drop_daily(result: Dict[str, Any]) -> bool:
+    if "daily" not in result:
+        return False
+    del result["daily"]
+    result["columns"].pop("daily", None)
+    return True
+
+
+def _halve_list(key: str, minimum: int) -> Callable[[Dict[str, Any]], bool]:
+    def shrink(result: Dict[str, Any]) -> bool:
+        items = result.get(key, [])
+        if len(items) <= minimum:
+            return False
+        result[key] = items[:max(minimum, len(items) // 2)]
+        return True
+    return shrink
+
+
+def _drop_empty(result: Dict[str, Any]) -> bool:
+    """Elimina las listas vacías y la descripción de columnas de las que ya no están."""
+    removed = False
+    for key in [key for key, value in result.items() if value == []]:
+        del result[key]
+        removed = True
+    columns = result.get("columns", {})
+    for key in [key for key in columns if key not in result]:
+        del columns[key]
+        removed = True
+    return removed
+
+
+# Reducciones aplicadas en orden hasta respetar el presupuesto de salida
+_SHRINK_STEPS: List[Callable[[Dict[str, Any]], bool]] = [
+    _drop_series,
+    _weekly_daily,
+    _halve_list("anomalies", 3),
+    _drop_daily,
+    _halve_list("top_services", 3),
+    _halve_list("anomalies", 0),
+    _drop_empty,
+    _halve_list("top_services", 1),
+]
+
+
+def to_budgeted_json(result: Dict[str, Any], max_chars: int) -> str:
+    """
+    Serializa el resultado en JSON compacto sin superar `max_chars` caracteres.
+
+    Se eliminan detalles de menor a mayor importancia (series por servicio,
+    detalle diario, anomalías, servicios); los totales, la tendencia y el
+    servicio principal siempre se conservan, por lo que presupuestos por debajo
+    de unos 400 caracteres no se pueden garantizar.
+    """
+    text = json.dumps(result, separators=(",", ":"), default=str)
+    for step in _SHRINK_STEPS:
+        # Cada reducción se repite mientras siga haciendo falta y tenga efecto
+        while len(text) > max_chars and step(result):
+            result["reduced"] = True
+            text = json.dumps(result, separators=(",", ":"), default=str)
+        if len(text) <= max_chars:
+            break
+    return text
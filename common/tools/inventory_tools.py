@@ -0,0 +1,247 @@
+"""
+Inventario de recursos AWS en varias regiones y servicios en una sola llamada.
+Sustituye decenas de llamadas secuenciales a list_aws_resources desde el modelo.
+"""
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple
+
+from strands import tool
+
+from common.tools.aws_clients import get_client_pool
+from common.tools.aws_tools import (
+    RESOURCE_SPECS,
+    ResourceSpec,
+    iter_resources,
+    matches_filters,
+    normalize_filters,
+    project_resource,
+)
+from config.settings import (
+    INVENTORY_MAX_WORKERS,
+    INVENTORY_RATE_LIMIT,
+    INVENTORY_REGIONS,
+    INVENTORY_TIMEOUT,
+)
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Columnas de la tabla combinada
+INVENTORY_COLUMNS = ["region", "resource_type", "id", "name", "state", "detail"]
+
+# Campos proyectados que se usan (en orden de preferencia) para cada columna
+_STATE_FIELDS = ("state", "status")
+_DETAIL_FIELDS = ("type", "class", "runtime", "engine", "cidr", "vpc_id", "region")
+
+# Región desde la que se listan los recursos globales
+_GLOBAL_REGION = "global"
+
+
+class RateLimiter:
+    """Token bucket thread-safe: como máximo `rate` llamadas por segundo con ráfagas de `burst`."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Espera hasta disponer de un token."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_time = (1 - self._tokens) / self.rate
+            time.sleep(wait_time)
+
+
+def _first(record: Dict, names: Tuple[str, ...]) -> Any:
+    """Primer campo presente del registro entre `names`."""
+    return next((record[name] for name in names if name in record), None)
+
+
+def _to_row(region: str, resource_key: str, record: Dict) -> List[Any]:
+    """Convierte un registro proyectado en una fila de la tabla combinada."""
+    return [
+        region,
+        resource_key,
+        record.get("id", record.get("name")),
+        record.get("name") if "id" in record else None,
+        _first(record, _STATE_FIELDS),
+        _first(record, _DETAIL_FIELDS)
+    ]
+
+
+def _scan_one(region: str, resource_key: str, spec: ResourceSpec, filters: Dict[str, List[str]],
+              max_rows: int, limiter: RateLimiter) -> Tuple[int, List[List[Any]]]:
+    """Lista un tipo de recurso en una región. Devuelve (total, primeras `max_rows` filas)."""
+    service = resource_key.split(":", 1)[0]
+    client_filters = {} if spec.server_filters else filters
+    api_region = None if region == _GLOBAL_REGION else region
+
+    def collect(client) -> Tuple[int, List[List[Any]]]:
+        total = 0
+        rows: List[List[Any]] = []
+        for item in iter_resources(client, spec, filters, throttle=limiter.acquire):
+            record = project_resource(item, spec)
+            if client_filters and not matches_filters(record, client_filters):
+                continue
+            total += 1
+            if len(rows) < max_rows:
+                rows.append(_to_row(region, resource_key, record))
+        return total, rows
+
+    return get_client_pool().call(service, collect, api_region)
+
+
+def _resolve_regions(regions: Optional[List[str]], limiter: RateLimiter) -> List[str]:
+    """Expande "all" a todas las regiones habilitadas de la cuenta."""
+    regions = regions or INVENTORY_REGIONS
+    if [r.lower() for r in regions] != ["all"]:
+        return list(dict.fromkeys(regions))
+
+    limiter.acquire()
+    client = get_client_pool().get_client("ec2", INVENTORY_REGIONS[0] if INVENTORY_REGIONS else None)
+    return sorted(r["RegionName"] for r in client.describe_regions()["Regions"])
+
+
+def _resolve_resource_types(resource_types: Optional[List[str]]) -> Tuple[List[Tuple[str, ResourceSpec]], List[str]]:
+    """Valida los tipos "servicio:tipo". Devuelve los válidos y los desconocidos."""
+    if not resource_types:
+        return [(f"{service}:{name}", spec) for service, specs in RESOURCE_SPECS.items()
+                for name, spec in specs.items()], []
+
+    valid, unknown = [], []
+    for resource_key in dict.fromkeys(resource_types):
+        service, _, name = resource_key.partition(":")
+        spec = RESOURCE_SPECS.get(service, {}).get(name)
+        if spec is None:
+            unknown.append(resource_key)
+        else:
+            valid.append((resource_key, spec))
+    return valid, unknown
+
+
+def _resolve_filters(filters: Optional[Dict[str, Any]],
+                     specs: List[Tuple[str, ResourceSpec]]) -> Tuple[Dict[str, Dict[str, List[str]]], List[str]]:
+    """
+    Filtros por tipo "servicio:tipo". Devuelve los de los tipos inventariados y las claves que no lo son.
+
+    Cada tipo admite filtros distintos (los de EC2 son nombres de filtro de AWS, los
+    de S3 o Lambda campos proyectados), así que un filtro solo se aplica a su tipo.
+    """
+    scanned = {resource_key for resource_key, _ in specs}
+    by_type, unknown = {}, []
+    for resource_key, type_filters in (filters or {}).items():
+        if resource_key in scanned and isinstance(type_filters, dict):
+            by_type[resource_key] = normalize_filters(type_filters)
+        else:
+            unknown.append(resource_key)
+    return by_type, unknown
+
+
+@tool
+def scan_aws_inventory(regions: Optional[List[str]] = None, resource_types: Optional[List[str]] = None,
+                       filters: Optional[Dict[str, Any]] = None, max_rows: int = 100) -> str:
+    """
+    Inventario de recursos AWS en varias regiones y tipos de recurso a la vez.
+
+    Recorre en paralelo la matriz región × tipo de recurso (con limitación de
+    tasa), combina todo en una única tabla compacta con conteos por tipo y región,
+    e informa de las combinaciones que fallan sin abortar el resto.
+
+    Args:
+        regions (list, optional): Regiones a inspeccionar (ej. ["us-east-1", "eu-west-1"]);
+            ["all"] para todas las regiones habilitadas. Por defecto INVENTORY_REGIONS
+        resource_types (list, optional): Tipos "servicio:tipo" (ej. ["ec2:instances", "rds:instances"]).
+            Por defecto todos los soportados: ec2:instances, ec2:security_groups, ec2:vpcs,
+            ec2:subnets, s3:buckets, lambda:functions, rds:instances
+        filters (dict, optional): Filtros por tipo "servicio:tipo", cada uno como en list_aws_resources
+            (ej. {"ec2:instances": {"instance-state-name": "running"}, "lambda:functions": {"runtime": "python3.12"}});
+            los tipos sin entrada se listan sin filtrar
+        max_rows (int): Máximo de filas de la tabla combinada (por defecto 100); los conteos son siempre completos
+
+    Returns:
+        str: JSON compacto con columns, rows, counts, totals, truncated y failures
+    """
+    started = time.monotonic()
+    limiter = RateLimiter(INVENTORY_RATE_LIMIT)
+    max_rows = max(0, max_rows)
+
+    try:
+        region_list = _resolve_regions(regions, limiter)
+    except Exception as e:
+        return f"Error al obtener las regiones: {str(e)}"
+
+    specs, unknown = _resolve_resource_types(resource_types)
+    failures = [{"resource_type": key, "error": "tipo de recurso no soportado"} for key in unknown]
+    filters_by_type, unmatched = _resolve_filters(filters, specs)
+    failures.extend({"resource_type": key, "error": "filtro para un tipo que no se inventaría (usa \"servicio:tipo\")"}
+                    for key in unmatched)
+
+    # Matriz de tareas; los recursos globales se listan una sola vez
+    tasks = []
+    for resource_key, spec in specs:
+        task_regions = region_list if spec.regional else [_GLOBAL_REGION]
+        tasks.extend((region, resource_key, spec) for region in task_regions)
+
+    counts: Dict[str, Dict[str, int]] = {}
+    rows: List[List[Any]] = []
+
+    executor = ThreadPoolExecutor(max_workers=max(1, INVENTORY_MAX_WORKERS), thread_name_prefix="inventory")
+    try:
+        futures = {
+            executor.submit(_scan_one, region, resource_key, spec, filters_by_type.get(resource_key, {}),
+                            max_rows, limiter):
+                (region, resource_key)
+            for region, resource_key, spec in tasks
+        }
+        done, not_done = wait(futures, timeout=INVENTORY_TIMEOUT)
+
+        for future in done:
+            region, resource_key = futures[future]
+            try:
+                total, task_rows = future.result()
+            except Exception as e:
+                failures.append({"region": region, "resource_type": resource_key, "error": str(e)[:200]})
+                continue
+            if total:
+                counts.setdefault(resource_key, {})[region] = total
+            rows.extend(task_rows)
+
+        for future in not_done:
+            region, resource_key = futures[future]
+            failures.append({"region": region, "resource_type": resource_key,
+                             "error": f"sin respuesta tras {INVENTORY_TIMEOUT:.0f}s"})
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    rows.sort(key=lambda row: (row[0], row[1], str(row[2])))
+    total_resources = sum(sum(by_region.values()) for by_region in counts.values())
+
+    logger.info(f"Inventario: {len(tasks)} combinaciones, {total_resources} recursos, "
+                f"{len(failures)} fallos en {time.monotonic() - started:.1f}s")
+
+    result = {
+        "regions": region_list,
+        "columns": INVENTORY_COLUMNS,
+        "rows": rows[:max_rows],
+        "truncated": total_resources > min(len(rows), max_rows),
+        "counts": counts,
+        "total": total_resources,
+        "failures": failures,
+        "elapsed_s": round(time.monotonic() - started, 2)
+    }
+    return json.dumps(result, separators=(",", ":"), default=str)
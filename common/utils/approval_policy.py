@@ -0,0 +1,259 @@
+"""
+Motor de reglas para aprobar herramientas sin intervención humana.
+
+La política se carga de un archivo JSON:
+
+    {
+      "default": "deny",
+      "rules": [
+        {"name": "especialistas", "tools": ["*_tool"], "decision": "allow"},
+        {"name": "aws-escritura", "tools": ["use_aws"],
+         "args": {"operation_name": "^(create|delete|put|update|terminate)"},
+         "decision": "deny", "reason": "solo lectura"},
+        {"name": "aws-lectura", "tools": ["use_aws"], "agents": ["aws_expert", "networking"],
+         "decision": "allow", "rate_limit": {"calls": 30, "per_seconds": 60}}
+      ]
+    }
+
+- `tools` y `agents` son patrones glob (por defecto "*")
+- `args` asocia argumentos de la herramienta con expresiones regulares (re.search
+  sobre el valor; los valores que no son texto se serializan a JSON)
+- `rate_limit` limita las llamadas que la regla aprueba por agente y herramienta
+  en una ventana deslizante; al superarlo la llamada se deniega
+
+Gana la primera regla que coincide; si ninguna coincide se aplica `default`.
+"""
+import fnmatch
+import json
+import logging
+import re
+import threading
+import time
+import weakref
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Pattern, Tuple
+
+from strands.hooks import BeforeToolCallEvent, HookProvider, HookRegistry
+
+from config.settings import TOOL_APPROVAL_DEFAULT, TOOL_APPROVAL_MODE, TOOL_APPROVAL_POLICY_PATH
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+DECISIONS = ("allow", "deny")
+
+# Máximo de combinaciones (herramienta, agente) con reglas candidatas memorizadas
+_CANDIDATE_CACHE_SIZE = 4096
+
+
+@dataclass
+class ApprovalDecision:
+    """Resultado de evaluar una llamada a herramienta."""
+    decision: str
+    rule: Optional[str] = None
+    reason: str = ""
+
+    @property
+    def allowed(self) -> bool:
+        return self.decision == "allow"
+
+
+@dataclass
+class ApprovalRule:
+    """Regla de la política (ver docstring del módulo)."""
+    decision: str
+    name: str = ""
+    tools: List[str] = field(default_factory=lambda: ["*"])
+    agents: List[str] = field(default_factory=lambda: ["*"])
+    args: Dict[str, str] = field(default_factory=dict)
+    rate_limit: Optional[Tuple[int, float]] = None
+    reason: str = ""
+
+    def __post_init__(self):
+        if self.decision not in DECISIONS:
+            raise ValueError(f"Regla '{self.name}': decisión desconocida '{self.decision}' "
+                             f"(opciones: {', '.join(DECISIONS)})")
+        self._tools = _compile_globs(self.tools)
+        self._agents = _compile_globs(self.agents)
+        self._args: List[Tuple[str, Pattern]] = [(key, re.compile(pattern)) for key, pattern in self.args.items()]
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], index: int) -> "ApprovalRule":
+        rate_limit = data.get("rate_limit")
+        if rate_limit is not None:
+            rate_limit = (int(rate_limit["calls"]), float(rate_limit.get("per_seconds", 60)))
+        return cls(
+            decision=data["decision"],
+            name=data.get("name") or f"rule_{index}",
+            tools=_as_list(data.get("tools", ["*"])),
+            agents=_as_list(data.get("agents", ["*"])),
+            args=data.get("args", {}),
+            rate_limit=rate_limit,
+            reason=data.get("reason", "")
+        )
+
+    def applies_to(self, tool_name: str, agent_id: str) -> bool:
+        """Coincidencia por nombre de herramienta y agente (se memoriza por combinación)."""
+        return bool(self._tools.match(tool_name)) and bool(self._agents.match(agent_id))
+
+    def matches_args(self, tool_input: Dict[str, Any]) -> bool:
+        for key, pattern in self._args:
+            if key not in tool_input:
+                return False
+            value = tool_input[key]
+            text = value if isinstance(value, str) else json.dumps(value, sort_keys=True, default=str)
+            if not pattern.search(text):
+                return False
+        return True
+
+
+class ApprovalPolicy:
+    """
+    Política de aprobación compilada.
+
+    Las reglas candidatas de cada combinación (herramienta, agente) se memorizan,
+    así que una evaluación solo recorre las reglas que pueden aplicarse y sus
+    expresiones de argumentos ya compiladas.
+    """
+
+    def __init__(self, rules: List[ApprovalRule], default: str = "deny", source: str = ""):
+        if default not in DECISIONS:
+            raise ValueError(f"Decisión por defecto desconocida: {default} (opciones: {', '.join(DECISIONS)})")
+        self.rules = rules
+        self.default = default
+        self.source = source
+        self._candidates: Dict[Tuple[str, str], List[ApprovalRule]] = {}
+        self._calls: Dict[Tuple[str, str, str], Deque[float]] = {}
+        self._counts = {"allow": 0, "deny": 0, "rate_limited": 0}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], source: str = "") -> "ApprovalPolicy":
+        rules = [ApprovalRule.from_dict(rule, i) for i, rule in enumerate(data.get("rules", []))]
+        return cls(rules, data.get("default", TOOL_APPROVAL_DEFAULT), source)
+
+    @classmethod
+    def from_file(cls, path: str) -> "ApprovalPolicy":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f), source=path)
+
+    def evaluate(self, tool_name: str, tool_input: Optional[Dict[str, Any]] = None,
+                 agent_id: str = "") -> ApprovalDecision:
+        """Decide si se aprueba una llamada a herramienta y registra la decisión."""
+        tool_input = tool_input if isinstance(tool_input, dict) else {}
+        decision = None
+        rate_limited = False
+        for rule in self._rules_for(tool_name, agent_id):
+            if not rule.matches_args(tool_input):
+                continue
+            if rule.decision == "allow" and rule.rate_limit is not None and not self._within_rate(rule, tool_name, agent_id):
+                calls, per_seconds = rule.rate_limit
+                rate_limited = True
+                decision = ApprovalDecision("deny", rule.name, f"límite de {calls} llamadas cada {per_seconds:g}s superado")
+            else:
+                decision = ApprovalDecision(rule.decision, rule.name, rule.reason)
+            break
+        if decision is None:
+            decision = ApprovalDecision(self.default, None, "ninguna regla coincide")
+
+        with self._lock:
+            self._counts[decision.decision] += 1
+            if rate_limited:
+                self._counts["rate_limited"] += 1
+
+        log = logger.info if decision.allowed else logger.warning
+        log(f"Aprobación {decision.decision}: {tool_name} (agente={agent_id or '-'}, "
+            f"regla={decision.rule or 'default'}){f' - {decision.reason}' if decision.reason else ''}")
+        return decision
+
+    def stats(self) -> Dict:
+        """Obtiene los contadores de decisiones."""
+        with self._lock:
+            return {"source": self.source, "rules": len(self.rules), "default": self.default, **self._counts}
+
+    def _rules_for(self, tool_name: str, agent_id: str) -> List[ApprovalRule]:
+        key = (tool_name, agent_id)
+        candidates = self._candidates.get(key)
+        if candidates is None:
+            candidates = [rule for rule in self.rules if rule.applies_to(tool_name, agent_id)]
+            with self._lock:
+                if len(self._candidates) >= _CANDIDATE_CACHE_SIZE:
+                    self._candidates.clear()
+                self._candidates[key] = candidates
+        return candidates
+
+    def _within_rate(self, rule: ApprovalRule, tool_name: str, agent_id: str) -> bool:
+        """Ventana deslizante de la regla por (agente, herramienta); anota la llamada si cabe."""
+        calls, per_seconds = rule.rate_limit
+        now = time.monotonic()
+        with self._lock:
+            window = self._calls.setdefault((rule.name, agent_id, tool_name), deque())
+            while window and now - window[0] >= per_seconds:
+                window.popleft()
+            if len(window) >= calls:
+                return False
+            window.append(now)
+            return True
+
+
+# Registros de hooks (uno por Agent) que ya aplican la política
+_approval_registries: "weakref.WeakSet[HookRegistry]" = weakref.WeakSet()
+
+
+class ToolApprovalHook(HookProvider):
+    """Hook que cancela las llamadas a herramientas que la política deniega."""
+
+    def __init__(self, policy: ApprovalPolicy, agent_id: str = ""):
+        self.policy = policy
+        self.agent_id = agent_id
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        # Una sola evaluación por llamada aunque el Agent reciba el hook dos veces
+        # (factoría y grafo): si no, los límites de frecuencia contarían doble
+        if registry in _approval_registries:
+            return
+        _approval_registries.add(registry)
+        registry.add_callback(BeforeToolCallEvent, self._before_tool)
+
+    def _before_tool(self, event: BeforeToolCallEvent):
+        tool_use = event.tool_use
+        decision = self.policy.evaluate(tool_use.get("name", ""), tool_use.get("input"), self.agent_id)
+        if not decision.allowed:
+            event.cancel_tool = (f"La política de aprobación ha denegado {tool_use.get('name')}"
+                                 f"{f': {decision.reason}' if decision.reason else ''}")
+
+
+def _compile_globs(patterns: List[str]) -> Pattern:
+    return re.compile("|".join(f"(?:{fnmatch.translate(pattern)})" for pattern in patterns) or "(?!)")
+
+
+def _as_list(value: Any) -> List[str]:
+    return [value] if isinstance(value, str) else list(value)
+
+
+_default_policy: Optional[ApprovalPolicy] = None
+_default_policy_lock = threading.Lock()
+
+
+def get_approval_policy() -> ApprovalPolicy:
+    """Devuelve la política compartida cargada de TOOL_APPROVAL_POLICY_PATH."""
+    global _default_policy
+    if _default_policy is None:
+        with _default_policy_lock:
+            if _default_policy is None:
+                try:
+                    _default_policy = ApprovalPolicy.from_file(TOOL_APPROVAL_POLICY_PATH)
+                except FileNotFoundError:
+                    raise FileNotFoundError(
+                        f"TOOL_APPROVAL_MODE=policy necesita un archivo de reglas en {TOOL_APPROVAL_POLICY_PATH} "
+                        f"(ver config/tool_policy.example.json)"
+                    ) from None
+                logger.info(f"Política de aprobación cargada de {TOOL_APPROVAL_POLICY_PATH} "
+                            f"({len(_default_policy.rules)} reglas, por defecto {_default_policy.default})")
+    return _default_policy
+
+
+def approval_hooks(agent_id: str) -> List[HookProvider]:
+    """Hooks a registrar en un Agent para que la política apruebe o deniegue sus herramientas."""
+    return [ToolApprovalHook(get_approval_policy(), agent_id)] if TOOL_APPROVAL_MODE == "policy" else []
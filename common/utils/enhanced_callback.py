@@ -1,24 +1,61 @@
 """
 Callback handler mejorado que intercepta herramientas sin afectar funcionalidad existente.
 """
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from .output_sink import BufferedOutputWriter, get_output_writer
 from .tool_interceptor import global_interceptor
 
+# Nombres amigables de las herramientas
+FRIENDLY_TOOL_NAMES = {
+    'aws_expert_tool': 'AWS Expert',
+    'networking_tool': 'Networking Expert',
+    'cicd_tool': 'CI/CD Expert',
+    'iac_tool': 'IaC Expert',
+    'kubernetes_tool': 'Kubernetes Expert',
+    'parallel_specialists_tool': 'Specialists (parallel)',
+    'scan_aws_inventory': 'AWS Inventory Scan',
+    'read_tool_output': 'Full Tool Output'
+}
+
 class EnhancedStreamingCallback:
     """
     Callback handler que combina streaming con interceptación de herramientas.
     Mantiene toda la funcionalidad existente.
+    
+    El texto se escribe en `output` (por defecto el escritor compartido hacia
+    stdout), que lo entrega desde un hilo de fondo sin bloquear el bucle del modelo.
+    
+    Cada instancia de Agent debe tener su propio callback (ver `spawn`): el estado
+    de las herramientas ya procesadas se reinicia al empezar cada invocación del
+    agente y está acotado a `max_tracked_tools` entradas.
     """
     
-    def __init__(self, enable_interception: bool = True, enable_streaming: bool = True):
+    def __init__(self, enable_interception: bool = True, enable_streaming: bool = True,
+                 output: Optional[BufferedOutputWriter] = None, max_tracked_tools: int = 256):
         self.enable_interception = enable_interception
         self.enable_streaming = enable_streaming
-        self.pending_tools = {}
-        self.tool_results = {}
+        self.output = output or get_output_writer()
+        self.max_tracked_tools = max_tracked_tools
+        self.tool_results: "OrderedDict[str, bool]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def spawn(self) -> "EnhancedStreamingCallback":
+        """Crea un callback con la misma configuración y estado propio (para otra instancia de Agent)."""
+        return EnhancedStreamingCallback(self.enable_interception, self.enable_streaming,
+                                         self.output, self.max_tracked_tools)
     
     def __call__(self, **kwargs):
         """
         Callback principal que maneja tanto streaming como interceptación.
         """
+        # Cada invocación del agente empieza con el estado limpio
+        if "init_event_loop" in kwargs:
+            self.reset()
+            return
+        
         # 1. Interceptar herramientas si está habilitado
         if self.enable_interception and self._is_tool_use_event(kwargs):
             return self._handle_tool_interception(kwargs)
@@ -27,6 +64,11 @@ class EnhancedStreamingCallback:
         if self.enable_streaming:
             return self._handle_streaming(kwargs)
     
+    def reset(self):
+        """Olvida las herramientas procesadas en la invocación anterior."""
+        with self._lock:
+            self.tool_results.clear()
+    
     def _is_tool_use_event(self, kwargs) -> bool:
         """Detecta si es un evento de uso de herramienta."""
         return "current_tool_use" in kwargs and kwargs["current_tool_use"].get("name")
@@ -39,56 +81,69 @@ class EnhancedStreamingCallback:
         tool_id = tool_info.get("toolUseId", "unknown_id")
         
         # Solo interceptar si no hemos procesado esta herramienta
-        if tool_id not in self.tool_results:
-            # Mostrar información de la herramienta
-            print(f"\n\n\033[1;32m🔧 Consultando especialista: {self._get_friendly_name(tool_name)} ({tool_name})\033[0m")
-            # Solicitar confirmación
-            confirmed = global_interceptor.request_confirmation(tool_name, tool_input)
+        with self._lock:
+            if tool_id in self.tool_results:
+                return
+            # Reservar la entrada: los eventos siguientes de la misma herramienta se ignoran
+            self.tool_results[tool_id] = True
+            while len(self.tool_results) > self.max_tracked_tools:
+                self.tool_results.popitem(last=False)
+        
+        # Mostrar información de la herramienta
+        self.output.write(f"\n\n\033[1;32m🔧 Consultando especialista: {self._get_friendly_name(tool_name)} ({tool_name})\033[0m\n")
+        # La confirmación escribe y lee directamente en la terminal: vaciar antes la cola
+        if global_interceptor.should_intercept(tool_name):
+            self.output.flush()
+        # Solicitar confirmación
+        confirmed = global_interceptor.request_confirmation(tool_name, tool_input)
+        with self._lock:
             self.tool_results[tool_id] = confirmed
-            
-            if not confirmed:
-                print("⏭️  Continuando sin usar esta herramienta...")
-                # Nota: No podemos cancelar la herramienta desde aquí,
-                # pero el usuario sabe que fue cancelada
-            else:
-                print("\033[1;36m⚡ Procesando...\033[0m")
+        
+        if not confirmed:
+            self.output.write("⏭️  Continuando sin usar esta herramienta...\n")
+            # Nota: No podemos cancelar la herramienta desde aquí,
+            # pero el usuario sabe que fue cancelada
+        else:
+            self.output.write("\033[1;36m⚡ Procesando...\033[0m\n")
     
     def _handle_streaming(self, kwargs):
         """Maneja el streaming de texto normal."""
         # Mostrar texto generado por el modelo
         if "data" in kwargs:
-            print(kwargs["data"], end="", flush=True)
+            self.output.write(kwargs["data"])
         
         # Mostrar cuando se completa la respuesta
         elif kwargs.get("complete", False):
-            print()  # Nueva línea al final
+            self.output.write("\n")  # Nueva línea al final
     
     def _get_friendly_name(self, tool_name: str) -> str:
         """Convierte nombres de herramientas a nombres amigables."""
-        friendly_names = {
-            'aws_expert_tool': 'AWS Expert',
-            'networking_tool': 'Networking Expert', 
-            'cicd_tool': 'CI/CD Expert',
-            'iac_tool': 'IaC Expert',
-            'kubernetes_tool': 'Kubernetes Expert'
-        }
-        return friendly_names.get(tool_name, tool_name.replace('_tool', '').replace('_', ' ').title())
+        return FRIENDLY_TOOL_NAMES.get(tool_name, tool_name.replace('_tool', '').replace('_', ' ').title())
 
 # Función de conveniencia para crear el callback
-def create_enhanced_callback(enable_interception: bool = True, enable_streaming: bool = True):
+def create_enhanced_callback(enable_interception: bool = True, enable_streaming: bool = True,
+                             output: Optional[BufferedOutputWriter] = None):
     """
     Crea un callback handler mejorado.
     
     Args:
         enable_interception: Si interceptar herramientas
         enable_streaming: Si hacer streaming de texto
+        output: Escritor de la salida (por defecto el compartido hacia stdout)
     """
-    return EnhancedStreamingCallback(enable_interception, enable_streaming)
+    return EnhancedStreamingCallback(enable_interception, enable_streaming, output)
 
 # Callback por defecto (mantiene compatibilidad)
+_default_callback: Optional[EnhancedStreamingCallback] = None
+
 def enhanced_streaming_handler(**kwargs):
     """
     Handler por defecto que mantiene compatibilidad con el sistema existente.
+    
+    Reutiliza una única instancia compartida; los agentes nuevos deberían usar
+    su propio callback (create_enhanced_callback o spawn).
     """
-    default_callback = EnhancedStreamingCallback()
-    return default_callback(**kwargs)
+    global _default_callback
+    if _default_callback is None:
+        _default_callback = EnhancedStreamingCallback()
+    return _default_callback(**kwargs)
@@ -2,11 +2,57 @@
 Utilidades básicas para el sistema de agentes.
 """
 import logging
+import time
+from typing import List, Optional, Tuple
 
 
-def setup_logging(level="INFO"):
-    """Configura el logging básico."""
+def setup_logging(level="INFO", trace_context=False):
+    """
+    Configura el logging básico.
+    
+    Con trace_context=True cada línea incluye el id de la traza activa para
+    correlacionar los logs con las trazas exportadas.
+    """
+    if not trace_context:
+        logging.basicConfig(
+            level=getattr(logging, level.upper()),
+            format='%(asctime)s | %(levelname)s | %(name)s | %(message)s'
+        )
+        return
+    
+    from orchestrator.tracing import TraceContextFilter
+    
     logging.basicConfig(
         level=getattr(logging, level.upper()),
-        format='%(asctime)s | %(levelname)s | %(name)s | %(message)s'
+        format='%(asctime)s | %(levelname)s | %(name)s | trace=%(trace_id)s | %(message)s'
     )
+    for handler in logging.getLogger().handlers:
+        handler.addFilter(TraceContextFilter())
+
+
+class StartupTimer:
+    """Mide la duración de las fases de arranque de la aplicación."""
+
+    def __init__(self, start: Optional[float] = None):
+        self.start = start if start is not None else time.perf_counter()
+        self._last = self.start
+        self.phases: List[Tuple[str, float]] = []
+
+    def mark(self, phase: str) -> float:
+        """Cierra una fase y devuelve su duración en segundos."""
+        now = time.perf_counter()
+        elapsed = now - self._last
+        self.phases.append((phase, elapsed))
+        self._last = now
+        return elapsed
+
+    @property
+    def total(self) -> float:
+        """Tiempo transcurrido desde el inicio hasta la última fase."""
+        return self._last - self.start
+
+    def report(self) -> str:
+        """Resumen legible de las fases medidas."""
+        lines = [f"  {phase:<14} {elapsed * 1000:8.1f} ms" for phase, elapsed in self.phases]
+        lines.append(f"  {'total':<14} {self.total * 1000:8.1f} ms")
+        return "\n".join(lines)
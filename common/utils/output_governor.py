@@ -0,0 +1,221 @@
+"""
+Gobernador del tamaño de las salidas de herramientas.
+Recorta las salidas grandes (cabeza y cola) antes de que entren en el contexto del
+agente y guarda la salida completa fuera de banda, recuperable con read_tool_output.
+"""
+import json
+import logging
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from strands import tool
+from strands.hooks import AfterToolCallEvent, HookProvider, HookRegistry
+
+from config.settings import (
+    ENABLE_TOOL_OUTPUT_GOVERNOR,
+    TOOL_OUTPUT_BUDGETS,
+    TOOL_OUTPUT_HEAD_RATIO,
+    TOOL_OUTPUT_MAX_TOKENS,
+    TOOL_OUTPUT_STORE_MAX_BYTES,
+)
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Estimación aproximada de caracteres por token (igual que en orchestrator/history.py)
+CHARS_PER_TOKEN = 4
+
+# Nombre de la herramienta de recuperación (nunca se recorta a sí misma)
+READ_TOOL_NAME = "read_tool_output"
+
+
+class OutputStore:
+    """Almacén LRU en memoria de salidas completas, acotado por bytes."""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def put(self, tool_name: str, text: str) -> str:
+        """Guarda una salida y devuelve su handle."""
+        handle = f"out_{uuid.uuid4().hex[:12]}"
+        size = len(text.encode("utf-8"))
+
+        with self._lock:
+            self._entries[handle] = (tool_name, text)
+            self._bytes += size
+            # Expulsar las salidas más antiguas (conservando siempre la recién guardada)
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.encode("utf-8"))
+        return handle
+
+    def get(self, handle: str) -> Optional[Tuple[str, str]]:
+        """Devuelve (herramienta, salida) de un handle, o None si ya no existe."""
+        with self._lock:
+            entry = self._entries.get(handle)
+            if entry is not None:
+                self._entries.move_to_end(handle)
+            return entry
+
+    def stats(self) -> Dict:
+        """Obtiene el estado del almacén."""
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+
+class ToolOutputGovernor(HookProvider):
+    """
+    Hook que limita el tamaño de los resultados de las herramientas de un agente.
+
+    - Cada herramienta tiene un presupuesto en tokens (`budgets`, o `max_tokens` por defecto)
+    - Si un resultado lo supera se conservan la cabeza y la cola, y la salida
+      completa se guarda en `store` detrás de un handle
+    - Los bloques JSON grandes se serializan a texto antes de recortarse
+    """
+
+    def __init__(self, max_tokens: int = 2000, budgets: Optional[Dict[str, int]] = None,
+                 head_ratio: float = 0.7, store: Optional[OutputStore] = None):
+        self.max_tokens = max_tokens
+        self.budgets = budgets or {}
+        self.head_ratio = head_ratio
+        self.store = store or OutputStore()
+
+        self.governed = 0
+        self.chars_saved = 0
+        self._lock = threading.Lock()
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(AfterToolCallEvent, self._on_after_tool_call)
+
+    def budget_chars(self, tool_name: str) -> int:
+        """Presupuesto en caracteres de una herramienta."""
+        return self.budgets.get(tool_name, self.max_tokens) * CHARS_PER_TOKEN
+
+    def govern_text(self, tool_name: str, text: str) -> str:
+        """Recorta un texto al presupuesto de la herramienta guardando el original."""
+        budget = self.budget_chars(tool_name)
+        if tool_name == READ_TOOL_NAME or len(text) <= budget:
+            return text
+
+        handle = self.store.put(tool_name, text)
+        head_chars = int(budget * self.head_ratio)
+        tail_chars = budget - head_chars
+        omitted = len(text) - head_chars - tail_chars
+
+        with self._lock:
+            self.governed += 1
+            self.chars_saved += omitted
+
+        logger.info(f"✂️  Salida de '{tool_name}' recortada: {len(text)} caracteres (~{len(text) // CHARS_PER_TOKEN} "
+                    f"tokens), guardada como {handle}")
+
+        marker = (
+            f"\n\n[... salida recortada: se omiten {omitted} de {len(text)} caracteres. "
+            f"Salida completa en el handle '{handle}'; usa {READ_TOOL_NAME}(handle=\"{handle}\", offset=..., "
+            f"pattern=...) para leer otras partes ...]\n\n"
+        )
+        return text[:head_chars] + marker + text[len(text) - tail_chars:]
+
+    def govern_result(self, tool_name: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Aplica el presupuesto al contenido de un ToolResult."""
+        content = result.get("content") or []
+        texts: List[str] = []
+        for block in content:
+            if "text" in block:
+                texts.append(block["text"])
+            elif "json" in block:
+                texts.append(json.dumps(block["json"], separators=(",", ":"), default=str))
+            else:
+                # Imágenes, documentos, etc. se dejan intactos
+                return result
+
+        text = "\n".join(texts)
+        if tool_name == READ_TOOL_NAME or len(text) <= self.budget_chars(tool_name):
+            return result
+        return {**result, "content": [{"text": self.govern_text(tool_name, text)}]}
+
+    def stats(self) -> Dict:
+        """Obtiene los contadores del gobernador."""
+        with self._lock:
+            return {"governed": self.governed, "chars_saved": self.chars_saved, "store": self.store.stats()}
+
+    def _on_after_tool_call(self, event: AfterToolCallEvent) -> None:
+        if not isinstance(event.result, dict):
+            return
+        tool_name = event.tool_use.get("name", "")
+        event.result = self.govern_result(tool_name, event.result)
+
+
+_default_governor: Optional[ToolOutputGovernor] = None
+_default_governor_lock = threading.Lock()
+
+
+def get_output_governor() -> ToolOutputGovernor:
+    """Devuelve el gobernador compartido configurado en settings."""
+    global _default_governor
+    if _default_governor is None:
+        with _default_governor_lock:
+            if _default_governor is None:
+                _default_governor = ToolOutputGovernor(
+                    max_tokens=TOOL_OUTPUT_MAX_TOKENS,
+                    budgets=TOOL_OUTPUT_BUDGETS,
+                    head_ratio=TOOL_OUTPUT_HEAD_RATIO,
+                    store=OutputStore(TOOL_OUTPUT_STORE_MAX_BYTES)
+                )
+    return _default_governor
+
+
+@tool
+def read_tool_output(handle: str, offset: int = 0, length: int = 4000, pattern: Optional[str] = None) -> str:
+    """
+    Lee una parte de la salida completa de una herramienta que fue recortada.
+
+    Args:
+        handle (str): Handle indicado en la salida recortada (ej. "out_1a2b3c4d5e6f")
+        offset (int): Carácter desde el que leer (por defecto 0)
+        length (int): Caracteres a leer (por defecto 4000, máximo el presupuesto por defecto)
+        pattern (str, optional): Expresión regular; si se indica, devuelve solo las
+            líneas que coinciden (con su número de línea) en lugar de un rango
+
+    Returns:
+        str: Fragmento de la salida original
+    """
+    governor = get_output_governor()
+    entry = governor.store.get(handle)
+    if entry is None:
+        return f"Error: el handle '{handle}' no existe o ya fue expulsado del almacén."
+
+    tool_name, text = entry
+    limit = min(max(1, length), governor.max_tokens * CHARS_PER_TOKEN)
+
+    if pattern:
+        try:
+            regex = re.compile(pattern)
+        except re.error as e:
+            return f"Error: expresión regular no válida: {e}"
+        lines = [f"{number}: {line}" for number, line in enumerate(text.splitlines(), 1) if regex.search(line)]
+        matches = "\n".join(lines)
+        suffix = "\n[... más coincidencias omitidas ...]" if len(matches) > limit else ""
+        return f"[{tool_name} | {len(lines)} líneas coinciden]\n{matches[:limit]}{suffix}"
+
+    offset = max(0, offset)
+    chunk = text[offset:offset + limit]
+    return f"[{tool_name} | caracteres {offset}-{offset + len(chunk)} de {len(text)}]\n{chunk}"
+
+
+def governed_tools(tools: List[Any]) -> List[Any]:
+    """Añade la herramienta de recuperación a una lista de herramientas si el gobernador está activo."""
+    if not ENABLE_TOOL_OUTPUT_GOVERNOR or read_tool_output in tools:
+        return tools
+    return list(tools) + [read_tool_output]
+
+
+def governor_hooks() -> List[HookProvider]:
+    """Hooks a registrar en un Agent para gobernar las salidas de sus herramientas."""
+    return [get_output_governor()] if ENABLE_TOOL_OUTPUT_GOVERNOR else []
@@ -0,0 +1,314 @@
+"""
+Salida de texto en streaming sin bloquear el bucle del modelo.
+
+Los callbacks escriben en un BufferedOutputWriter, que solo encola el texto; un
+hilo de fondo lo agrupa (cada `flush_interval` segundos o al llegar a
+`flush_chars` caracteres) y lo entrega al sink en una sola escritura. Si el sink
+no da abasto y lo pendiente supera `max_pending_chars`, se aplica la política de
+contrapresión:
+
+- drop_oldest: descarta el texto pendiente más antiguo (por defecto)
+- drop_new: descarta el texto nuevo
+- block: espera hasta `block_timeout` segundos a que haya sitio y después descarta
+"""
+import abc
+import atexit
+import json
+import logging
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, TextIO
+
+from config.settings import (
+    ENABLE_BUFFERED_OUTPUT,
+    OUTPUT_BACKPRESSURE,
+    OUTPUT_FLUSH_CHARS,
+    OUTPUT_FLUSH_INTERVAL_MS,
+    OUTPUT_MAX_PENDING_CHARS,
+)
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+BACKPRESSURE_POLICIES = ("drop_oldest", "drop_new", "block")
+
+
+class OutputSink(abc.ABC):
+    """Destino de la salida; `write` recibe texto ya agrupado."""
+
+    @abc.abstractmethod
+    def write(self, text: str):
+        """Escribe un lote de texto."""
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class StdoutSink(OutputSink):
+    """Escribe en sys.stdout (resuelto en cada escritura para respetar redirecciones)."""
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        self._stream = stream
+
+    @property
+    def stream(self) -> TextIO:
+        return self._stream or sys.stdout
+
+    def write(self, text: str):
+        self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+class FileSink(OutputSink):
+    """Escribe en un archivo de texto."""
+
+    def __init__(self, path: str, mode: str = "a", encoding: str = "utf-8"):
+        self.path = path
+        self._file = open(path, mode, encoding=encoding)
+
+    def write(self, text: str):
+        self._file.write(text)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class WebSocketSink(OutputSink):
+    """
+    Envía cada lote como un mensaje JSON {"type": "text", "data": ...}.
+
+    `send` es la función de envío de la conexión (por ejemplo `websocket.send`);
+    sin ella los mensajes se guardan en `frames`, como haría un cliente conectado.
+    """
+
+    def __init__(self, send: Optional[Callable[[str], Any]] = None):
+        self.frames: List[str] = []
+        self._send = send or self.frames.append
+
+    def write(self, text: str):
+        self._send(json.dumps({"type": "text", "data": text}, ensure_ascii=False))
+
+
+class MemorySink(OutputSink):
+    """Guarda los lotes en memoria (útil en pruebas y benchmarks)."""
+
+    def __init__(self, write_delay: float = 0.0):
+        self.batches: List[str] = []
+        self.write_delay = write_delay
+        self.closed = False
+
+    def write(self, text: str):
+        if self.write_delay:
+            time.sleep(self.write_delay)
+        self.batches.append(text)
+
+    def getvalue(self) -> str:
+        return "".join(self.batches)
+
+    def close(self):
+        self.closed = True
+
+
+class BufferedOutputWriter:
+    """
+    Escritor con cola y hilo de fondo delante de un OutputSink.
+
+    `write` nunca hace E/S: con las políticas drop_* no bloquea nunca, y con block
+    espera como mucho `block_timeout`. Con buffered=False escribe de forma síncrona
+    en el sink (comportamiento anterior).
+    """
+
+    def __init__(self, sink: OutputSink, flush_interval: float = 0.03, flush_chars: int = 4096,
+                 max_pending_chars: int = 1024 * 1024, backpressure: str = "drop_oldest",
+                 block_timeout: float = 0.5, buffered: bool = True):
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"Política de contrapresión desconocida: {backpressure} "
+                             f"(opciones: {', '.join(BACKPRESSURE_POLICIES)})")
+        self.sink = sink
+        self.flush_interval = flush_interval
+        self.flush_chars = flush_chars
+        self.max_pending_chars = max_pending_chars
+        self.backpressure = backpressure
+        self.block_timeout = block_timeout
+        self.buffered = buffered
+
+        self._pending: Deque[str] = deque()
+        self._pending_chars = 0
+        self._in_flight = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+        self.written_chars = 0
+        self.batches = 0
+        self.dropped_chars = 0
+        self.sink_errors = 0
+
+    def write(self, text: str):
+        """Encola texto para el sink."""
+        if not text:
+            return
+        if not self.buffered:
+            self._write_to_sink(text)
+            return
+
+        with self._cond:
+            if self._closed:
+                return
+            self._ensure_thread()
+            if self._pending_chars + len(text) > self.max_pending_chars and not self._make_room(len(text)):
+                self.dropped_chars += len(text)
+                return
+            # El primer fragmento arranca la ventana de agrupación; el umbral la adelanta
+            notify = not self._pending or self._pending_chars + len(text) >= self.flush_chars
+            self._pending.append(text)
+            self._pending_chars += len(text)
+            if notify:
+                self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Espera a que el texto pendiente llegue al sink; devuelve False si vence el plazo."""
+        if not self.buffered:
+            self._flush_sink()
+            return True
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._cond.notify_all()
+            while self._pending or self._in_flight:
+                if self._thread is None or not self._thread.is_alive():
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return not self._pending
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Vacía la cola, detiene el hilo de fondo y cierra el sink."""
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        try:
+            self.sink.close()
+        except Exception as e:
+            logger.warning(f"Error al cerrar el sink de salida: {e}")
+
+    def stats(self) -> Dict:
+        """Obtiene el estado del escritor."""
+        with self._cond:
+            return {
+                "pending_chars": self._pending_chars,
+                "written_chars": self.written_chars,
+                "batches": self.batches,
+                "dropped_chars": self.dropped_chars,
+                "sink_errors": self.sink_errors,
+                "backpressure": self.backpressure
+            }
+
+    def _make_room(self, size: int) -> bool:
+        """Aplica la política de contrapresión (con el lock tomado); devuelve si cabe el texto."""
+        if self.backpressure == "drop_new" or size > self.max_pending_chars:
+            return False
+
+        if self.backpressure == "block":
+            deadline = time.monotonic() + self.block_timeout
+            self._cond.notify_all()
+            while self._pending_chars + size > self.max_pending_chars and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return not self._closed
+
+        # drop_oldest
+        while self._pending and self._pending_chars + size > self.max_pending_chars:
+            dropped = self._pending.popleft()
+            self._pending_chars -= len(dropped)
+            self.dropped_chars += len(dropped)
+        return True
+
+    def _ensure_thread(self):
+        """Arranca el hilo de fondo la primera vez que se escribe (con el lock tomado)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="output-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        """Bucle del hilo de fondo: agrupa lo pendiente y lo escribe en el sink."""
+        while True:
+            with self._cond:
+                if not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending and self._closed:
+                    return
+                # Dar tiempo a que se agrupen más fragmentos, salvo que ya haya bastantes
+                if self._pending_chars < self.flush_chars and not self._closed:
+                    self._cond.wait(self.flush_interval)
+                batch = "".join(self._pending)
+                self._pending.clear()
+                self._pending_chars = 0
+                self._in_flight = True
+                # Despertar a los escritores en espera por la política block
+                self._cond.notify_all()
+
+            if batch:
+                self._write_to_sink(batch)
+                self._flush_sink()
+
+            with self._cond:
+                self._in_flight = False
+                self._cond.notify_all()
+
+    def _write_to_sink(self, text: str):
+        try:
+            self.sink.write(text)
+            self.written_chars += len(text)
+            self.batches += 1
+        except Exception as e:
+            self.sink_errors += 1
+            logger.warning(f"Error al escribir en el sink de salida: {e}")
+
+    def _flush_sink(self):
+        try:
+            self.sink.flush()
+        except Exception as e:
+            self.sink_errors += 1
+            logger.warning(f"Error al vaciar el sink de salida: {e}")
+
+
+_default_writer: Optional[BufferedOutputWriter] = None
+_default_writer_lock = threading.Lock()
+
+
+def get_output_writer() -> BufferedOutputWriter:
+    """Devuelve el escritor compartido hacia stdout configurado en settings."""
+    global _default_writer
+    if _default_writer is None:
+        with _default_writer_lock:
+            if _default_writer is None:
+                _default_writer = BufferedOutputWriter(
+                    StdoutSink(),
+                    flush_interval=OUTPUT_FLUSH_INTERVAL_MS / 1000,
+                    flush_chars=OUTPUT_FLUSH_CHARS,
+                    max_pending_chars=OUTPUT_MAX_PENDING_CHARS,
+                    backpressure=OUTPUT_BACKPRESSURE,
+                    buffered=ENABLE_BUFFERED_OUTPUT
+                )
+                # Que el texto pendiente no se pierda al salir
+                atexit.register(_default_writer.close, 1.0)
+    return _default_writer
@@ -4,6 +4,8 @@ Interceptor limpio de herramientas que no afecta la funcionalidad existente.
 import sys
 from typing import Dict, Any, Optional
 
+from config.settings import TOOL_APPROVAL_MODE
+
 class CleanToolInterceptor:
     """
     Interceptor que se integra limpiamente con el sistema existente.
@@ -22,6 +24,9 @@ class CleanToolInterceptor:
             'cicd_tool': 'consultar al especialista en CI/CD',
             'iac_tool': 'consultar al especialista en Infrastructure as Code',
             'kubernetes_tool': 'consultar al especialista en Kubernetes',
+            'parallel_specialists_tool': 'consultar a varios especialistas en paralelo',
+            'scan_aws_inventory': 'inventariar recursos AWS en varias regiones (solo lectura)',
+            'read_tool_output': 'leer la salida completa de una herramienta recortada',
             'file_read': 'leer archivos del sistema',
             'fs_read': 'acceder al sistema de archivos',
             'file_write': 'escribir o modificar archivos',
@@ -71,7 +76,6 @@ class CleanToolInterceptor:
         Returns:
             bool: True si aprobado, False si cancelado
         """
-        return True
         if not self.should_intercept(tool_name):
             return True
         
@@ -116,8 +120,8 @@ class CleanToolInterceptor:
                 print(f"\n❌ {tool_name} cancelado")
                 return False
 
-# Instancia global del interceptor
-global_interceptor = CleanToolInterceptor()
+# Instancia global del interceptor (solo pregunta en modo de aprobación interactivo)
+global_interceptor = CleanToolInterceptor(enabled=TOOL_APPROVAL_MODE == "interactive")
 
 def set_interception_enabled(enabled: bool):
     """Activa o desactiva la interceptación globalmente."""
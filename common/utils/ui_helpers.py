@@ -1,21 +1,24 @@
 """
 Callback handler simple para streaming de respuestas.
 """
+from .output_sink import get_output_writer
 
 def streaming_handler(**kwargs):
     """
     Callback handler simple que muestra el streaming de texto.
     """
+    output = get_output_writer()
+    
     # Mostrar texto generado por el modelo
     if "data" in kwargs:
-        print(kwargs["data"], end="", flush=True)
+        output.write(kwargs["data"])
     
     # Mostrar cuando se usa una herramienta
     elif "current_tool_use" in kwargs and kwargs["current_tool_use"].get("name"):
         tool_name = kwargs["current_tool_use"]["name"]
-        print(f"\n\n🔧 Consultando especialista: {tool_name.replace('_tool', '').replace('_', ' ').title()}")
-        print("-" * 40)
+        output.write(f"\n\n🔧 Consultando especialista: {tool_name.replace('_tool', '').replace('_', ' ').title()}\n")
+        output.write("-" * 40 + "\n")
     
     # Mostrar cuando se completa la respuesta
     elif kwargs.get("complete", False):
-        print()  # Nueva línea al final
+        output.write("\n")  # Nueva línea al final
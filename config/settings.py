@@ -1,6 +1,7 @@
 """
 Configuraciones globales para el ecosistema de agentes Strands.
 """
+import json
 import os
 from dotenv import load_dotenv
 
@@ -22,5 +23,110 @@ LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 ENABLE_AGENT_GRAPH = True
 ENABLE_STREAMING = True
 
+# Retención de la cola de mensajes por nodo
+MESSAGE_QUEUE_MAX_RECORDS = int(os.getenv("MESSAGE_QUEUE_MAX_RECORDS", "100"))
+MESSAGE_QUEUE_MAX_BYTES = int(os.getenv("MESSAGE_QUEUE_MAX_BYTES", str(64 * 1024)))
+MESSAGE_QUEUE_CONTENT_CHARS = int(os.getenv("MESSAGE_QUEUE_CONTENT_CHARS", "0"))  # 0 = no guardar contenido
+
+# Historial de conversación de los especialistas
+# Políticas: none, sliding_window, token_budget, summarize, reset
+HISTORY_POLICY = os.getenv("HISTORY_POLICY", "sliding_window")
+HISTORY_MAX_MESSAGES = int(os.getenv("HISTORY_MAX_MESSAGES", "20"))
+HISTORY_MAX_TOKENS = int(os.getenv("HISTORY_MAX_TOKENS", "8000"))
+
+# Despacho concurrente de especialistas
+ENABLE_CONCURRENT_DISPATCH = os.getenv("ENABLE_CONCURRENT_DISPATCH", "true").lower() == "true"
+SPECIALIST_MAX_CONCURRENCY = int(os.getenv("SPECIALIST_MAX_CONCURRENCY", "4"))
+SPECIALIST_TIMEOUT = float(os.getenv("SPECIALIST_TIMEOUT", "300"))
+HANDLE_REQUEST_DEADLINE = float(os.getenv("HANDLE_REQUEST_DEADLINE", "120"))  # segundos para todos los especialistas de handle_request
+
+# Topologías compiladas que cada grafo mantiene para cambiar entre ellas sin reconstruir agentes
+TOPOLOGY_CACHE_SIZE = int(os.getenv("TOPOLOGY_CACHE_SIZE", "8"))
+
+# Topología mesh (orchestrator/mesh.py)
+MESH_MAX_HOPS = int(os.getenv("MESH_MAX_HOPS", "4"))  # niveles máximos tras los nodos de entrada
+MESH_MAX_CONCURRENCY = int(os.getenv("MESH_MAX_CONCURRENCY", str(SPECIALIST_MAX_CONCURRENCY)))
+
+# Flujos de trabajo declarativos (orchestrator/workflow.py)
+WORKFLOW_MAX_CONCURRENCY = int(os.getenv("WORKFLOW_MAX_CONCURRENCY", str(SPECIALIST_MAX_CONCURRENCY)))
+WORKFLOW_TASK_RETRIES = int(os.getenv("WORKFLOW_TASK_RETRIES", "1"))  # reintentos por tarea
+WORKFLOW_RETRY_BACKOFF = float(os.getenv("WORKFLOW_RETRY_BACKOFF", "1.0"))  # segundos antes del primer reintento
+WORKFLOW_MEMO_SIZE = int(os.getenv("WORKFLOW_MEMO_SIZE", "256"))  # respuestas memorizadas (0 = desactivado)
+
+# Enrutador local de intenciones (evita la llamada de planificación del coordinador)
+ENABLE_INTENT_ROUTER = os.getenv("ENABLE_INTENT_ROUTER", "true").lower() == "true"
+ROUTER_MIN_SCORE = float(os.getenv("ROUTER_MIN_SCORE", "1.0"))  # todo especialista que la supere es relevante
+ROUTER_MARGIN = float(os.getenv("ROUTER_MARGIN", "2.0"))  # ventaja mínima sobre el mejor descartado
+ROUTER_MAX_SPECIALISTS = int(os.getenv("ROUTER_MAX_SPECIALISTS", "3"))
+ROUTER_MIN_KEYWORD_HITS = int(os.getenv("ROUTER_MIN_KEYWORD_HITS", "2"))  # palabras clave por especialista elegido
+
+# Paso directo de las respuestas de especialistas al usuario (astream_message)
+SPECIALIST_PASSTHROUGH = os.getenv("SPECIALIST_PASSTHROUGH", "false").lower() == "true"
+PASSTHROUGH_SKIP_SYNTHESIS = os.getenv("PASSTHROUGH_SKIP_SYNTHESIS", "true").lower() == "true"
+
+# Pool de instancias de agentes por solicitud
+ENABLE_AGENT_POOL = os.getenv("ENABLE_AGENT_POOL", "false").lower() == "true"
+AGENT_POOL_MIN_SIZE = int(os.getenv("AGENT_POOL_MIN_SIZE", "1"))
+AGENT_POOL_MAX_SIZE = int(os.getenv("AGENT_POOL_MAX_SIZE", "4"))
+AGENT_POOL_IDLE_TIMEOUT = float(os.getenv("AGENT_POOL_IDLE_TIMEOUT", "300"))
+
+# Caché de respuestas de especialistas
+ENABLE_RESPONSE_CACHE = os.getenv("ENABLE_RESPONSE_CACHE", "false").lower() == "true"
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(4 * 1024 * 1024)))
+
+# Límite de tamaño de las salidas de herramientas
+ENABLE_TOOL_OUTPUT_GOVERNOR = os.getenv("ENABLE_TOOL_OUTPUT_GOVERNOR", "true").lower() == "true"
+TOOL_OUTPUT_MAX_TOKENS = int(os.getenv("TOOL_OUTPUT_MAX_TOKENS", "2000"))
+TOOL_OUTPUT_BUDGETS = json.loads(os.getenv("TOOL_OUTPUT_BUDGETS", "{}"))  # {"herramienta": tokens}
+TOOL_OUTPUT_HEAD_RATIO = float(os.getenv("TOOL_OUTPUT_HEAD_RATIO", "0.7"))  # parte del presupuesto para la cabeza
+TOOL_OUTPUT_STORE_MAX_BYTES = int(os.getenv("TOOL_OUTPUT_STORE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# Caché de clientes boto3 de las herramientas AWS
+AWS_CLIENT_MAX_POOL_CONNECTIONS = int(os.getenv("AWS_CLIENT_MAX_POOL_CONNECTIONS", "10"))
+AWS_CLIENT_MAX_AGE = float(os.getenv("AWS_CLIENT_MAX_AGE", "3600"))  # segundos antes de recrear la sesión
+AWS_CLIENT_CONNECT_TIMEOUT = float(os.getenv("AWS_CLIENT_CONNECT_TIMEOUT", "10"))
+AWS_CLIENT_READ_TIMEOUT = float(os.getenv("AWS_CLIENT_READ_TIMEOUT", "60"))
+
+# Inventario multi-región (scan_aws_inventory)
+INVENTORY_REGIONS = [r.strip() for r in os.getenv("INVENTORY_REGIONS", AWS_REGION).split(",") if r.strip()]
+INVENTORY_MAX_WORKERS = int(os.getenv("INVENTORY_MAX_WORKERS", "8"))
+INVENTORY_RATE_LIMIT = float(os.getenv("INVENTORY_RATE_LIMIT", "10"))  # llamadas a la API por segundo
+INVENTORY_TIMEOUT = float(os.getenv("INVENTORY_TIMEOUT", "120"))
+
+# Métricas de latencia y tokens del grafo
+ENABLE_METRICS = os.getenv("ENABLE_METRICS", "true").lower() == "true"
+METRICS_RESERVOIR_SIZE = int(os.getenv("METRICS_RESERVOIR_SIZE", "1024"))  # muestras por serie para percentiles
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))  # 0 = sin servidor HTTP /metrics
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")  # interfaz del servidor /metrics (sin autenticación)
+METRICS_JSON_PATH = os.getenv("METRICS_JSON_PATH", "")  # volcado JSON al salir ("" = desactivado)
+
+# Salida en streaming con escritura en segundo plano (common/utils/output_sink.py)
+ENABLE_BUFFERED_OUTPUT = os.getenv("ENABLE_BUFFERED_OUTPUT", "true").lower() == "true"
+OUTPUT_FLUSH_INTERVAL_MS = float(os.getenv("OUTPUT_FLUSH_INTERVAL_MS", "30"))  # ventana de agrupación
+OUTPUT_FLUSH_CHARS = int(os.getenv("OUTPUT_FLUSH_CHARS", "4096"))  # escribir antes si se acumula esto
+OUTPUT_MAX_PENDING_CHARS = int(os.getenv("OUTPUT_MAX_PENDING_CHARS", str(1024 * 1024)))
+OUTPUT_BACKPRESSURE = os.getenv("OUTPUT_BACKPRESSURE", "drop_oldest")  # drop_oldest, drop_new, block
+
+# Medición del tiempo de arranque
+STARTUP_PROFILE = os.getenv("STARTUP_PROFILE", "false").lower() == "true"
+
 # Rutas de archivos
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Almacén local de costes de Cost Explorer (analyze_aws_costs)
+COST_STORE_PATH = os.getenv("COST_STORE_PATH", os.path.join(PROJECT_ROOT, ".cache", "costs.sqlite"))
+COST_SETTLE_DAYS = int(os.getenv("COST_SETTLE_DAYS", "3"))  # días recientes que aún pueden cambiar
+COST_REFRESH_INTERVAL = float(os.getenv("COST_REFRESH_INTERVAL", str(6 * 3600)))  # segundos
+COST_SUMMARY_MAX_CHARS = int(os.getenv("COST_SUMMARY_MAX_CHARS", "2000"))  # tamaño máximo de la respuesta
+
+# Aprobación de herramientas: auto (todo aprobado), interactive (confirmación en terminal) o policy (reglas)
+TOOL_APPROVAL_MODE = os.getenv("TOOL_APPROVAL_MODE", "auto").lower()
+TOOL_APPROVAL_POLICY_PATH = os.getenv("TOOL_APPROVAL_POLICY_PATH", os.path.join(PROJECT_ROOT, "config", "tool_policy.json"))
+TOOL_APPROVAL_DEFAULT = os.getenv("TOOL_APPROVAL_DEFAULT", "deny")  # si el archivo no indica "default"
+
+# Trazas jerárquicas del grafo exportadas en OTLP/JSON
+ENABLE_TRACING = os.getenv("ENABLE_TRACING", "false").lower() == "true"
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", os.path.join(PROJECT_ROOT, ".cache", "traces.jsonl"))
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "strands-agents-ecosystem")
@@ -9,61 +9,125 @@ multi-agent workflows.
 Author: Open Source Community
 License: MIT
 """
+import time
+
+# Captured before any other import so startup profiling covers module loading
+_PROCESS_START = time.perf_counter()
+
 import logging
 import os
+import sys
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# Import agents
-from agents.coordinator.agent import coordinator_agent
-from agents.aws_expert.agent import aws_expert_agent
-from agents.networking.agent import networking_agent
-from agents.cicd.agent import cicd_agent
-from agents.iac.agent import iac_agent
-from agents.kubernetes.agent import kubernetes_agent
+# Import agent factories (agents are built lazily, on first use)
+from agents.coordinator.agent import create_coordinator_agent, get_coordinator_agent
+from agents.aws_expert.agent import create_aws_expert_agent, get_aws_expert_agent
+from agents.networking.agent import create_networking_agent, get_networking_agent
+from agents.cicd.agent import create_cicd_agent, get_cicd_agent
+from agents.iac.agent import create_iac_agent, get_iac_agent
+from agents.kubernetes.agent import create_kubernetes_agent, get_kubernetes_agent
 
 # Import utilities
-from common.utils.helpers import setup_logging
+from common.utils.helpers import StartupTimer, setup_logging
 from common.utils.enhanced_callback import create_enhanced_callback
+from common.utils.approval_policy import get_approval_policy
+from common.utils.output_sink import get_output_writer
 from common.utils.tool_interceptor import set_interception_enabled
 from orchestrator.agent_graph import create_agent_graph, execute_workflow
-from config.settings import LOG_LEVEL
+from orchestrator.metrics import start_metrics_server
+from config.settings import (
+    ENABLE_AGENT_POOL,
+    ENABLE_TRACING,
+    LOG_LEVEL,
+    METRICS_HOST,
+    METRICS_JSON_PATH,
+    METRICS_PORT,
+    STARTUP_PROFILE,
+    TOOL_APPROVAL_MODE,
+    TOOL_APPROVAL_POLICY_PATH,
+)
 
-def setup_agents_with_interception(enable_interception: bool = True):
+def setup_interception(enable_interception: bool = True):
     """
-    Configure all agents with enhanced streaming and optional tool interception.
+    Create the template enhanced callback handler and configure tool interception.
     
     Args:
         enable_interception: Whether to enable tool interception
     
     Returns:
-        dict: Dictionary of configured agents
+        The enhanced callback handler; each agent instance gets its own copy via spawn()
     """
-    agents = {
-        "coordinator": coordinator_agent,
-        "aws_expert": aws_expert_agent,
-        "networking": networking_agent,
-        "cicd": cicd_agent,
-        "iac": iac_agent,
-        "kubernetes": kubernetes_agent
-    }
-    
-    # Configure enhanced callback handler for all agents
     enhanced_callback = create_enhanced_callback(
         enable_interception=enable_interception,
         enable_streaming=True
     )
     
-    for agent in agents.values():
-        agent.callback_handler = enhanced_callback
-    
     # Configure global interception
     set_interception_enabled(enable_interception)
     
+    return enhanced_callback
+
+def setup_agents_with_interception(enable_interception: bool = True):
+    """
+    Configure all agents with enhanced streaming and optional tool interception.
+    
+    Builds every agent eagerly; main() uses lazy factories instead.
+    
+    Args:
+        enable_interception: Whether to enable tool interception
+    
+    Returns:
+        dict: Dictionary of configured agents
+    """
+    agents = {
+        "coordinator": get_coordinator_agent(),
+        "aws_expert": get_aws_expert_agent(),
+        "networking": get_networking_agent(),
+        "cicd": get_cicd_agent(),
+        "iac": get_iac_agent(),
+        "kubernetes": get_kubernetes_agent()
+    }
+    
+    enhanced_callback = setup_interception(enable_interception)
+    for agent in agents.values():
+        agent.callback_handler = enhanced_callback.spawn()
+    
     return agents
 
+def create_agent_factories(callback_handler) -> dict:
+    """
+    Build per-agent factories used by the agent graph to create agents lazily
+    (and to back them with instance pools when enabled).
+    
+    Args:
+        callback_handler: Template callback handler; every new instance gets its
+            own copy so tool state is never shared between agents or requests
+    
+    Returns:
+        dict: Agent id -> factory returning a fresh Agent
+    """
+    factories = {
+        "coordinator": create_coordinator_agent,
+        "aws_expert": create_aws_expert_agent,
+        "networking": create_networking_agent,
+        "cicd": create_cicd_agent,
+        "iac": create_iac_agent,
+        "kubernetes": create_kubernetes_agent
+    }
+    
+    def with_own_callback(factory):
+        def build():
+            return factory(callback_handler=callback_handler.spawn())
+        return build
+    
+    return {
+        agent_id: with_own_callback(factory)
+        for agent_id, factory in factories.items()
+    }
+
 def show_welcome_message(interception_enabled: bool):
     """Display welcome message with system information."""
     print("=" * 70)
@@ -79,7 +143,10 @@ def show_welcome_message(interception_enabled: bool):
     print("  • Kubernetes Expert - Container orchestration and EKS")
     print()
     
-    if interception_enabled:
+    if TOOL_APPROVAL_MODE == "policy":
+        print("🔧 Tool Approval: POLICY")
+        print(f"   Tool calls are approved or denied by the rules in {TOOL_APPROVAL_POLICY_PATH}")
+    elif interception_enabled:
         print("🔧 Tool Interception: ENABLED")
         print("   You'll be asked to confirm before agents use tools")
         print("   Options: [s]Yes [n]No [a]Approve all [t]Approve this type")
@@ -122,23 +189,62 @@ def handle_special_commands(user_input: str) -> tuple[bool, bool]:
 
 def main():
     """Main application entry point."""
+    timer = StartupTimer(_PROCESS_START)
+    timer.mark("imports")
+    
+    # Only measure startup (no interactive session) with --startup-time
+    startup_time_only = "--startup-time" in sys.argv[1:]
+    
     # Setup logging
-    setup_logging(LOG_LEVEL)
+    setup_logging(LOG_LEVEL, trace_context=ENABLE_TRACING)
     logger = logging.getLogger(__name__)
     
-    # Determine if tool interception should be enabled
-    enable_interception = os.getenv("ENABLE_TOOL_INTERCEPTION", "true").lower() == "true"
+    # Determine if tool interception should be enabled (prompts only in interactive approval mode)
+    enable_interception = (
+        os.getenv("ENABLE_TOOL_INTERCEPTION", "true").lower() == "true"
+        and TOOL_APPROVAL_MODE == "interactive"
+    )
+    
+    # Fail fast on a missing or invalid approval policy
+    if TOOL_APPROVAL_MODE == "policy":
+        get_approval_policy()
     
     # Show welcome message
-    show_welcome_message(enable_interception)
+    if not startup_time_only:
+        show_welcome_message(enable_interception)
     
-    # Setup agents with enhanced capabilities
-    agents = setup_agents_with_interception(enable_interception)
+    # Setup enhanced streaming and interception; agents are built on first use
+    enhanced_callback = setup_interception(enable_interception)
+    timer.mark("setup")
     
     # Create agent graph using "Agents as Tools" pattern
-    agent_graph = create_agent_graph(agents)
+    agent_graph = create_agent_graph(
+        agent_factories=create_agent_factories(enhanced_callback),
+        use_pool=ENABLE_AGENT_POOL
+    )
+    timer.mark("graph_build")
     logger.info(f"Agent graph created with {agent_graph.topology_type} topology")
     
+    if startup_time_only or STARTUP_PROFILE:
+        print(f"⏱️  Startup time:\n{timer.report()}")
+    if startup_time_only:
+        return
+    
+    # Expose Prometheus metrics while the session runs
+    if METRICS_PORT and agent_graph.metrics is not None:
+        start_metrics_server(agent_graph.metrics, METRICS_PORT, METRICS_HOST)
+    
+    try:
+        run_interactive_loop(agent_graph, logger)
+    finally:
+        if METRICS_JSON_PATH and agent_graph.metrics is not None:
+            agent_graph.metrics.dump_json(METRICS_JSON_PATH)
+
+def run_interactive_loop(agent_graph, logger):
+    """Read queries from stdin and process them until the user exits."""
+    # Streamed tokens are written in the background; drain them before printing
+    output = get_output_writer()
+    
     # Main interaction loop
     while True:
         try:
@@ -163,13 +269,16 @@ def main():
             
             # Process query through agent graph
             execute_workflow(agent_graph, user_query)
+            output.flush()
             
             print("\n" + "="*60 + "\n")
             
         except KeyboardInterrupt:
+            output.flush()
             print("\n\n⚠️  Operation cancelled by user")
             break
         except Exception as e:
+            output.flush()
             logger.error(f"Error processing query: {str(e)}")
             print(f"\n❌ Error: {str(e)}")
             print("Please try again or type 'help' for assistance.\n")
@@ -2,31 +2,114 @@
 Orquestación de agentes usando el patrón "Agents as Tools".
 Implementa topologías de grafo de agentes con comunicación estructurada.
 """
+import asyncio
+import contextvars
+import hashlib
+import json
 import logging
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
-import uuid
-from strands import Agent, tool
-from strands_tools import use_aws, shell, file_read, file_write
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, Iterator, List, Optional, Any, Tuple, TypeVar
+from dataclasses import dataclass, field
+from strands import Agent, ToolContext, tool
+
+from config.settings import (
+    AGENT_POOL_IDLE_TIMEOUT,
+    AGENT_POOL_MAX_SIZE,
+    AGENT_POOL_MIN_SIZE,
+    ENABLE_AGENT_POOL,
+    ENABLE_CONCURRENT_DISPATCH,
+    ENABLE_INTENT_ROUTER,
+    ENABLE_METRICS,
+    ENABLE_RESPONSE_CACHE,
+    ENABLE_TOOL_OUTPUT_GOVERNOR,
+    HISTORY_MAX_MESSAGES,
+    HISTORY_MAX_TOKENS,
+    HISTORY_POLICY,
+    MESSAGE_QUEUE_CONTENT_CHARS,
+    MESSAGE_QUEUE_MAX_BYTES,
+    MESSAGE_QUEUE_MAX_RECORDS,
+    METRICS_RESERVOIR_SIZE,
+    PASSTHROUGH_SKIP_SYNTHESIS,
+    RESPONSE_CACHE_MAX_BYTES,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_TTL,
+    SPECIALIST_MAX_CONCURRENCY,
+    SPECIALIST_PASSTHROUGH,
+    SPECIALIST_TIMEOUT,
+    TOOL_APPROVAL_MODE,
+    TOPOLOGY_CACHE_SIZE,
+)
+from common.utils.approval_policy import approval_hooks, get_approval_policy
+from common.utils.enhanced_callback import EnhancedStreamingCallback
+from common.utils.output_governor import get_output_governor, governed_tools, governor_hooks
+from orchestrator.agent_pool import AgentPool
+from orchestrator.dispatcher import SpecialistDispatcher, SpecialistTimeoutError
+from orchestrator.history import HistoryPolicy, create_history_policy, estimate_tokens
+from orchestrator.mesh import MeshScheduler
+from orchestrator.message_queue import BoundedMessageQueue
+from orchestrator.metrics import GraphMetrics, token_usage
+from orchestrator.response_cache import ResponseCache
+from orchestrator.router import get_intent_router
+from orchestrator.tracing import get_tracer, instrument_agent
 
 # Configurar logger
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+
+def _run_sync(coro_factory: Callable[[], Awaitable[T]]) -> T:
+    """Ejecuta una corrutina desde código síncrono, aunque ya haya un event loop activo en el hilo."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro_factory())
+    
+    # Hay un loop corriendo en este hilo: ejecutar en un hilo auxiliar con su propio loop
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        context = contextvars.copy_context()
+        return executor.submit(context.run, lambda: asyncio.run(coro_factory())).result()
+
 
 @dataclass
 class AgentNode:
     """Representa un nodo (agente) en el grafo de agentes."""
     id: str
     role: str
-    agent: Agent
+    agent: Optional[Agent]
     tools: List[Any] = None
-    message_queue: List[Dict] = None
+    message_queue: BoundedMessageQueue = None
+    # Serializa las invocaciones sobre la misma instancia de Agent
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    # Invocaciones asíncronas esperando instancia: (event loop, future) que se resuelve al liberar una
+    waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = field(default_factory=deque, repr=False)
+    waiters_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    # Caché de respuestas opcional delante del agente
+    cache: Optional[ResponseCache] = None
+    # Política de compactación del historial de conversación
+    history_policy: Optional[HistoryPolicy] = None
+    # Pool de instancias aisladas por solicitud; `agent` actúa entonces como plantilla
+    pool: Optional[AgentPool] = None
+    # Construcción diferida: el agente se crea con `factory` en su primer uso
+    factory: Optional[Callable[[], Agent]] = None
+    pool_options: Optional[Dict[str, Any]] = None
+    # Herramienta "<id>_tool" que consulta al nodo; se crea una vez y la comparten todas las topologías
+    agent_tool: Any = field(default=None, repr=False)
     
     def __post_init__(self):
         if self.tools is None:
             self.tools = []
         if self.message_queue is None:
-            self.message_queue = []
+            self.message_queue = BoundedMessageQueue(
+                max_records=MESSAGE_QUEUE_MAX_RECORDS,
+                max_bytes=MESSAGE_QUEUE_MAX_BYTES,
+                content_chars=MESSAGE_QUEUE_CONTENT_CHARS
+            )
 
 
 @dataclass
@@ -38,6 +121,61 @@ class AgentEdge:
     bidirectional: bool = False
 
 
+@dataclass
+class CompiledTopology:
+    """
+    Topología ya construida sobre un grafo.
+    
+    Guarda las aristas y el estado (agente, pool, herramientas) de los nodos que la
+    topología recrea; el resto de nodos se comparten entre todas las topologías.
+    """
+    topology_type: str
+    config_hash: str
+    edges: List[AgentEdge]
+    node_states: Dict[str, Tuple[Agent, Optional[AgentPool], List[Any]]]
+    build_ms: float
+    hits: int = 0
+    # Nodos que participan en la malla (solo topologías mesh)
+    mesh_nodes: List[str] = field(default_factory=list)
+
+
+def topology_config_hash(config: Any) -> str:
+    """Hash estable de una configuración de topología (independiente del orden de las claves)."""
+    payload = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class PassthroughContext:
+    """
+    Estado de una solicitud con paso directo de las respuestas de especialistas.
+    
+    - `sink` recibe los eventos de texto de los especialistas a medida que se generan
+    - Con `skip_synthesis`, si el nodo de entrada consulta a un único especialista
+      su respuesta se da como final y el nodo de entrada no vuelve a llamar al modelo
+    """
+    entry_node_id: str
+    skip_synthesis: bool = True
+    sink: Optional[Callable[[Dict[str, Any]], None]] = None
+    answer: Optional[str] = None
+    answer_agent_id: Optional[str] = None
+
+
+# Solicitud con paso directo activa (se propaga a las herramientas y a los hilos del dispatcher)
+_passthrough: contextvars.ContextVar[Optional[PassthroughContext]] = contextvars.ContextVar(
+    "specialist_passthrough", default=None
+)
+
+# Marca de fin del stream combinado de astream_message
+_STREAM_DONE = object()
+
+
+def _resolve_waiter(waiter: asyncio.Future):
+    """Despierta una espera de _acheckout_agent (en el event loop de la espera)."""
+    if not waiter.done():
+        waiter.set_result(None)
+
+
 class AgentGraph:
     """
     Grafo de agentes implementando el patrón "Agents as Tools".
@@ -48,15 +186,107 @@ class AgentGraph:
     - Mesh: Red completamente conectada
     """
     
-    def __init__(self, graph_id: str):
+    def __init__(self, graph_id: str, dispatcher: Optional[SpecialistDispatcher] = None):
         self.graph_id = graph_id
         self.nodes: Dict[str, AgentNode] = {}
         self.edges: List[AgentEdge] = []
         self.topology_type: Optional[str] = None
+        # Miembros de la topología mesh: el resto de nodos no reciben mensajes de la malla
+        self.mesh_nodes: List[str] = []
         self.active = False
+        self.dispatcher = dispatcher
+        self._materialize_lock = threading.Lock()
+        # Topologías compiladas por (tipo, hash de la configuración), de la menos a la más reciente
+        self.topology_cache_size = TOPOLOGY_CACHE_SIZE
+        self._topologies: "OrderedDict[Tuple[str, str], CompiledTopology]" = OrderedDict()
+        # Estado de cada nodo antes de que una topología lo recree
+        self._base_nodes: Dict[str, Tuple[Agent, Optional[AgentPool], List[Any]]] = {}
+        self._fan_out_tools: Dict[Tuple[str, ...], Any] = {}
+        self.metrics: Optional[GraphMetrics] = (
+            GraphMetrics(graph_id, METRICS_RESERVOIR_SIZE) if ENABLE_METRICS else None
+        )
+    
+    def enable_concurrent_dispatch(self, max_concurrency: int = 4, default_timeout: float = 300.0,
+                                   timeouts: Optional[Dict[str, float]] = None) -> SpecialistDispatcher:
+        """
+        Activa el despacho concurrente de especialistas.
+        
+        Debe llamarse antes de crear la topología para que las herramientas de
+        especialistas se ejecuten en el pool y se registre la herramienta de fan-out.
+        
+        Args:
+            max_concurrency: Número máximo de especialistas ejecutándose a la vez
+            default_timeout: Timeout en segundos por especialista
+            timeouts: Timeouts específicos por id de especialista
+        """
+        if self.dispatcher is not None:
+            self.dispatcher.shutdown()
+        
+        self.dispatcher = SpecialistDispatcher(max_concurrency, default_timeout, timeouts)
+        logger.info(f"Despacho concurrente activado (máx. {max_concurrency} especialistas en paralelo)")
+        return self.dispatcher
+    
+    def enable_response_cache(self, cache: Optional[ResponseCache] = None,
+                              node_ids: Optional[List[str]] = None) -> ResponseCache:
+        """
+        Coloca una caché de respuestas delante de los nodos indicados.
+        
+        Args:
+            cache: Caché a usar; si no se indica se crea una ResponseCache por defecto
+            node_ids: Nodos a los que aplicar la caché (por defecto, todos)
+        """
+        cache = cache or ResponseCache()
+        for node_id in node_ids if node_ids is not None else list(self.nodes):
+            if node_id not in self.nodes:
+                logger.warning(f"Agente '{node_id}' no encontrado, omitiendo caché...")
+                continue
+            self.nodes[node_id].cache = cache
+        
+        logger.info(f"Caché de respuestas activada para {len(node_ids) if node_ids is not None else len(self.nodes)} agentes")
+        return cache
+    
+    def set_history_policy(self, node_id: str, policy: HistoryPolicy):
+        """Configura la política de historial de un nodo."""
+        if node_id not in self.nodes:
+            raise ValueError(f"Agente {node_id} no encontrado en el grafo")
+        
+        self.nodes[node_id].history_policy = policy
+        logger.info(f"Política de historial '{policy.name}' configurada para '{node_id}'")
+    
+    def _compact_history(self, node: AgentNode, agent: Agent):
+        """Aplica la política de historial del nodo sobre los mensajes de un agente."""
+        if node.history_policy is None:
+            return
+        
+        messages = getattr(agent, "messages", None)
+        if not messages:
+            return
+        
+        compacted = node.history_policy.compact(messages)
+        if len(compacted) != len(messages):
+            logger.debug(f"Historial de '{node.id}' compactado de {len(messages)} a {len(compacted)} mensajes")
+            agent.messages = compacted
+    
+    def _instrument_agent(self, node_id: str, agent: Agent) -> Agent:
+        """Registra en un Agent los hooks de métricas y trazas del nodo."""
+        if self.metrics is not None:
+            self.metrics.instrument(node_id, agent)
+        return instrument_agent(node_id, agent)
+    
+    def _instrumented(self, node_id: str, factory: Callable[[], Agent]) -> Callable[[], Agent]:
+        """Envuelve una factoría para que sus instancias registren métricas y trazas del nodo."""
+        def instrumented_factory() -> Agent:
+            return self._instrument_agent(node_id, factory())
+        
+        return instrumented_factory
     
     def add_existing_agent(self, agent_id: str, role: str, agent: Agent) -> AgentNode:
         """Añade un agente existente al grafo."""
+        # Los agentes de las factorías ya traen la política; los construidos fuera, no
+        for hook in approval_hooks(agent_id):
+            agent.hooks.add_hook(hook)
+        self._instrument_agent(agent_id, agent)
+        
         node = AgentNode(
             id=agent_id,
             role=role,
@@ -66,6 +296,71 @@ class AgentGraph:
         self.nodes[agent_id] = node
         return node
     
+    def add_pooled_agent(self, agent_id: str, role: str, factory: Callable[[], Agent],
+                         min_size: int = 1, max_size: int = 4, idle_timeout: float = 300.0) -> AgentNode:
+        """
+        Añade un agente respaldado por un pool de instancias creadas con `factory`.
+        
+        Cada invocación del nodo toma su propia instancia del pool y la devuelve
+        al terminar, de modo que solicitudes concurrentes no comparten estado.
+        """
+        factory = self._instrumented(agent_id, factory)
+        pool = AgentPool(factory, min_size, max_size, idle_timeout, name=agent_id)
+        template = pool.peek() or factory()
+        
+        node = AgentNode(
+            id=agent_id,
+            role=role,
+            agent=template,
+            pool=pool
+        )
+        
+        self.nodes[agent_id] = node
+        return node
+    
+    def register_agent_factory(self, agent_id: str, role: str, factory: Callable[[], Agent],
+                               pooled: bool = False, min_size: int = 1, max_size: int = 4,
+                               idle_timeout: float = 300.0) -> AgentNode:
+        """
+        Registra un agente que se construye con `factory` en su primer uso.
+        
+        Los especialistas registrados así (y sus herramientas) no se crean hasta
+        la primera llamada a su herramienta, lo que reduce el tiempo de arranque.
+        Con pooled=True el nodo queda respaldado por un pool creado en ese momento.
+        """
+        pool_options = None
+        if pooled:
+            pool_options = {"min_size": min_size, "max_size": max_size, "idle_timeout": idle_timeout}
+        
+        node = AgentNode(
+            id=agent_id,
+            role=role,
+            agent=None,
+            factory=self._instrumented(agent_id, factory),
+            pool_options=pool_options
+        )
+        
+        self.nodes[agent_id] = node
+        return node
+    
+    def _materialize(self, node: AgentNode) -> Agent:
+        """Construye el agente de un nodo registrado por factoría si todavía no existe."""
+        if node.agent is not None:
+            return node.agent
+        
+        with self._materialize_lock:
+            if node.agent is None:
+                started = time.perf_counter()
+                if node.pool_options is not None:
+                    node.pool = AgentPool(node.factory, name=node.id, **node.pool_options)
+                    node.agent = node.pool.peek() or node.factory()
+                else:
+                    node.agent = node.factory()
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                logger.info(f"🧩 {node.role} ({node.id}) materializado en {elapsed_ms:.0f} ms")
+        
+        return node.agent
+    
     def add_edge(self, from_agent: str, to_agent: str, relationship: str = "peer", bidirectional: bool = False):
         """Añade una conexión entre dos agentes."""
         if from_agent not in self.nodes or to_agent not in self.nodes:
@@ -86,43 +381,63 @@ class AgentGraph:
             raise ValueError(f"Coordinador '{coordinator_id}' no encontrado en el grafo")
         
         coordinator_node = self.nodes[coordinator_id]
+        self._materialize(coordinator_node)
+        
+        # Las herramientas del coordinador se cargan solo al construir esta topología
+        from strands_tools import use_aws, shell, file_read, file_write
         
-        # Crear herramientas para cada especialista
+        # Herramientas de cada especialista (compartidas con otras topologías)
         specialist_tools = []
         for spec_id in specialist_ids:
             if spec_id not in self.nodes:
                 logger.warning(f"Especialista '{spec_id}' no encontrado, omitiendo...")
                 continue
                 
-            specialist_node = self.nodes[spec_id]
-            specialist_tool = self._create_agent_tool(specialist_node)
-            specialist_tools.append(specialist_tool)
+            specialist_tools.append(self._agent_tool(self.nodes[spec_id]))
             
             # Añadir conexiones bidireccionales
             self.add_edge(coordinator_id, spec_id, "supervisor", True)
         
-        # Actualizar el coordinador con las herramientas de especialistas
-        coordinator_node.tools = specialist_tools
-        coordinator_node.tools.append(use_aws)
-        coordinator_node.tools.append(shell)
-        coordinator_node.tools.append(file_read)
-        coordinator_node.tools.append(file_write)
+        # Herramienta para consultar varios especialistas en paralelo
+        extra_tools = []
+        if self.dispatcher is not None and len(specialist_tools) > 1:
+            extra_tools.append(self._fan_out_tool(specialist_ids))
         
-        # Recrear el agente coordinador con las nuevas herramientas
+        # Recrear el agente coordinador con las herramientas de especialistas y las generales
         original_prompt = self._extract_system_prompt(coordinator_node.agent)
         enhanced_prompt = self._enhance_coordinator_prompt(original_prompt, specialist_ids)
-        
-        # Preservar el callback handler original
-        original_callback = coordinator_node.agent.callback_handler
-        
-        coordinator_node.agent = Agent(
-            system_prompt=enhanced_prompt,
-            tools=specialist_tools,
-            callback_handler=original_callback
+        self._rebuild_node_agent(
+            coordinator_node,
+            enhanced_prompt,
+            specialist_tools + extra_tools + [use_aws, shell, file_read, file_write]
         )
         
         logger.info(f"Topología estrella creada con coordinador '{coordinator_id}' y {len(specialist_tools)} especialistas")
     
+    def create_mesh_topology_from_existing(self, node_ids: List[str],
+                                           connections: Optional[List[tuple]] = None):
+        """
+        Crea una topología mesh: los mensajes viajan por las aristas sin coordinador.
+        
+        Solo participan los nodos de `node_ids`. Cada conexión (origen, destino) hace
+        que la respuesta de `origen` sea una entrada de `destino`; los nodos sin
+        conexiones reciben la consulta directamente y se ejecutan en paralelo (ver
+        orchestrator/mesh.py).
+        """
+        for node_id in node_ids:
+            if node_id not in self.nodes:
+                raise ValueError(f"Agente '{node_id}' no encontrado en el grafo")
+        for from_agent, to_agent in connections or []:
+            if from_agent not in node_ids or to_agent not in node_ids:
+                raise ValueError(f"La conexión {from_agent} -> {to_agent} sale de la malla ({', '.join(node_ids)})")
+        
+        self.topology_type = "mesh"
+        self.mesh_nodes = list(node_ids)
+        for from_agent, to_agent in connections or []:
+            self.add_edge(from_agent, to_agent, "peer")
+        
+        logger.info(f"Topología mesh creada con {len(node_ids)} agentes y {len(connections or [])} conexiones")
+    
     def create_hierarchical_topology_from_existing(self, hierarchy_config: Dict):
         """Crea una topología jerárquica usando agentes existentes."""
         self.topology_type = "hierarchical"
@@ -145,15 +460,14 @@ class AgentGraph:
                 if "subordinates" in node_config:
                     for sub_id in node_config["subordinates"]:
                         if sub_id in self.nodes:
-                            sub_tool = self._create_agent_tool(self.nodes[sub_id])
-                            subordinate_tools.append(sub_tool)
+                            subordinate_tools.append(self._agent_tool(self.nodes[sub_id]))
                             
                             # Añadir conexión jerárquica
                             self.add_edge(node_id, sub_id, "supervisor")
                 
                 # Actualizar el agente con herramientas de subordinados
                 if subordinate_tools:
-                    node.tools = subordinate_tools
+                    self._materialize(node)
                     
                     # Recrear el agente con las nuevas herramientas
                     original_prompt = self._extract_system_prompt(node.agent)
@@ -161,21 +475,209 @@ class AgentGraph:
                         original_prompt, 
                         node_config.get("subordinates", [])
                     )
-                    
-                    # Preservar el callback handler original
-                    original_callback = node.agent.callback_handler
-                    
-                    node.agent = Agent(
-                        system_prompt=enhanced_prompt,
-                        tools=subordinate_tools,
-                        callback_handler=original_callback
-                    )
+                    self._rebuild_node_agent(node, enhanced_prompt, subordinate_tools)
         
         logger.info(f"Topología jerárquica creada con {len(self.nodes)} agentes")
     
+    def _rebuild_node_agent(self, node: AgentNode, system_prompt: str, tools: List[Any]):
+        """Recrea el agente de un nodo (y su pool, si tiene) con un nuevo prompt y herramientas."""
+        # Estado previo a cualquier topología, para poder compilar otra desde cero
+        self._base_nodes.setdefault(node.id, (node.agent, node.pool, node.tools))
+        node.tools = list(tools)
+        
+        # Preservar el modelo (y su cliente) y el callback handler originales
+        original_model = node.agent.model
+        original_callback = node.agent.callback_handler
+        # Las salidas de las herramientas (incluidas las respuestas de los especialistas) se acotan
+        tools = governed_tools(tools)
+        
+        def build() -> Agent:
+            # Cada instancia recibe su propio callback para no compartir estado entre solicitudes
+            callback = original_callback
+            if isinstance(original_callback, EnhancedStreamingCallback):
+                callback = original_callback.spawn()
+            return Agent(
+                model=original_model,
+                system_prompt=system_prompt,
+                tools=tools,
+                callback_handler=callback,
+                hooks=governor_hooks() + approval_hooks(node.id)
+            )
+        
+        factory = self._instrumented(node.id, build)
+        node.agent = factory()
+        
+        if node.pool is not None:
+            old_pool = node.pool
+            node.pool = AgentPool(
+                factory,
+                old_pool.min_size,
+                old_pool.max_size,
+                old_pool.idle_timeout,
+                old_pool.reset_on_release,
+                name=node.id
+            )
+    
+    @contextmanager
+    def _checkout_agent(self, node: AgentNode) -> Iterator[Agent]:
+        """Obtiene en exclusiva la instancia de Agent que atenderá una invocación del nodo."""
+        try:
+            if node.pool is not None:
+                with node.pool.checkout() as agent:
+                    yield agent
+            else:
+                with node.lock:
+                    yield node.agent
+        finally:
+            self._wake_waiter(node)
+    
+    async def _acheckout_agent(self, node: AgentNode) -> Agent:
+        """
+        Versión asíncrona de _checkout_agent: espera sin bloquear el event loop.
+        
+        Si el nodo está ocupado, la invocación se apunta en `node.waiters` y duerme
+        hasta que una liberación (desde cualquier hilo o event loop) la despierta.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            agent = self._try_checkout(node)
+            if agent is not None:
+                return agent
+            
+            waiter = loop.create_future()
+            with node.waiters_lock:
+                node.waiters.append((loop, waiter))
+            # Volver a intentarlo ya apuntados: una liberación entre medias no se pierde
+            agent = self._try_checkout(node)
+            if agent is not None:
+                self._discard_waiter(node, waiter)
+                return agent
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                self._discard_waiter(node, waiter)
+                # Si ya nos habían despertado, el aviso pasa al siguiente en espera
+                if waiter.done() and not waiter.cancelled():
+                    self._wake_waiter(node)
+                raise
+    
+    def _release_agent(self, node: AgentNode, agent: Agent):
+        """Devuelve la instancia obtenida con _acheckout_agent."""
+        try:
+            if node.pool is not None:
+                node.pool.release(agent)
+            else:
+                node.lock.release()
+        finally:
+            self._wake_waiter(node)
+    
+    @staticmethod
+    def _try_checkout(node: AgentNode) -> Optional[Agent]:
+        """Toma la instancia del nodo (o una del pool) sin esperar."""
+        if node.pool is not None:
+            return node.pool.try_acquire()
+        if node.lock.acquire(blocking=False):
+            return node.agent
+        return None
+    
+    @staticmethod
+    def _wake_waiter(node: AgentNode):
+        """Despierta a la primera invocación asíncrona que espera instancia del nodo."""
+        with node.waiters_lock:
+            while node.waiters:
+                loop, waiter = node.waiters.popleft()
+                if waiter.done() or loop.is_closed():
+                    continue
+                loop.call_soon_threadsafe(_resolve_waiter, waiter)
+                return
+    
+    @staticmethod
+    def _discard_waiter(node: AgentNode, waiter: asyncio.Future):
+        with node.waiters_lock:
+            node.waiters = deque(entry for entry in node.waiters if entry[1] is not waiter)
+    
+    def use_topology(self, topology_type: str, config: Dict) -> CompiledTopology:
+        """
+        Activa una topología y solo la construye la primera vez que se usa.
+        
+        Configuración según el tipo:
+        - star: {"coordinator": id, "specialists": [ids]}
+        - hierarchical: niveles como en create_aws_architecture_hierarchy()
+        - mesh: {"nodes": [ids], "connections": [[origen, destino], ...]}
+        
+        Las topologías compiladas se guardan por (tipo, hash de la configuración):
+        volver a una ya usada solo restaura sus aristas y los agentes que recreó, que
+        conservan su historial y su pool. Debe llamarse sin solicitudes en curso.
+        """
+        builders = {
+            "star": lambda: self.create_star_topology_from_existing(config["coordinator"], config["specialists"]),
+            "hierarchical": lambda: self.create_hierarchical_topology_from_existing(config),
+            "mesh": lambda: self.create_mesh_topology_from_existing(
+                config["nodes"], [tuple(connection) for connection in config.get("connections", [])]
+            )
+        }
+        if topology_type not in builders:
+            raise ValueError(f"Topología desconocida: {topology_type} (opciones: {', '.join(builders)})")
+        
+        # Las herramientas del coordinador dependen de si hay despacho concurrente
+        key = (topology_type, topology_config_hash({"config": config, "dispatch": self.dispatcher is not None}))
+        compiled = self._topologies.get(key)
+        if compiled is not None:
+            self._topologies.move_to_end(key)
+            compiled.hits += 1
+            self._apply_topology(compiled)
+            logger.info(f"♻️  Topología {topology_type} ({key[1]}) reutilizada de la caché")
+            return compiled
+        
+        started = time.perf_counter()
+        self._restore_base_nodes()
+        self.edges = []
+        self.mesh_nodes = []
+        builders[topology_type]()
+        
+        rebuilt = {node_id: (self.nodes[node_id].agent, self.nodes[node_id].pool, self.nodes[node_id].tools)
+                   for node_id, (agent, _, _) in self._base_nodes.items() if self.nodes[node_id].agent is not agent}
+        compiled = CompiledTopology(topology_type, key[1], list(self.edges), rebuilt,
+                                    round((time.perf_counter() - started) * 1000, 2), mesh_nodes=list(self.mesh_nodes))
+        self._topologies[key] = compiled
+        while len(self._topologies) > self.topology_cache_size:
+            self._topologies.popitem(last=False)
+        
+        logger.info(f"🧱 Topología {topology_type} ({key[1]}) compilada en {compiled.build_ms:.0f} ms")
+        return compiled
+    
+    def _apply_topology(self, compiled: CompiledTopology):
+        """Restaura las aristas y los nodos recreados de una topología compilada."""
+        self._restore_base_nodes()
+        for node_id, (agent, pool, tools) in compiled.node_states.items():
+            node = self.nodes[node_id]
+            node.agent, node.pool, node.tools = agent, pool, tools
+        self.edges = list(compiled.edges)
+        self.mesh_nodes = list(compiled.mesh_nodes)
+        self.topology_type = compiled.topology_type
+    
+    def _restore_base_nodes(self):
+        """Devuelve los nodos recreados por una topología a su estado original."""
+        for node_id, (agent, pool, tools) in self._base_nodes.items():
+            node = self.nodes[node_id]
+            node.agent, node.pool, node.tools = agent, pool, tools
+    
+    def _agent_tool(self, node: AgentNode):
+        """Herramienta que consulta a un nodo, creada una sola vez por nodo."""
+        if node.agent_tool is None:
+            node.agent_tool = self._create_agent_tool(node)
+        return node.agent_tool
+    
+    def _fan_out_tool(self, specialist_ids: List[str]):
+        """Herramienta de fan-out, creada una sola vez por conjunto de especialistas."""
+        key = tuple(spec_id for spec_id in specialist_ids if spec_id in self.nodes)
+        if key not in self._fan_out_tools:
+            self._fan_out_tools[key] = self._create_fan_out_tool(list(key))
+        return self._fan_out_tools[key]
+    
     def _create_agent_tool(self, agent_node: AgentNode):
         """Crea una función herramienta para un nodo de agente."""
-        def agent_tool_func(query: str) -> str:
+        def agent_tool_func(query: str, tool_context: ToolContext) -> str:
             """Herramienta creada dinámicamente para comunicación entre agentes."""
             logger.info(f"🤖 {agent_node.role} ({agent_node.id}) procesando consulta...")
             
@@ -184,49 +686,230 @@ class AgentGraph:
                 logger.warning(f"Consulta vacía recibida por {agent_node.role}")
                 return f"No se recibió consulta válida para {agent_node.role}"
             
-            # Añadir mensaje a la cola
-            message = {
-                "content": query,
-                "timestamp": str(uuid.uuid4()),
-                "processed": False
-            }
-            agent_node.message_queue.append(message)
+            # Solo las herramientas del nodo de entrada ven el contexto de paso directo
+            # (_invoke_node lo oculta a los agentes que invoca)
+            passthrough = _passthrough.get()
+            stream = passthrough is not None
             
-            # Procesar con el agente
+            # Procesar con el agente (en el pool de especialistas si está activo)
             try:
-                response = agent_node.agent(query)
-                
-                # Extraer el resultado de manera más robusta
-                if hasattr(response, 'message'):
-                    result = response.message
-                elif hasattr(response, 'content'):
-                    result = response.content
+                if self.dispatcher is not None:
+                    result = self.dispatcher.run(agent_node.id, self._invoke_node, agent_node, query, stream)
                 else:
-                    result = str(response)
-                
-                # Asegurar que result sea una cadena de texto
-                if not isinstance(result, str):
-                    result = str(result)
+                    result = self._invoke_node(agent_node, query, stream)
                 
                 # Validar que el resultado no esté vacío
-                if not result or not result.strip():
+                if not result:
                     result = f"El {agent_node.role} procesó la consulta pero no generó respuesta visible."
                 
-                message["processed"] = True
                 logger.info(f"✅ {agent_node.role} completó el procesamiento")
-                return result.strip()
                 
+                if stream and passthrough.skip_synthesis and self._is_only_tool_call(tool_context):
+                    # La respuesta ya llegó al usuario: terminar sin que el nodo de entrada la reformule
+                    passthrough.answer, passthrough.answer_agent_id = result, agent_node.id
+                    tool_context.invocation_state.setdefault("request_state", {})["stop_event_loop"] = True
+                    logger.info(f"⏩ Respuesta de {agent_node.role} entregada sin síntesis del {passthrough.entry_node_id}")
+                
+                return result
+                
+            except SpecialistTimeoutError as e:
+                logger.warning(f"⏱️ {str(e)}")
+                return f"El {agent_node.role} no respondió a tiempo ({e.timeout:.0f}s). Continúa sin su aporte."
             except Exception as e:
                 logger.error(f"❌ Error en {agent_node.role}: {str(e)}")
-                message["error"] = str(e)
                 return f"Error al procesar con {agent_node.role}: {str(e)}"
         
         # Configurar metadatos de la función
         agent_tool_func.__name__ = f"{agent_node.id}_tool"
         agent_tool_func.__doc__ = f"Consultar al {agent_node.role} para tareas relacionadas con {agent_node.id}."
         
-        # Convertir a herramienta de Strands
-        return tool(agent_tool_func)
+        # Convertir a herramienta de Strands (tool_context lo inyecta Strands, no es parámetro del modelo)
+        return tool(context=True)(agent_tool_func)
+    
+    @staticmethod
+    def _is_only_tool_call(tool_context: ToolContext) -> bool:
+        """Indica si la herramienta es la única que el agente ha pedido en este turno."""
+        messages = getattr(tool_context.agent, "messages", None) or []
+        if not messages or messages[-1].get("role") != "assistant":
+            return False
+        return sum(1 for block in messages[-1].get("content", []) if "toolUse" in block) == 1
+    
+    def _create_fan_out_tool(self, specialist_ids: List[str]):
+        """Crea una herramienta que consulta a varios especialistas en paralelo."""
+        available_ids = [spec_id for spec_id in specialist_ids if spec_id in self.nodes]
+        
+        def parallel_specialists_tool(queries: Dict[str, str]) -> str:
+            """Herramienta creada dinámicamente para consultar especialistas en paralelo."""
+            calls = {}
+            for spec_id, query in queries.items():
+                if spec_id not in available_ids:
+                    logger.warning(f"Especialista '{spec_id}' no disponible para fan-out, omitiendo...")
+                    continue
+                if not query or not query.strip():
+                    continue
+                calls[spec_id] = partial(self._invoke_node, self.nodes[spec_id], query)
+            
+            if not calls:
+                return f"No se recibieron consultas válidas. Especialistas disponibles: {', '.join(available_ids)}"
+            
+            logger.info(f"🤖 Consultando en paralelo a: {', '.join(calls)}")
+            results = self.dispatcher.fan_out(calls)
+            
+            # Unir las respuestas en un único resultado
+            sections = []
+            for spec_id, outcome in results.items():
+                node = self.nodes[spec_id]
+                if isinstance(outcome, SpecialistTimeoutError):
+                    text = f"Sin respuesta: superó el timeout de {outcome.timeout:.0f}s."
+                elif isinstance(outcome, Exception):
+                    text = f"Error al procesar: {str(outcome)}"
+                else:
+                    text = outcome or "El especialista procesó la consulta pero no generó respuesta visible."
+                sections.append(f"### {node.role} ({spec_id})\n{text}")
+            
+            return "\n\n".join(sections)
+        
+        parallel_specialists_tool.__doc__ = f"""Consultar a varios especialistas a la vez, en paralelo.
+
+        Usa esta herramienta cuando una consulta necesita a más de un especialista y
+        sus preguntas son independientes entre sí.
+
+        Args:
+            queries: Diccionario id de especialista -> consulta específica para él.
+                Ids disponibles: {', '.join(available_ids)}
+        """
+        
+        return tool(parallel_specialists_tool)
+    
+    def _invoke_node(self, node: AgentNode, query: str, stream: bool = False) -> str:
+        """
+        Procesa una consulta con el agente de un nodo y devuelve la respuesta como texto.
+        
+        Con stream=True y una solicitud con paso directo activa, el texto del agente
+        se envía además al sink de la solicitud a medida que se genera.
+        """
+        passthrough = _passthrough.get() if stream else None
+        if passthrough is not None and passthrough.sink is None:
+            passthrough = None
+        # Los agentes que invoca este nodo no entregan sus respuestas directamente
+        passthrough_token = _passthrough.set(None)
+        try:
+            return self._invoke_node_isolated(node, query, passthrough)
+        finally:
+            _passthrough.reset(passthrough_token)
+    
+    def _invoke_node_isolated(self, node: AgentNode, query: str, passthrough: Optional[PassthroughContext]) -> str:
+        """Cuerpo de _invoke_node, fuera del contexto de paso directo de la solicitud."""
+        with get_tracer().span(f"agent {node.id}", self._span_attributes(node, query)) as span:
+            self._materialize(node)
+            
+            # Registrar el mensaje en la cola
+            message = node.message_queue.record(query)
+            started = time.perf_counter()
+            
+            cached = self._get_cached_response(node, query)
+            if cached is not None:
+                message.complete(cached, cached=True)
+                self._record_request(node, started, cache_hit=True, span=span)
+                if passthrough is not None:
+                    passthrough.sink({"data": cached, "agent_id": node.id, "passthrough": True})
+                return cached
+            
+            tokens_before = tokens_after = (0, 0)
+            try:
+                with self._checkout_agent(node) as agent:
+                    self._compact_history(node, agent)
+                    tokens_before = token_usage(agent)
+                    try:
+                        if passthrough is not None:
+                            response = _run_sync(lambda: self._stream_to_sink(node, agent, query, passthrough.sink))
+                        else:
+                            response = agent(query)
+                    finally:
+                        tokens_after = token_usage(agent)
+            except Exception as e:
+                message.fail(e)
+                self._record_request(node, started, error=True, tokens=(tokens_before, tokens_after), span=span)
+                raise
+            
+            result = self._extract_response_text(response)
+            message.complete(result)
+            self._store_cached_response(node, query, result)
+            self._record_request(node, started, tokens=(tokens_before, tokens_after), span=span)
+            return result
+    
+    @staticmethod
+    async def _stream_to_sink(node: AgentNode, agent: Agent, query: str,
+                              sink: Callable[[Dict[str, Any]], None]) -> Any:
+        """Invoca al agente reenviando su texto al sink; devuelve el AgentResult."""
+        result = None
+        sink({"passthrough_start": {"agent_id": node.id, "role": node.role}})
+        async for event in agent.stream_async(query):
+            if "data" in event:
+                sink({"data": event["data"], "agent_id": node.id, "passthrough": True})
+            elif "result" in event:
+                result = event["result"]
+        sink({"passthrough_end": {"agent_id": node.id}})
+        return result
+    
+    @staticmethod
+    def _span_attributes(node: AgentNode, query: str) -> Dict[str, Any]:
+        """Atributos comunes de los spans de invocación de un nodo."""
+        return {"agent.node": node.id, "agent.role": node.role, "agent.query_chars": len(query)}
+    
+    def _record_request(self, node: AgentNode, started: float, error: bool = False, cache_hit: bool = False,
+                        tokens: Optional[tuple] = None, span: Any = None):
+        """Registra en las métricas (y en el span, si hay) una invocación del nodo y los tokens que consumió."""
+        input_tokens = output_tokens = 0
+        if tokens is not None:
+            (input_before, output_before), (input_after, output_after) = tokens
+            input_tokens, output_tokens = input_after - input_before, output_after - output_before
+        
+        if span is not None:
+            span.set_attribute("agent.cache_hit", cache_hit)
+            span.set_attribute("gen_ai.usage.input_tokens", input_tokens)
+            span.set_attribute("gen_ai.usage.output_tokens", output_tokens)
+        
+        if self.metrics is not None:
+            self.metrics.record_request(node.id, time.perf_counter() - started, error, cache_hit,
+                                        input_tokens, output_tokens)
+    
+    def _get_cached_response(self, node: AgentNode, query: str) -> Optional[str]:
+        """Busca la respuesta de un nodo en su caché, si tiene."""
+        if node.cache is None:
+            return None
+        
+        cached = node.cache.get(node.id, self._extract_system_prompt(node.agent), query)
+        if cached is not None:
+            logger.info(f"💾 Respuesta de {node.role} servida desde caché")
+        return cached
+    
+    def _store_cached_response(self, node: AgentNode, query: str, result: str):
+        """Guarda la respuesta de un nodo en su caché, si tiene."""
+        if node.cache is not None and result:
+            node.cache.put(node.id, self._extract_system_prompt(node.agent), query, result)
+    
+    def _extract_response_text(self, response: Any) -> str:
+        """Extrae el texto de la respuesta de un agente de manera robusta."""
+        if hasattr(response, 'message'):
+            result = response.message
+        elif hasattr(response, 'content'):
+            result = response.content
+        else:
+            result = str(response)
+        
+        # Los mensajes de Strands son dicts con bloques de contenido: quedarse con el texto
+        if isinstance(result, dict) and isinstance(result.get("content"), list):
+            result = "\n".join(
+                block["text"] for block in result["content"]
+                if isinstance(block, dict) and "text" in block
+            )
+        
+        # Asegurar que result sea una cadena de texto
+        if not isinstance(result, str):
+            result = str(result)
+        
+        return result.strip()
     
     def _extract_system_prompt(self, agent: Agent) -> str:
         """Extrae el system prompt de un agente existente."""
@@ -251,6 +934,12 @@ class AgentGraph:
         if not specialist_info:
             return original_prompt
         
+        if self.dispatcher is not None and len(specialist_info) > 1:
+            specialist_info.append(
+                "- Varios especialistas a la vez: Usa la herramienta parallel_specialists_tool "
+                "con un diccionario {id_especialista: consulta} cuando sus preguntas sean independientes"
+            )
+        
         enhanced_prompt = f"""{original_prompt}
 
 HERRAMIENTAS DE ESPECIALISTAS DISPONIBLES:
@@ -288,72 +977,257 @@ INSTRUCCIONES DE GESTIÓN:
         
         return enhanced_prompt
     
-    def send_message(self, target_agent_id: str, message: str) -> str:
-        """Envía un mensaje a un agente específico en el grafo."""
+    async def _astream_node(self, node: AgentNode, query: str) -> AsyncIterator[Dict[str, Any]]:
+        """Procesa una consulta con el agente de un nodo emitiendo sus eventos de Strands."""
+        with get_tracer().span(f"agent {node.id}", self._span_attributes(node, query)) as span:
+            async for event in self._astream_node_events(node, query, span):
+                yield event
+    
+    async def _astream_node_events(self, node: AgentNode, query: str, span: Any) -> AsyncIterator[Dict[str, Any]]:
+        """Cuerpo de _astream_node, dentro del span de la invocación."""
+        self._materialize(node)
+        
+        # Registrar el mensaje en la cola
+        message = node.message_queue.record(query)
+        started = time.perf_counter()
+        
+        cached = self._get_cached_response(node, query)
+        if cached is not None:
+            message.complete(cached, cached=True)
+            self._record_request(node, started, cache_hit=True, span=span)
+            yield {"result": cached, "cache_hit": True}
+            return
+        
+        # Obtener la instancia del nodo sin bloquear el event loop
+        agent = await self._acheckout_agent(node)
+        
+        result = ""
+        tokens_before = token_usage(agent)
+        try:
+            self._compact_history(node, agent)
+            async for event in agent.stream_async(query):
+                if "result" in event:
+                    result = self._extract_response_text(event["result"])
+                yield event
+            
+            # Si un especialista ya entregó la respuesta, el turno termina con ella
+            passthrough = _passthrough.get()
+            if passthrough is not None and passthrough.answer and passthrough.entry_node_id == node.id:
+                result = passthrough.answer
+                agent.messages.append({"role": "assistant", "content": [{"text": result}]})
+        except Exception as e:
+            message.fail(e)
+            self._record_request(node, started, error=True, tokens=(tokens_before, token_usage(agent)), span=span)
+            raise
+        finally:
+            tokens_after = token_usage(agent)
+            self._release_agent(node, agent)
+        
+        message.complete(result)
+        self._store_cached_response(node, query, result)
+        self._record_request(node, started, tokens=(tokens_before, tokens_after), span=span)
+    
+    async def astream_message(self, target_agent_id: str, message: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Envía un mensaje a un agente y emite sus eventos a medida que se generan.
+        
+        Los eventos son los de Strands (data, current_tool_use, result...). El último
+        evento emitido es {"graph_result": str, "agent_id": str} con la respuesta final.
+        """
         if target_agent_id not in self.nodes:
             raise ValueError(f"Agente {target_agent_id} no encontrado en el grafo")
         
         # Validar que el mensaje no esté vacío
         if not message or not message.strip():
             logger.warning(f"Mensaje vacío enviado a {target_agent_id}")
-            return "No se puede procesar un mensaje vacío"
+            yield {"graph_result": "No se puede procesar un mensaje vacío", "agent_id": target_agent_id}
+            return
         
         target_node = self.nodes[target_agent_id]
         logger.info(f"📨 Enviando mensaje a {target_node.role} ({target_agent_id})")
         
-        # Añadir a la cola de mensajes
-        msg_obj = {
-            "content": message,
-            "timestamp": str(uuid.uuid4()),
-            "processed": False
-        }
-        target_node.message_queue.append(msg_obj)
-        
         # Procesar mensaje
+        result = ""
+        passthrough = None
         try:
-            response = target_node.agent(message)
-            
-            # Extraer el resultado de manera más robusta
-            if hasattr(response, 'message'):
-                result = response.message
-            elif hasattr(response, 'content'):
-                result = response.content
+            if SPECIALIST_PASSTHROUGH:
+                passthrough = PassthroughContext(target_agent_id, skip_synthesis=PASSTHROUGH_SKIP_SYNTHESIS)
+                events = self._astream_with_passthrough(target_node, message, passthrough)
             else:
-                result = str(response)
-            
-            # Asegurar que result sea una cadena de texto
-            if not isinstance(result, str):
-                result = str(result)
-            
-            # Validar que el resultado no esté vacío
-            if not result or not result.strip():
-                result = f"El agente {target_agent_id} procesó el mensaje pero no generó respuesta visible."
-            
-            msg_obj["processed"] = True
-            return result.strip()
-            
+                events = self._astream_node(target_node, message)
+            async for event in events:
+                if "result" in event:
+                    result = self._extract_response_text(event["result"])
+                yield event
         except Exception as e:
             logger.error(f"Error al procesar mensaje en {target_agent_id}: {str(e)}")
-            msg_obj["error"] = str(e)
             raise
+        
+        if passthrough is not None and passthrough.answer:
+            result = passthrough.answer
+        
+        # Validar que el resultado no esté vacío
+        if not result:
+            result = f"El agente {target_agent_id} procesó el mensaje pero no generó respuesta visible."
+        
+        yield {"graph_result": result, "agent_id": target_agent_id}
+    
+    async def _astream_with_passthrough(self, node: AgentNode, query: str,
+                                        passthrough: PassthroughContext) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Emite los eventos de un nodo intercalando el texto de los especialistas.
+        
+        Los especialistas se ejecutan en hilos de herramientas o del dispatcher, así
+        que su texto llega a través de una cola del event loop de la solicitud.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        def sink(event: Dict[str, Any]):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                # El event loop de la solicitud ya se cerró; se descarta el evento
+                pass
+        
+        passthrough.sink = sink
+        
+        async def pump():
+            try:
+                async for event in self._astream_node(node, query):
+                    queue.put_nowait(event)
+            except Exception as e:
+                queue.put_nowait(e)
+            finally:
+                queue.put_nowait(_STREAM_DONE)
+        
+        token = _passthrough.set(passthrough)
+        try:
+            task = asyncio.create_task(pump())
+        finally:
+            _passthrough.reset(token)
+        
+        try:
+            while True:
+                event = await queue.get()
+                if event is _STREAM_DONE:
+                    break
+                if isinstance(event, Exception):
+                    raise event
+                yield event
+        finally:
+            if not task.done():
+                task.cancel()
+    
+    def route_query(self, start_node: str, query: str) -> Optional[str]:
+        """
+        Especialista que puede responder directamente una consulta dirigida a `start_node`.
+        
+        Usa el enrutador local (sin llamar al modelo). Devuelve None si está
+        desactivado, si la consulta es ambigua, si corresponde a varios
+        especialistas (el fan-out lo decide el nodo de entrada) o si el elegido no
+        es un subordinado de `start_node`.
+        """
+        if not ENABLE_INTENT_ROUTER or start_node not in self.nodes:
+            return None
+        
+        subordinates = {edge.to_agent for edge in self.edges
+                        if edge.from_agent == start_node and edge.relationship == "supervisor"}
+        if not subordinates:
+            return None
+        
+        decision = get_intent_router().route(query)
+        if not decision.confident or len(decision.specialists) != 1 or decision.primary not in subordinates:
+            return None
+        return decision.primary
+    
+    async def record_routed_turn(self, node_id: str, query: str, answer: str):
+        """
+        Añade al historial de un nodo un turno que respondió directamente un especialista.
+        
+        Así el nodo de entrada conserva el contexto de la conversación para las
+        consultas ambiguas posteriores. Los nodos con pool (historial por solicitud)
+        y los que aún no se han materializado no se modifican.
+        """
+        node = self.nodes.get(node_id)
+        if node is None or node.pool is not None or node.agent is None or not answer:
+            return
+        
+        agent = await self._acheckout_agent(node)
+        try:
+            agent.messages.append({"role": "user", "content": [{"text": query}]})
+            agent.messages.append({"role": "assistant", "content": [{"text": answer}]})
+        finally:
+            self._release_agent(node, agent)
+    
+    async def asend_message(self, target_agent_id: str, message: str) -> str:
+        """Envía un mensaje a un agente específico en el grafo sin bloquear el event loop."""
+        result = ""
+        async for event in self.astream_message(target_agent_id, message):
+            if "graph_result" in event:
+                result = event["graph_result"]
+        return result
+    
+    def send_message(self, target_agent_id: str, message: str) -> str:
+        """Envía un mensaje a un agente específico en el grafo."""
+        return _run_sync(lambda: self.asend_message(target_agent_id, message))
     
     def get_status(self) -> Dict:
         """Obtiene el estado actual del grafo de agentes."""
-        return {
+        nodes_status = {}
+        caches = {}
+        for node_id, node in self.nodes.items():
+            nodes_status[node_id] = {
+                "role": node.role,
+                "materialized": node.agent is not None,
+                "message_queue_size": len(node.message_queue),
+                "message_queue_bytes": node.message_queue.bytes,
+                "messages_total": node.message_queue.total_recorded,
+                "tools_count": len(node.tools),
+                "context_messages": len(getattr(node.agent, "messages", None) or []),
+                "context_tokens_estimate": estimate_tokens(getattr(node.agent, "messages", None) or [])
+            }
+            if node.history_policy is not None:
+                nodes_status[node_id]["history_policy"] = node.history_policy.name
+            if node.pool is not None:
+                nodes_status[node_id]["pool"] = node.pool.stats()
+            if node.cache is not None:
+                nodes_status[node_id]["cache"] = node.cache.stats(node_id)
+                caches[id(node.cache)] = node.cache
+        
+        status = {
             "graph_id": self.graph_id,
             "topology_type": self.topology_type,
             "active": self.active,
             "node_count": len(self.nodes),
             "edge_count": len(self.edges),
-            "nodes": {
-                node_id: {
-                    "role": node.role,
-                    "message_queue_size": len(node.message_queue),
-                    "tools_count": len(node.tools)
-                }
-                for node_id, node in self.nodes.items()
-            }
+            "nodes": nodes_status
         }
+        
+        # Contadores globales de la caché (normalmente compartida entre nodos)
+        if caches:
+            status["response_cache"] = [cache.stats() for cache in caches.values()]
+        
+        if ENABLE_TOOL_OUTPUT_GOVERNOR:
+            status["tool_output_governor"] = get_output_governor().stats()
+        
+        if TOOL_APPROVAL_MODE == "policy":
+            status["tool_approval"] = get_approval_policy().stats()
+        
+        if ENABLE_INTENT_ROUTER:
+            status["intent_router"] = get_intent_router().stats()
+        
+        if self._topologies:
+            status["topology_cache"] = [
+                {"type": compiled.topology_type, "config_hash": compiled.config_hash,
+                 "build_ms": compiled.build_ms, "hits": compiled.hits}
+                for compiled in self._topologies.values()
+            ]
+        
+        if self.metrics is not None:
+            status["metrics"] = self.metrics.snapshot()["nodes"]
+        
+        return status
     
     def activate(self):
         """Activa el grafo de agentes."""
@@ -366,12 +1240,17 @@ INSTRUCCIONES DE GESTIÓN:
         logger.info(f"Grafo de agentes '{self.graph_id}' desactivado")
 
 
-def create_agent_graph(agents_dict):
+def create_agent_graph(agents_dict=None, agent_factories=None, use_pool=ENABLE_AGENT_POOL):
     """
     Crea un grafo de agentes usando el patrón "Agents as Tools".
     
+    Los agentes con factoría que no se pasan ya construidos en agents_dict (o todos
+    ellos si se usa pool) se registran con construcción diferida.
+    
     Args:
-        agents_dict (dict): Diccionario de agentes disponibles
+        agents_dict (dict, optional): Diccionario de agentes ya construidos
+        agent_factories (dict, optional): Factorías por id de agente para crear instancias nuevas
+        use_pool (bool): Si respaldar con un pool de instancias los agentes que tienen factoría
         
     Returns:
         AgentGraph: Grafo de agentes configurado
@@ -381,6 +1260,10 @@ def create_agent_graph(agents_dict):
     # Crear el grafo
     graph = AgentGraph("main_ecosystem")
     
+    # Despacho concurrente de especialistas (debe configurarse antes de la topología)
+    if ENABLE_CONCURRENT_DISPATCH:
+        graph.enable_concurrent_dispatch(SPECIALIST_MAX_CONCURRENCY, SPECIALIST_TIMEOUT)
+    
     # Mapeo de roles para los agentes
     agent_roles = {
         "coordinator": "Coordinador Principal",
@@ -391,22 +1274,55 @@ def create_agent_graph(agents_dict):
         "kubernetes": "Experto en Kubernetes"
     }
     
-    # Añadir todos los agentes existentes al grafo
-    for agent_id, agent in agents_dict.items():
+    agents_dict = agents_dict or {}
+    agent_factories = agent_factories or {}
+    agent_ids = list(agents_dict) + [aid for aid in agent_factories if aid not in agents_dict]
+    
+    # Añadir todos los agentes al grafo
+    for agent_id in agent_ids:
         role = agent_roles.get(agent_id, f"Agente {agent_id.title()}")
-        graph.add_existing_agent(agent_id, role, agent)
-        logger.info(f"Añadido agente: {role} ({agent_id})")
+        if agent_id in agent_factories and (use_pool or agent_id not in agents_dict):
+            graph.register_agent_factory(
+                agent_id,
+                role,
+                agent_factories[agent_id],
+                pooled=use_pool,
+                min_size=AGENT_POOL_MIN_SIZE,
+                max_size=AGENT_POOL_MAX_SIZE,
+                idle_timeout=AGENT_POOL_IDLE_TIMEOUT
+            )
+            logger.info(f"Registrado agente con construcción diferida: {role} ({agent_id})")
+        else:
+            graph.add_existing_agent(agent_id, role, agents_dict[agent_id])
+            logger.info(f"Añadido agente: {role} ({agent_id})")
     
     # Crear topología estrella con el coordinador como centro
-    specialist_ids = [aid for aid in agents_dict.keys() if aid != "coordinator"]
+    specialist_ids = [aid for aid in agent_ids if aid != "coordinator"]
+    
+    # Compactación del historial de los especialistas reutilizados entre consultas
+    for spec_id in specialist_ids:
+        graph.set_history_policy(
+            spec_id,
+            create_history_policy(HISTORY_POLICY, HISTORY_MAX_MESSAGES, HISTORY_MAX_TOKENS)
+        )
+    
+    # Caché de respuestas compartida delante de los especialistas
+    if ENABLE_RESPONSE_CACHE:
+        graph.enable_response_cache(
+            ResponseCache(
+                ttl=RESPONSE_CACHE_TTL,
+                max_entries=RESPONSE_CACHE_MAX_ENTRIES,
+                max_bytes=RESPONSE_CACHE_MAX_BYTES
+            ),
+            specialist_ids
+        )
     
-    if "coordinator" in agents_dict:
-        graph.create_star_topology_from_existing("coordinator", specialist_ids)
+    if "coordinator" in agent_ids:
+        graph.use_topology("star", {"coordinator": "coordinator", "specialists": specialist_ids})
     else:
         logger.warning("No se encontró coordinador, creando topología mesh")
-        # Si no hay coordinador, crear topología mesh
-        graph.topology_type = "mesh"
-        # Implementar lógica mesh si es necesario
+        # Si no hay coordinador, los especialistas responden en paralelo y se combinan sus respuestas
+        graph.use_topology("mesh", {"nodes": specialist_ids})
     
     graph.activate()
     logger.info(f"Grafo de agentes creado exitosamente con topología {graph.topology_type}")
@@ -414,6 +1330,82 @@ def create_agent_graph(agents_dict):
     return graph
 
 
+async def astream_workflow(graph, query, start_node="coordinator") -> AsyncIterator[Dict[str, Any]]:
+    """
+    Ejecuta un flujo de trabajo emitiendo los eventos de los agentes a medida que se generan.
+    
+    Args:
+        graph (AgentGraph): Grafo de agentes
+        query (str): Consulta del usuario
+        start_node (str): Nodo inicial para la ejecución
+        
+    Yields:
+        dict: Eventos de Strands; el último es {"graph_result": str, "agent_id": str}
+    """
+    attributes = {"graph.id": graph.graph_id, "graph.topology": graph.topology_type,
+                  "workflow.start_node": start_node, "workflow.query_chars": len(query or "")}
+    
+    # Una traza por ejecución: las invocaciones de nodos, modelos y herramientas cuelgan de este span
+    with get_tracer().span("workflow", attributes) as span:
+        try:
+            logger.info(f"Ejecutando consulta a través del grafo de agentes, comenzando por '{start_node}'")
+            
+            # Verificar que el grafo esté activo
+            if not graph.active:
+                raise ValueError("El grafo de agentes no está activo")
+            
+            # En la malla los mensajes siguen las aristas del grafo
+            if graph.topology_type == "mesh":
+                entry_nodes = [start_node] if start_node in graph.mesh_nodes else None
+                async for event in MeshScheduler(graph).astream(query, entry_nodes):
+                    yield event
+                logger.info("Ejecución completada con éxito")
+                return
+            
+            # Las consultas claras van directamente al especialista, sin planificación del nodo inicial
+            routed_to = graph.route_query(start_node, query)
+            if routed_to is not None:
+                logger.info(f"🧭 Consulta enrutada a '{routed_to}' sin pasar por '{start_node}'")
+                span.set_attribute("workflow.routed_to", routed_to)
+            
+            # Enviar mensaje al nodo inicial (o al especialista elegido)
+            result = ""
+            async for event in graph.astream_message(routed_to or start_node, query):
+                if "graph_result" in event:
+                    result = event["graph_result"]
+                yield event
+            
+            if routed_to is not None:
+                await graph.record_routed_turn(start_node, query, result)
+            
+            logger.info("Ejecución completada con éxito")
+            
+        except Exception as e:
+            logger.error(f"Error al ejecutar el flujo de trabajo: {str(e)}")
+            raise
+
+
+async def aexecute_workflow(graph, query, start_node="coordinator") -> str:
+    """
+    Ejecuta un flujo de trabajo a través del grafo de agentes sin bloquear el event loop.
+    
+    Permite multiplexar muchas ejecuciones del grafo en un mismo event loop.
+    
+    Args:
+        graph (AgentGraph): Grafo de agentes
+        query (str): Consulta del usuario
+        start_node (str): Nodo inicial para la ejecución
+        
+    Returns:
+        str: Resultado de la ejecución
+    """
+    result = ""
+    async for event in astream_workflow(graph, query, start_node):
+        if "graph_result" in event:
+            result = event["graph_result"]
+    return result
+
+
 def execute_workflow(graph, query, start_node="coordinator"):
     """
     Ejecuta un flujo de trabajo a través del grafo de agentes.
@@ -426,22 +1418,7 @@ def execute_workflow(graph, query, start_node="coordinator"):
     Returns:
         str: Resultado de la ejecución
     """
-    try:
-        logger.info(f"Ejecutando consulta a través del grafo de agentes, comenzando por '{start_node}'")
-        
-        # Verificar que el grafo esté activo
-        if not graph.active:
-            raise ValueError("El grafo de agentes no está activo")
-        
-        # Enviar mensaje al nodo inicial
-        result = graph.send_message(start_node, query)
-        
-        logger.info("Ejecución completada con éxito")
-        return result
-        
-    except Exception as e:
-        logger.error(f"Error al ejecutar el flujo de trabajo: {str(e)}")
-        raise
+    return _run_sync(lambda: aexecute_workflow(graph, query, start_node))
 
 
 # Funciones de utilidad para crear configuraciones predefinidas
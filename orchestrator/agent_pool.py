@@ -0,0 +1,179 @@
+"""
+Pool de instancias de agentes por nodo del grafo.
+Cada solicitud trabaja con su propia instancia de Agent en lugar de compartir un singleton.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from strands import Agent
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+
+class AgentPoolExhaustedError(RuntimeError):
+    """Se lanza cuando no hay instancias disponibles dentro del tiempo de espera."""
+
+
+class AgentPool:
+    """
+    Pool de instancias pre-calentadas de un mismo agente.
+
+    - min_size instancias se crean al inicio y nunca se expulsan
+    - Como máximo max_size instancias existen a la vez; si todas están en uso,
+      acquire() espera hasta que se devuelva alguna
+    - Las instancias ociosas por encima de min_size se expulsan tras idle_timeout
+      (se comprueba al tomar y al devolver instancias)
+    - Al devolver una instancia se borra su historial para aislar las solicitudes
+    """
+
+    def __init__(self, factory: Callable[[], Agent], min_size: int = 1, max_size: int = 4,
+                 idle_timeout: float = 300.0, reset_on_release: bool = True, name: str = "agent"):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Se requiere 0 <= min_size <= max_size y max_size >= 1")
+
+        self.factory = factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.reset_on_release = reset_on_release
+        self.name = name
+
+        # Instancias ociosas como (agente, instante en que quedó libre); LIFO para reusar las "calientes"
+        self._idle: List[Tuple[Agent, float]] = []
+        self._size = 0
+        self._condition = threading.Condition()
+
+        self.created = 0
+        self.evicted = 0
+        self.waits = 0
+
+        self.warm()
+
+    def warm(self):
+        """Crea instancias hasta alcanzar min_size."""
+        while True:
+            with self._condition:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            agent = self._create()
+            with self._condition:
+                self._idle.append((agent, time.monotonic()))
+                self._condition.notify()
+
+    def acquire(self, timeout: Optional[float] = None) -> Agent:
+        """
+        Toma una instancia del pool, creándola si hace falta.
+
+        Raises:
+            AgentPoolExhaustedError: Si no hay instancias libres tras `timeout` segundos
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._condition:
+            self._evict_idle_locked()
+            while True:
+                if self._idle:
+                    return self._idle.pop()[0]
+                if self._size < self.max_size:
+                    # Reservar el hueco y crear la instancia fuera del lock
+                    self._size += 1
+                    break
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise AgentPoolExhaustedError(
+                        f"Pool '{self.name}' sin instancias libres ({self.max_size} en uso)"
+                    )
+
+                self.waits += 1
+                self._condition.wait(remaining)
+
+        return self._create()
+
+    def try_acquire(self) -> Optional[Agent]:
+        """Toma una instancia sin esperar; devuelve None si el pool está agotado."""
+        try:
+            return self.acquire(timeout=0)
+        except AgentPoolExhaustedError:
+            return None
+
+    def release(self, agent: Agent):
+        """Devuelve una instancia al pool."""
+        if self.reset_on_release and hasattr(agent, "messages"):
+            agent.messages = []
+
+        with self._condition:
+            self._idle.append((agent, time.monotonic()))
+            self._evict_idle_locked()
+            self._condition.notify()
+
+    @contextmanager
+    def checkout(self, timeout: Optional[float] = None) -> Iterator[Agent]:
+        """Context manager que toma una instancia y la devuelve al terminar."""
+        agent = self.acquire(timeout)
+        try:
+            yield agent
+        finally:
+            self.release(agent)
+
+    def evict_idle(self) -> int:
+        """Expulsa las instancias ociosas caducadas. Devuelve cuántas se expulsaron."""
+        with self._condition:
+            return self._evict_idle_locked()
+
+    def peek(self) -> Optional[Agent]:
+        """Devuelve una instancia ociosa sin tomarla (para inspeccionar su configuración)."""
+        with self._condition:
+            return self._idle[-1][0] if self._idle else None
+
+    def stats(self) -> Dict:
+        """Obtiene el estado del pool."""
+        with self._condition:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "created": self.created,
+                "evicted": self.evicted,
+                "waits": self.waits
+            }
+
+    def _create(self) -> Agent:
+        """Crea una instancia en un hueco ya reservado (se llama fuera del lock)."""
+        try:
+            agent = self.factory()
+        except Exception:
+            # Liberar el hueco reservado
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            self.created += 1
+            size = self._size
+        logger.debug(f"Pool '{self.name}': nueva instancia creada ({size}/{self.max_size})")
+        return agent
+
+    def _evict_idle_locked(self) -> int:
+        """Expulsa las instancias más antiguas ociosas más de idle_timeout, respetando min_size."""
+        now = time.monotonic()
+        evicted = 0
+        # Las más antiguas están al principio de la lista
+        while (self._idle and self._size > self.min_size
+               and now - self._idle[0][1] > self.idle_timeout):
+            self._idle.pop(0)
+            self._size -= 1
+            self.evicted += 1
+            evicted += 1
+
+        if evicted:
+            logger.debug(f"Pool '{self.name}': {evicted} instancias ociosas expulsadas")
+        return evicted
@@ -0,0 +1,133 @@
+"""
+Despacho concurrente de invocaciones a agentes especialistas.
+Ejecuta consultas independientes en un pool acotado de hilos con timeouts por especialista.
+"""
+import contextvars
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Dispatchers en cuyo pool se está ejecutando la invocación actual. Es una variable de
+# contexto y no un threading.local: Strands ejecuta las herramientas anidadas en hilos
+# nuevos (asyncio.to_thread, run_async) que copian el contexto pero no el estado del hilo
+_active_dispatchers: contextvars.ContextVar[Tuple[int, ...]] = contextvars.ContextVar(
+    "active_dispatchers", default=()
+)
+
+
+class SpecialistTimeoutError(TimeoutError):
+    """Se lanza cuando un especialista no responde dentro de su timeout."""
+
+    def __init__(self, agent_id: str, timeout: float):
+        super().__init__(f"El especialista '{agent_id}' superó el timeout de {timeout:.0f}s")
+        self.agent_id = agent_id
+        self.timeout = timeout
+
+
+class SpecialistDispatcher:
+    """
+    Pool acotado de hilos para invocar especialistas de forma concurrente.
+
+    - max_concurrency limita cuántos especialistas se ejecutan a la vez
+    - Cada especialista tiene su propio timeout (o el timeout por defecto)
+    - Las invocaciones anidadas (un manager que consulta a sus subordinados desde
+      un hilo del pool, aunque sea a través de los hilos que crea Strands) se
+      ejecutan en línea para evitar bloqueos por saturación
+    """
+
+    def __init__(self, max_concurrency: int = 4, default_timeout: float = 300.0,
+                 timeouts: Optional[Dict[str, float]] = None):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency debe ser al menos 1")
+
+        self.max_concurrency = max_concurrency
+        self.default_timeout = default_timeout
+        self.timeouts: Dict[str, float] = dict(timeouts or {})
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix="specialist"
+        )
+
+    def get_timeout(self, agent_id: str) -> float:
+        """Obtiene el timeout configurado para un especialista."""
+        return self.timeouts.get(agent_id, self.default_timeout)
+
+    def set_timeout(self, agent_id: str, timeout: float):
+        """Configura el timeout de un especialista concreto."""
+        self.timeouts[agent_id] = timeout
+
+    def submit(self, agent_id: str, func: Callable[..., Any], *args: Any) -> Future:
+        """Programa la invocación de un especialista en el pool."""
+        active = _active_dispatchers.get()
+        if id(self) in active:
+            # La invocación ya ocupa un hilo del pool: ejecutar en línea
+            future: Future = Future()
+            try:
+                future.set_result(func(*args))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        def run_in_worker():
+            token = _active_dispatchers.set(active + (id(self),))
+            try:
+                return func(*args)
+            finally:
+                _active_dispatchers.reset(token)
+
+        logger.debug(f"Despachando invocación de '{agent_id}'")
+        # Propagar el contexto (p. ej. el span de traza activo) al hilo del pool
+        context = contextvars.copy_context()
+        return self._executor.submit(context.run, run_in_worker)
+
+    def run(self, agent_id: str, func: Callable[..., Any], *args: Any) -> Any:
+        """Ejecuta una invocación en el pool y espera su resultado respetando el timeout."""
+        timeout = self.get_timeout(agent_id)
+        future = self.submit(agent_id, func, *args)
+
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            # El hilo no se puede interrumpir; solo dejamos de esperar su resultado
+            future.cancel()
+            raise SpecialistTimeoutError(agent_id, timeout)
+
+    def fan_out(self, calls: Dict[str, Callable[[], Any]], deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Ejecuta varias invocaciones independientes en paralelo y une sus resultados.
+
+        Args:
+            calls: Diccionario agent_id -> función sin argumentos a ejecutar
+            deadline: Segundos máximos para el conjunto; acota el timeout de cada especialista
+
+        Returns:
+            Dict[str, Any]: Resultado de cada especialista, o la excepción que produjo
+                (SpecialistTimeoutError si superó su timeout)
+        """
+        started = time.monotonic()
+        futures = {agent_id: self.submit(agent_id, func) for agent_id, func in calls.items()}
+
+        results: Dict[str, Any] = {}
+        for agent_id, future in futures.items():
+            timeout = self.get_timeout(agent_id)
+            if deadline is not None:
+                timeout = min(timeout, deadline)
+            remaining = max(0.0, timeout - (time.monotonic() - started))
+            try:
+                results[agent_id] = future.result(timeout=remaining)
+            except FutureTimeoutError:
+                future.cancel()
+                results[agent_id] = SpecialistTimeoutError(agent_id, timeout)
+            except Exception as e:
+                results[agent_id] = e
+
+        logger.info(f"Fan-out de {len(calls)} especialistas completado en {time.monotonic() - started:.2f}s")
+        return results
+
+    def shutdown(self, wait: bool = False):
+        """Libera los hilos del pool."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
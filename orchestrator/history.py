@@ -0,0 +1,173 @@
+"""
+Gestión del historial de conversación de los agentes del grafo.
+Compacta el contexto que los agentes reutilizados reenvían al modelo en cada llamada.
+"""
+import json
+import logging
+from typing import Callable, Dict, List, Optional
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Estimación aproximada de caracteres por token
+CHARS_PER_TOKEN = 4
+
+Message = Dict
+Summarizer = Callable[[List[Message]], str]
+
+
+def _block_chars(block: Dict) -> int:
+    """Número aproximado de caracteres de un bloque de contenido."""
+    if "text" in block:
+        return len(block["text"])
+    return len(json.dumps(block, default=str))
+
+
+def estimate_tokens(messages: List[Message]) -> int:
+    """Estima los tokens de contexto de una lista de mensajes."""
+    chars = sum(_block_chars(block) for message in messages for block in message.get("content", []))
+    return chars // CHARS_PER_TOKEN
+
+
+def _is_turn_start(message: Message) -> bool:
+    """Un turno válido empieza con un mensaje de usuario que no es resultado de herramienta."""
+    return message.get("role") == "user" and not any(
+        "toolResult" in block for block in message.get("content", [])
+    )
+
+
+def _trim_to_turn_start(messages: List[Message], start: int) -> List[Message]:
+    """
+    Recorta el historial desde `start`, avanzando hasta el inicio de un turno.
+
+    Así nunca queda un toolResult huérfano sin su toolUse al principio del contexto.
+    """
+    while start < len(messages) and not _is_turn_start(messages[start]):
+        start += 1
+    return messages[start:]
+
+
+def extractive_summary(messages: List[Message], max_chars: int = 1500) -> str:
+    """Resumen barato sin modelo: primeras líneas de cada mensaje de texto."""
+    lines = []
+    for message in messages:
+        text = " ".join(block["text"] for block in message.get("content", []) if "text" in block).strip()
+        if text:
+            lines.append(f"- {message.get('role')}: {text.splitlines()[0][:200]}")
+
+    summary = "\n".join(lines)
+    return summary[-max_chars:]
+
+
+class HistoryPolicy:
+    """Política base: no modifica el historial."""
+
+    name = "none"
+
+    def compact(self, messages: List[Message]) -> List[Message]:
+        """Devuelve el historial compactado antes de una nueva invocación."""
+        return messages
+
+
+class SlidingWindowPolicy(HistoryPolicy):
+    """Conserva solo los últimos `max_messages` mensajes."""
+
+    name = "sliding_window"
+
+    def __init__(self, max_messages: int = 20):
+        self.max_messages = max_messages
+
+    def compact(self, messages: List[Message]) -> List[Message]:
+        if len(messages) <= self.max_messages:
+            return messages
+        return _trim_to_turn_start(messages, len(messages) - self.max_messages)
+
+
+class TokenBudgetPolicy(HistoryPolicy):
+    """Descarta los turnos más antiguos hasta que el contexto cabe en `max_tokens`."""
+
+    name = "token_budget"
+
+    def __init__(self, max_tokens: int = 8000):
+        self.max_tokens = max_tokens
+
+    def compact(self, messages: List[Message]) -> List[Message]:
+        # Tokens acumulados desde el final para encontrar el punto de corte en una pasada
+        budget = self.max_tokens
+        start = len(messages)
+        for index in range(len(messages) - 1, -1, -1):
+            budget -= estimate_tokens([messages[index]])
+            if budget < 0:
+                break
+            start = index
+
+        if start == 0:
+            return messages
+        return _trim_to_turn_start(messages, start)
+
+
+class SummarizingPolicy(HistoryPolicy):
+    """
+    Resume los turnos antiguos cuando el historial supera `max_messages`.
+
+    Se conservan los últimos `keep_last` mensajes y el resumen de los anteriores
+    se antepone al primer mensaje de usuario conservado. Por defecto el resumen
+    es extractivo (sin llamadas al modelo); se puede pasar un `summarizer` propio.
+    """
+
+    name = "summarize"
+
+    def __init__(self, max_messages: int = 30, keep_last: int = 10, summarizer: Optional[Summarizer] = None):
+        self.max_messages = max_messages
+        self.keep_last = keep_last
+        self.summarizer = summarizer or extractive_summary
+
+    def compact(self, messages: List[Message]) -> List[Message]:
+        if len(messages) <= self.max_messages:
+            return messages
+
+        kept = _trim_to_turn_start(messages, len(messages) - self.keep_last)
+        if not kept:
+            return kept
+
+        old = messages[:len(messages) - len(kept)]
+        summary = self.summarizer(old)
+        if not summary:
+            return kept
+
+        # Anteponer el resumen al primer mensaje de usuario sin alterar la alternancia de roles
+        first = dict(kept[0])
+        first["content"] = [{"text": f"Resumen de la conversación previa:\n{summary}"}] + list(first["content"])
+        return [first] + kept[1:]
+
+
+class ResetPerRequestPolicy(HistoryPolicy):
+    """Descarta todo el historial antes de cada invocación (especialistas sin estado)."""
+
+    name = "reset"
+
+    def compact(self, messages: List[Message]) -> List[Message]:
+        return []
+
+
+def create_history_policy(name: str, max_messages: int = 20, max_tokens: int = 8000) -> HistoryPolicy:
+    """
+    Crea una política de historial a partir de su nombre.
+
+    Args:
+        name: "none", "sliding_window", "token_budget", "summarize" o "reset"
+        max_messages: Mensajes máximos para las políticas basadas en número de mensajes
+        max_tokens: Presupuesto de tokens para la política token_budget
+    """
+    if name == "sliding_window":
+        return SlidingWindowPolicy(max_messages)
+    elif name == "token_budget":
+        return TokenBudgetPolicy(max_tokens)
+    elif name == "summarize":
+        return SummarizingPolicy(max_messages=max_messages, keep_last=max(2, max_messages // 2))
+    elif name == "reset":
+        return ResetPerRequestPolicy()
+    elif name == "none":
+        return HistoryPolicy()
+
+    raise ValueError(f"Política de historial '{name}' no soportada")
@@ -0,0 +1,288 @@
+"""
+Ejecución de la topología mesh: paso de mensajes por las aristas del grafo.
+
+Solo participan los miembros de la malla (`AgentGraph.mesh_nodes`). Cada arista
+`a -> b` entre ellos significa "la respuesta de `a` es una entrada de `b`". El
+planificador:
+
+- Elimina las aristas de retroceso (las que cierran un ciclo) con un recorrido en
+  profundidad, así que el grafo que se ejecuta siempre es un DAG
+- Calcula el nivel de cada nodo (saltos desde los nodos de entrada) y omite los
+  que superan `max_hops`
+- Arranca cada nodo en cuanto han terminado todos sus predecesores, con como
+  mucho `max_concurrency` nodos a la vez: las ramas independientes avanzan en
+  paralelo sin pasar por un coordinador
+- Da como respuesta la de los nodos finales (sin sucesores ejecutados)
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+
+from config.settings import MESH_MAX_CONCURRENCY, MESH_MAX_HOPS, SPECIALIST_TIMEOUT
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+
+def find_back_edges(node_ids: List[str], edges: Iterable[Any]) -> List[Tuple[str, str]]:
+    """
+    Aristas (origen, destino) que cierran un ciclo.
+
+    El recorrido en profundidad sigue el orden de `node_ids`, así que en un ciclo
+    se conserva la dirección que parte del nodo registrado antes.
+    """
+    successors = _successors(node_ids, edges)
+    back_edges: List[Tuple[str, str]] = []
+    state: Dict[str, int] = {}  # 1 = en la pila del recorrido, 2 = terminado
+    for root in node_ids:
+        if root in state:
+            continue
+        # Recorrido iterativo: (nodo, índice del siguiente sucesor)
+        stack = [(root, 0)]
+        state[root] = 1
+        while stack:
+            node_id, index = stack[-1]
+            targets = successors[node_id]
+            if index == len(targets):
+                state[node_id] = 2
+                stack.pop()
+                continue
+            stack[-1] = (node_id, index + 1)
+            target = targets[index]
+            if state.get(target) == 1:
+                back_edges.append((node_id, target))
+            elif target not in state:
+                state[target] = 1
+                stack.append((target, 0))
+    return back_edges
+
+
+def topological_levels(node_ids: List[str], edges: Iterable[Any]) -> List[List[str]]:
+    """
+    Nodos agrupados por nivel: el nivel de un nodo es el camino más largo desde
+    un nodo sin predecesores. Los nodos de un mismo nivel no dependen entre sí.
+
+    Raises:
+        ValueError: Si las aristas forman un ciclo
+    """
+    successors = _successors(node_ids, edges)
+    indegree = {node_id: 0 for node_id in node_ids}
+    for targets in successors.values():
+        for target in targets:
+            indegree[target] += 1
+
+    levels: List[List[str]] = []
+    current = [node_id for node_id in node_ids if indegree[node_id] == 0]
+    placed = 0
+    while current:
+        levels.append(current)
+        placed += len(current)
+        following = []
+        for node_id in current:
+            for target in successors[node_id]:
+                indegree[target] -= 1
+                if indegree[target] == 0:
+                    following.append(target)
+        current = following
+
+    if placed != len(node_ids):
+        cyclic = [node_id for node_id in node_ids if indegree[node_id] > 0]
+        raise ValueError(f"Las aristas forman un ciclo entre: {', '.join(cyclic)}")
+    return levels
+
+
+def _successors(node_ids: List[str], edges: Iterable[Any]) -> Dict[str, List[str]]:
+    """Sucesores de cada nodo (sin duplicados ni aristas a nodos desconocidos)."""
+    successors: Dict[str, List[str]] = {node_id: [] for node_id in node_ids}
+    for edge in edges:
+        source, target = (edge.from_agent, edge.to_agent) if hasattr(edge, "from_agent") else edge
+        if source in successors and target in successors and source != target and target not in successors[source]:
+            successors[source].append(target)
+    return successors
+
+
+@dataclass
+class MeshResult:
+    """Resultado de una ejecución mesh."""
+    answer: str
+    outputs: Dict[str, str] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    skipped: List[str] = field(default_factory=list)
+    levels: List[List[str]] = field(default_factory=list)
+    back_edges: List[Tuple[str, str]] = field(default_factory=list)
+
+
+class MeshScheduler:
+    """
+    Planificador por eventos de la topología mesh de un AgentGraph.
+
+    Args:
+        graph: Grafo cuyas aristas enrutan los mensajes
+        max_hops: Nivel máximo que se ejecuta (0 = solo los nodos de entrada)
+        max_concurrency: Nodos ejecutándose a la vez
+        node_timeout: Segundos máximos por nodo
+    """
+
+    def __init__(self, graph, max_hops: int = MESH_MAX_HOPS, max_concurrency: int = MESH_MAX_CONCURRENCY,
+                 node_timeout: float = SPECIALIST_TIMEOUT):
+        self.graph = graph
+        self.max_hops = max_hops
+        self.max_concurrency = max(1, max_concurrency)
+        self.node_timeout = node_timeout
+
+    def plan(self, entry_nodes: Optional[List[str]] = None) -> Tuple[Dict[str, List[str]], List[List[str]], List[Tuple[str, str]]]:
+        """
+        Calcula el DAG que se ejecutará sobre los miembros de la malla.
+
+        Returns:
+            (predecesores de cada nodo, niveles, aristas de retroceso eliminadas)
+
+        Raises:
+            ValueError: Si algún nodo de entrada no pertenece a la malla
+        """
+        node_ids = list(self.graph.mesh_nodes)
+        unknown = [node_id for node_id in entry_nodes or [] if node_id not in node_ids]
+        if unknown:
+            raise ValueError(f"Nodos de entrada fuera de la malla: {', '.join(unknown)}")
+        back_edges = find_back_edges(node_ids, self.graph.edges)
+        dag_edges = [(edge.from_agent, edge.to_agent) for edge in self.graph.edges
+                     if (edge.from_agent, edge.to_agent) not in back_edges]
+
+        # Solo participan los nodos alcanzables desde las entradas indicadas
+        if entry_nodes:
+            successors = _successors(node_ids, dag_edges)
+            reachable: Set[str] = set()
+            pending = list(entry_nodes)
+            while pending:
+                node_id = pending.pop()
+                if node_id not in reachable:
+                    reachable.add(node_id)
+                    pending.extend(successors[node_id])
+            node_ids = [node_id for node_id in node_ids if node_id in reachable]
+            dag_edges = [(source, target) for source, target in dag_edges if source in reachable and target in reachable]
+
+        predecessors: Dict[str, List[str]] = {node_id: [] for node_id in node_ids}
+        for source, targets in _successors(node_ids, dag_edges).items():
+            for target in targets:
+                predecessors[target].append(source)
+        return predecessors, topological_levels(node_ids, dag_edges), back_edges
+
+    async def astream(self, query: str, entry_nodes: Optional[List[str]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Ejecuta la consulta por la malla emitiendo eventos de progreso.
+
+        Eventos: {"mesh_node_start": {...}}, {"mesh_node_end": {...}}, {"mesh_node_skipped": {...}}
+        y, al final, {"mesh_result": MeshResult} y {"graph_result": str, "agent_id": "mesh"}.
+        """
+        predecessors, levels, back_edges = self.plan(entry_nodes)
+        for source, target in back_edges:
+            logger.warning(f"🔁 Arista {source} -> {target} ignorada: cierra un ciclo")
+
+        level_of = {node_id: depth for depth, level in enumerate(levels) for node_id in level}
+        runnable = [node_id for level in levels[:self.max_hops + 1] for node_id in level]
+        skipped = [node_id for level in levels[self.max_hops + 1:] for node_id in level]
+        for node_id in skipped:
+            logger.warning(f"⏭️  {node_id} omitido: está a {level_of[node_id]} saltos (máximo {self.max_hops})")
+            yield {"mesh_node_skipped": {"agent_id": node_id, "level": level_of[node_id]}}
+
+        successors: Dict[str, List[str]] = {node_id: [] for node_id in runnable}
+        waiting = {node_id: 0 for node_id in runnable}
+        for node_id in runnable:
+            for source in predecessors[node_id]:
+                successors[source].append(node_id)
+                waiting[node_id] += 1
+
+        outputs: Dict[str, str] = {}
+        errors: Dict[str, str] = {}
+        ready = [node_id for node_id in runnable if waiting[node_id] == 0]
+        running: Dict[asyncio.Task, Tuple[str, float]] = {}
+
+        try:
+            while ready or running:
+                # Arrancar los nodos listos hasta el límite de concurrencia
+                while ready and len(running) < self.max_concurrency:
+                    node_id = ready.pop(0)
+                    message = self._compose_message(query, node_id, predecessors[node_id], outputs, errors)
+                    task = asyncio.create_task(asyncio.wait_for(self.graph.asend_message(node_id, message),
+                                                                self.node_timeout))
+                    running[task] = (node_id, time.perf_counter())
+                    yield {"mesh_node_start": {"agent_id": node_id, "level": level_of[node_id],
+                                               "inputs": list(predecessors[node_id])}}
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    node_id, started = running.pop(task)
+                    status = "ok"
+                    try:
+                        outputs[node_id] = task.result()
+                    except asyncio.TimeoutError:
+                        status = "timeout"
+                        errors[node_id] = f"sin respuesta en {self.node_timeout:g}s"
+                    except Exception as e:
+                        status = "error"
+                        errors[node_id] = str(e)
+                    if status != "ok":
+                        logger.error(f"Nodo mesh '{node_id}' terminó con {status}: {errors[node_id]}")
+                    yield {"mesh_node_end": {"agent_id": node_id, "status": status,
+                                             "duration_ms": round((time.perf_counter() - started) * 1000, 1)}}
+
+                    # Entregar el mensaje a los sucesores
+                    for target in successors[node_id]:
+                        waiting[target] -= 1
+                        if waiting[target] == 0:
+                            ready.append(target)
+        finally:
+            for task in running:
+                task.cancel()
+
+        result = MeshResult(
+            answer=self._final_answer(runnable, successors, outputs, errors),
+            outputs=outputs,
+            errors=errors,
+            skipped=skipped,
+            levels=levels,
+            back_edges=back_edges
+        )
+        yield {"mesh_result": result}
+        yield {"graph_result": result.answer, "agent_id": "mesh"}
+
+    async def run(self, query: str, entry_nodes: Optional[List[str]] = None) -> MeshResult:
+        """Ejecuta la consulta por la malla y devuelve el resultado completo."""
+        result = None
+        async for event in self.astream(query, entry_nodes):
+            if "mesh_result" in event:
+                result = event["mesh_result"]
+        return result
+
+    def _compose_message(self, query: str, node_id: str, inputs: List[str],
+                         outputs: Dict[str, str], errors: Dict[str, str]) -> str:
+        """Mensaje de un nodo: la consulta original más las respuestas de sus predecesores."""
+        if not inputs:
+            return query
+        parts = [query, "", "Aportaciones de los agentes anteriores:"]
+        for source in inputs:
+            role = self.graph.nodes[source].role
+            if source in outputs:
+                parts.append(f"\n### {role} ({source})\n{outputs[source]}")
+            else:
+                parts.append(f"\n### {role} ({source})\n(no disponible: {errors.get(source, 'sin respuesta')})")
+        return "\n".join(parts)
+
+    def _final_answer(self, runnable: List[str], successors: Dict[str, List[str]],
+                      outputs: Dict[str, str], errors: Dict[str, str]) -> str:
+        """Respuesta de los nodos finales; si son varios, una sección por nodo."""
+        finals = [node_id for node_id in runnable if node_id in outputs
+                  and not any(target in outputs for target in successors[node_id])]
+        if not finals:
+            return "Ningún agente de la malla pudo responder: " + "; ".join(
+                f"{node_id}: {error}" for node_id, error in errors.items())
+        if len(finals) == 1 and not errors:
+            return outputs[finals[0]]
+
+        sections = [f"## {self.graph.nodes[node_id].role}\n\n{outputs[node_id]}" for node_id in finals]
+        if errors:
+            sections.append("⚠️ Respuesta parcial: " + ", ".join(
+                f"{self.graph.nodes[node_id].role} ({error})" for node_id, error in errors.items()))
+        return "\n\n".join(sections)
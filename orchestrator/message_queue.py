@@ -0,0 +1,115 @@
+"""
+Cola de mensajes acotada por nodo del grafo de agentes.
+Guarda registros compactos de cada consulta con una política de retención por número y por bytes.
+"""
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Iterator, Optional
+
+# Estados posibles de un registro
+STATUS_PENDING = "pending"
+STATUS_PROCESSED = "processed"
+STATUS_CACHED = "cached"
+STATUS_ERROR = "error"
+
+# Coste fijo aproximado de un registro sin contenido (objeto con __slots__)
+_RECORD_OVERHEAD_BYTES = 96
+
+
+class MessageRecord:
+    """Registro compacto de una consulta procesada por un nodo."""
+
+    __slots__ = ("timestamp", "status", "query_size", "response_size", "latency", "content", "error", "size")
+
+    def __init__(self, query: str, content_chars: int = 0):
+        self.timestamp = time.monotonic()
+        self.status = STATUS_PENDING
+        self.query_size = len(query)
+        self.response_size = 0
+        self.latency: Optional[float] = None
+        self.content = query[:content_chars] if content_chars > 0 else None
+        self.error: Optional[str] = None
+        self.size = _RECORD_OVERHEAD_BYTES + (len(self.content) if self.content else 0)
+
+    def complete(self, response: str, cached: bool = False):
+        """Marca el registro como procesado."""
+        self.status = STATUS_CACHED if cached else STATUS_PROCESSED
+        self.response_size = len(response)
+        self.latency = time.monotonic() - self.timestamp
+
+    def fail(self, error: Exception):
+        """Marca el registro como fallido."""
+        self.status = STATUS_ERROR
+        self.error = str(error)[:200]
+        self.latency = time.monotonic() - self.timestamp
+
+    @property
+    def processed(self) -> bool:
+        """Compatibilidad con el formato anterior basado en dicts."""
+        return self.status in (STATUS_PROCESSED, STATUS_CACHED)
+
+    def to_dict(self) -> Dict:
+        """Representación serializable del registro."""
+        return {
+            "timestamp": self.timestamp,
+            "status": self.status,
+            "query_size": self.query_size,
+            "response_size": self.response_size,
+            "latency": self.latency,
+            "content": self.content,
+            "error": self.error
+        }
+
+
+class BoundedMessageQueue:
+    """
+    Buffer circular de registros de mensajes.
+
+    Retiene como máximo `max_records` registros y `max_bytes` bytes estimados;
+    los más antiguos se descartan primero. El tamaño y los bytes se mantienen
+    incrementalmente, por lo que consultarlos es O(1).
+    """
+
+    def __init__(self, max_records: int = 100, max_bytes: int = 64 * 1024, content_chars: int = 0):
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.content_chars = content_chars
+
+        self._records: Deque[MessageRecord] = deque()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.total_recorded = 0
+
+    def record(self, query: str) -> MessageRecord:
+        """Crea un registro para una consulta y lo añade a la cola."""
+        message = MessageRecord(query, self.content_chars)
+
+        with self._lock:
+            self._records.append(message)
+            self._bytes += message.size
+            self.total_recorded += 1
+
+            # Aplicar la política de retención
+            while self._records and (len(self._records) > self.max_records or self._bytes > self.max_bytes):
+                self._bytes -= self._records.popleft().size
+
+        return message
+
+    def clear(self):
+        """Descarta todos los registros."""
+        with self._lock:
+            self._records.clear()
+            self._bytes = 0
+
+    @property
+    def bytes(self) -> int:
+        """Bytes estimados retenidos en la cola."""
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[MessageRecord]:
+        with self._lock:
+            return iter(list(self._records))
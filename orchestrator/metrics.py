@@ -0,0 +1,343 @@
+"""
+Métricas de latencia y tokens del grafo de agentes.
+Registra por nodo y por herramienta el número de llamadas, percentiles de
+latencia, tokens, errores y aciertos de caché, y los exporta en formato
+Prometheus o JSON.
+"""
+import json
+import logging
+import math
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Tuple
+
+from strands.hooks import (
+    AfterModelCallEvent,
+    AfterToolCallEvent,
+    BeforeModelCallEvent,
+    BeforeToolCallEvent,
+    HookProvider,
+    HookRegistry,
+)
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Percentiles publicados en los resúmenes
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Atributo con el que se marca un Agent ya instrumentado
+_INSTRUMENTED_ATTR = "_graph_metrics_hook"
+
+
+def _percentile(ordered: List[float], quantile: float) -> float:
+    """Percentil por el método del rango más cercano sobre valores ya ordenados."""
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(quantile * len(ordered)) - 1)]
+
+
+class LatencyStats:
+    """Contador de llamadas y errores con una ventana de las últimas latencias para los percentiles."""
+
+    __slots__ = ("count", "errors", "total_seconds", "samples")
+
+    def __init__(self, reservoir_size: int = 1024):
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.samples: deque = deque(maxlen=max(1, reservoir_size))
+
+    def observe(self, seconds: float, error: bool = False):
+        self.count += 1
+        self.total_seconds += seconds
+        self.samples.append(seconds)
+        if error:
+            self.errors += 1
+
+    def percentile(self, quantile: float) -> float:
+        """Percentil de las latencias de la ventana."""
+        return _percentile(sorted(self.samples), quantile)
+
+    def to_dict(self) -> Dict[str, Any]:
+        ordered = sorted(self.samples)
+        result = {
+            "count": self.count,
+            "errors": self.errors,
+            "total_ms": round(self.total_seconds * 1000, 1),
+            "avg_ms": round(self.total_seconds / self.count * 1000, 1) if self.count else 0.0
+        }
+        for quantile in QUANTILES:
+            result[f"p{int(quantile * 100)}_ms"] = round(_percentile(ordered, quantile) * 1000, 1)
+        return result
+
+
+class NodeMetrics:
+    """Métricas acumuladas de un nodo del grafo."""
+
+    def __init__(self, reservoir_size: int):
+        self.requests = LatencyStats(reservoir_size)
+        self.model_calls = LatencyStats(reservoir_size)
+        self.cache_hits = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.tools: Dict[str, LatencyStats] = {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests.to_dict(),
+            "cache_hits": self.cache_hits,
+            "model_calls": self.model_calls.to_dict(),
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "model_ms": round(self.model_calls.total_seconds * 1000, 1),
+            "tool_ms": round(sum(stats.total_seconds for stats in self.tools.values()) * 1000, 1),
+            "tools": {name: stats.to_dict() for name, stats in sorted(self.tools.items())}
+        }
+
+
+class NodeMetricsHook(HookProvider):
+    """
+    Hook que mide las llamadas al modelo y a las herramientas de los agentes de un nodo.
+
+    Las llamadas se emparejan por toolUseId (herramientas) o por instancia de Agent
+    (modelo), así que un mismo hook sirve para todas las instancias de un pool.
+    """
+
+    def __init__(self, metrics: "GraphMetrics", node_id: str):
+        self.metrics = metrics
+        self.node_id = node_id
+        self._tool_starts: Dict[str, float] = {}
+        self._model_starts: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeToolCallEvent, self._on_before_tool_call)
+        registry.add_callback(AfterToolCallEvent, self._on_after_tool_call)
+        registry.add_callback(BeforeModelCallEvent, self._on_before_model_call)
+        registry.add_callback(AfterModelCallEvent, self._on_after_model_call)
+
+    def _on_before_tool_call(self, event: BeforeToolCallEvent) -> None:
+        with self._lock:
+            self._tool_starts[event.tool_use.get("toolUseId", "")] = time.perf_counter()
+
+    def _on_after_tool_call(self, event: AfterToolCallEvent) -> None:
+        with self._lock:
+            started = self._tool_starts.pop(event.tool_use.get("toolUseId", ""), None)
+        if started is None:
+            return
+        result = event.result if isinstance(event.result, dict) else {}
+        error = getattr(event, "exception", None) is not None or result.get("status") == "error"
+        self.metrics.record_tool(self.node_id, event.tool_use.get("name", ""),
+                                 time.perf_counter() - started, error)
+
+    def _on_before_model_call(self, event: BeforeModelCallEvent) -> None:
+        with self._lock:
+            self._model_starts[id(event.agent)] = time.perf_counter()
+
+    def _on_after_model_call(self, event: AfterModelCallEvent) -> None:
+        with self._lock:
+            started = self._model_starts.pop(id(event.agent), None)
+        if started is None:
+            return
+        self.metrics.record_model_call(self.node_id, time.perf_counter() - started,
+                                       getattr(event, "exception", None) is not None)
+
+
+def token_usage(agent: Any) -> Tuple[int, int]:
+    """Tokens de entrada y salida acumulados por un Agent (0, 0 si no los expone)."""
+    usage = getattr(getattr(agent, "event_loop_metrics", None), "accumulated_usage", None) or {}
+    return usage.get("inputTokens", 0), usage.get("outputTokens", 0)
+
+
+class GraphMetrics:
+    """
+    Métricas de un grafo de agentes.
+
+    - `record_request`: una invocación completa de un nodo (latencia extremo a
+      extremo, errores, aciertos de caché y tokens consumidos)
+    - `record_tool` / `record_model_call`: llamadas individuales dentro del nodo,
+      alimentadas por NodeMetricsHook
+    - Las latencias se guardan en una ventana de `reservoir_size` muestras por
+      serie, así que la memoria es constante aunque el proceso viva semanas
+    """
+
+    def __init__(self, graph_id: str, reservoir_size: int = 1024):
+        self.graph_id = graph_id
+        self.reservoir_size = reservoir_size
+        self.started_at = time.time()
+        self._nodes: Dict[str, NodeMetrics] = {}
+        self._hooks: Dict[str, NodeMetricsHook] = {}
+        self._lock = threading.Lock()
+
+    def _node(self, node_id: str) -> NodeMetrics:
+        node = self._nodes.get(node_id)
+        if node is None:
+            node = self._nodes[node_id] = NodeMetrics(self.reservoir_size)
+        return node
+
+    def record_request(self, node_id: str, seconds: float, error: bool = False, cache_hit: bool = False,
+                       input_tokens: int = 0, output_tokens: int = 0):
+        """Registra una invocación de un nodo."""
+        with self._lock:
+            node = self._node(node_id)
+            node.requests.observe(seconds, error)
+            if cache_hit:
+                node.cache_hits += 1
+            node.input_tokens += max(0, input_tokens)
+            node.output_tokens += max(0, output_tokens)
+
+    def record_tool(self, node_id: str, tool_name: str, seconds: float, error: bool = False):
+        """Registra una llamada a una herramienta hecha por un nodo."""
+        with self._lock:
+            tools = self._node(node_id).tools
+            stats = tools.get(tool_name)
+            if stats is None:
+                stats = tools[tool_name] = LatencyStats(self.reservoir_size)
+            stats.observe(seconds, error)
+
+    def record_model_call(self, node_id: str, seconds: float, error: bool = False):
+        """Registra una llamada al modelo hecha por un nodo."""
+        with self._lock:
+            self._node(node_id).model_calls.observe(seconds, error)
+
+    def hook_for(self, node_id: str) -> NodeMetricsHook:
+        """Hook (compartido por todas las instancias del nodo) que alimenta estas métricas."""
+        with self._lock:
+            hook = self._hooks.get(node_id)
+            if hook is None:
+                hook = self._hooks[node_id] = NodeMetricsHook(self, node_id)
+            return hook
+
+    def instrument(self, node_id: str, agent: Any) -> Any:
+        """Registra el hook del nodo en un Agent, una sola vez por instancia."""
+        if agent is None or getattr(agent, _INSTRUMENTED_ATTR, None) is not None:
+            return agent
+        hooks = getattr(agent, "hooks", None)
+        if hooks is None:
+            return agent
+        hook = self.hook_for(node_id)
+        hooks.add_hook(hook)
+        setattr(agent, _INSTRUMENTED_ATTR, hook)
+        return agent
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copia serializable de todas las métricas."""
+        with self._lock:
+            nodes = {node_id: node.to_dict() for node_id, node in sorted(self._nodes.items())}
+        return {
+            "graph_id": self.graph_id,
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "nodes": nodes
+        }
+
+    def dump_json(self, path: str):
+        """Escribe la instantánea de métricas en un fichero JSON."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2, ensure_ascii=False)
+        logger.info(f"Métricas del grafo guardadas en {path}")
+
+    def to_prometheus(self) -> str:
+        """Métricas en el formato de texto de exposición de Prometheus."""
+        with self._lock:
+            nodes = sorted(self._nodes.items())
+            lines: List[str] = []
+
+            def header(name: str, kind: str, help_text: str):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+
+            def summary(name: str, series: Iterable[Tuple[Dict[str, str], LatencyStats]]):
+                for labels, stats in series:
+                    ordered = sorted(stats.samples)
+                    for quantile in QUANTILES:
+                        value = _percentile(ordered, quantile)
+                        lines.append(f"{name}{_labels({**labels, 'quantile': str(quantile)})} {value:.6f}")
+                    lines.append(f"{name}_sum{_labels(labels)} {stats.total_seconds:.6f}")
+                    lines.append(f"{name}_count{_labels(labels)} {stats.count}")
+
+            graph = {"graph": self.graph_id}
+
+            header("strands_node_requests_total", "counter", "Invocaciones de cada nodo")
+            for node_id, node in nodes:
+                lines.append(f"strands_node_requests_total{_labels({**graph, 'node': node_id})} {node.requests.count}")
+            header("strands_node_errors_total", "counter", "Invocaciones de cada nodo que terminaron en error")
+            for node_id, node in nodes:
+                lines.append(f"strands_node_errors_total{_labels({**graph, 'node': node_id})} {node.requests.errors}")
+            header("strands_node_cache_hits_total", "counter", "Invocaciones servidas desde la caché de respuestas")
+            for node_id, node in nodes:
+                lines.append(f"strands_node_cache_hits_total{_labels({**graph, 'node': node_id})} {node.cache_hits}")
+            header("strands_node_latency_seconds", "summary", "Latencia extremo a extremo de cada nodo")
+            summary("strands_node_latency_seconds",
+                    (({**graph, "node": node_id}, node.requests) for node_id, node in nodes))
+            header("strands_node_tokens_total", "counter", "Tokens consumidos por cada nodo")
+            for node_id, node in nodes:
+                for direction, value in (("input", node.input_tokens), ("output", node.output_tokens)):
+                    lines.append(f"strands_node_tokens_total"
+                                 f"{_labels({**graph, 'node': node_id, 'direction': direction})} {value}")
+            header("strands_model_calls_total", "counter", "Llamadas al modelo de cada nodo")
+            for node_id, node in nodes:
+                lines.append(f"strands_model_calls_total{_labels({**graph, 'node': node_id})} {node.model_calls.count}")
+            header("strands_model_latency_seconds", "summary", "Latencia de las llamadas al modelo")
+            summary("strands_model_latency_seconds",
+                    (({**graph, "node": node_id}, node.model_calls) for node_id, node in nodes))
+
+            tools = [({**graph, "node": node_id, "tool": name}, stats)
+                     for node_id, node in nodes for name, stats in sorted(node.tools.items())]
+            header("strands_tool_calls_total", "counter", "Llamadas a cada herramienta")
+            for labels, stats in tools:
+                lines.append(f"strands_tool_calls_total{_labels(labels)} {stats.count}")
+            header("strands_tool_errors_total", "counter", "Llamadas a cada herramienta que devolvieron error")
+            for labels, stats in tools:
+                lines.append(f"strands_tool_errors_total{_labels(labels)} {stats.errors}")
+            header("strands_tool_latency_seconds", "summary", "Latencia de cada herramienta")
+            summary("strands_tool_latency_seconds", tools)
+
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    """Etiquetas Prometheus escapadas: {k="v",...}."""
+    pairs = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def start_metrics_server(metrics: GraphMetrics, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Sirve /metrics (Prometheus) y /metrics.json en un hilo en segundo plano.
+
+    El endpoint no tiene autenticación: por defecto solo escucha en local.
+
+    Returns:
+        ThreadingHTTPServer: Servidor arrancado (llamar a shutdown() para pararlo)
+    """
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] == "/metrics":
+                body = metrics.to_prometheus().encode("utf-8")
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            elif self.path.split("?", 1)[0] == "/metrics.json":
+                body = json.dumps(metrics.snapshot(), ensure_ascii=False).encode("utf-8")
+                content_type = "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(f"metrics: {format % args}")
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True)
+    thread.start()
+    logger.info(f"📈 Métricas disponibles en http://{host}:{server.server_address[1]}/metrics")
+    return server
@@ -0,0 +1,230 @@
+"""
+Caché de respuestas para los agentes especialistas.
+Evita repetir llamadas al modelo para consultas idénticas o casi idénticas.
+"""
+import hashlib
+import logging
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Palabras sin carga semántica (español e inglés) que se ignoran al normalizar. Las de
+# dirección y negación (to/from, con/sin, no/not/without...) se conservan: cambian la respuesta
+_STOPWORDS = frozenset("""
+a an the of for in on at by and or is are be do does did how i my me we our you your
+what which who can could should would please about this that these those it its
+el la los las un una unos unas de del en y o u para por que como cual cuales mi mis
+tu tus su sus es son ser se le les lo me te nos hay puedo puedes debo quiero necesito sobre
+""".split())
+
+# Sufijos que se recortan para agrupar variantes ("sizing", "size", "sizes")
+_SUFFIXES = ("ing", "es", "ed", "s", "e")
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def _stem(token: str) -> str:
+    """Recorta sufijos comunes dejando al menos tres caracteres."""
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[:-len(suffix)]
+    return token
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normaliza una consulta para usarla como clave de caché.
+
+    Pasa a minúsculas, elimina acentos y puntuación, descarta stopwords y aplica un
+    stemming mínimo, de modo que "How do I size the NAT gateways?" y "How can I
+    size a NAT gateway" producen la misma clave. El orden de los términos se conserva para
+    que "Migrate from ECS to EKS" y "Migrate from EKS to ECS" no compartan respuesta.
+    """
+    text = unicodedata.normalize("NFKD", query.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    terms = [_stem(token) for token in _TOKEN_PATTERN.findall(text) if token not in _STOPWORDS]
+    return " ".join(terms)
+
+
+def hash_system_prompt(system_prompt: Optional[str]) -> str:
+    """Calcula un hash corto del system prompt de un agente."""
+    return hashlib.sha256((system_prompt or "").encode("utf-8")).hexdigest()[:16]
+
+
+def _cosine_similarity(a: Sequence[float], b: Sequence[float]) -> float:
+    """Similitud coseno entre dos vectores."""
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+@dataclass
+class CacheEntry:
+    """Respuesta almacenada en la caché."""
+    key: Tuple[str, str, str]
+    response: str
+    size: int
+    expires_at: float
+    embedding: Optional[Sequence[float]] = None
+
+
+class ResponseCache:
+    """
+    Caché LRU con TTL y límite de memoria para respuestas de agentes.
+
+    La clave combina el id del nodo, el hash del system prompt y la consulta
+    normalizada. Opcionalmente, si se proporciona un `embedder`, las consultas que
+    no coinciden exactamente se buscan por similitud de embeddings entre las
+    entradas del mismo nodo y prompt.
+
+    Cualquier objeto con los métodos get/put/stats/clear puede usarse en su lugar
+    como caché de un AgentNode.
+    """
+
+    def __init__(self, ttl: float = 3600.0, max_entries: int = 256, max_bytes: int = 4 * 1024 * 1024,
+                 embedder: Optional[Callable[[str], Sequence[float]]] = None,
+                 similarity_threshold: float = 0.92):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.embedder = embedder
+        self.similarity_threshold = similarity_threshold
+
+        self._entries: "OrderedDict[Tuple[str, str, str], CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        # Contadores globales y por nodo
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._node_stats: Dict[str, Dict[str, int]] = {}
+
+    def make_key(self, node_id: str, system_prompt: Optional[str], query: str) -> Tuple[str, str, str]:
+        """Construye la clave de caché para una consulta."""
+        return (node_id, hash_system_prompt(system_prompt), normalize_query(query))
+
+    def get(self, node_id: str, system_prompt: Optional[str], query: str) -> Optional[str]:
+        """Busca una respuesta en caché. Devuelve None si no hay coincidencia válida."""
+        key = self.make_key(node_id, system_prompt, query)
+
+        with self._lock:
+            self._evict_expired()
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self._count(node_id, "hits")
+                return entry.response
+
+            if self.embedder is None:
+                self.misses += 1
+                self._count(node_id, "misses")
+                return None
+
+        # Búsqueda por similitud: el embedding se calcula fuera del lock
+        query_embedding = self.embedder(query)
+
+        with self._lock:
+            entry = self._find_similar(key, query_embedding)
+            if entry is not None:
+                self._entries.move_to_end(entry.key)
+                self.hits += 1
+                self.semantic_hits += 1
+                self._count(node_id, "hits")
+                return entry.response
+
+            self.misses += 1
+            self._count(node_id, "misses")
+            return None
+
+    def put(self, node_id: str, system_prompt: Optional[str], query: str, response: str):
+        """Almacena la respuesta de un agente."""
+        key = self.make_key(node_id, system_prompt, query)
+        size = len(response.encode("utf-8")) + len(key[2])
+
+        # Respuestas más grandes que toda la caché no se almacenan
+        if size > self.max_bytes:
+            return
+
+        embedding = self.embedder(query) if self.embedder is not None else None
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+
+            self._entries[key] = CacheEntry(key, response, size, time.monotonic() + self.ttl, embedding)
+            self._bytes += size
+
+            # Expulsar las entradas menos usadas hasta respetar los límites
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+
+    def clear(self):
+        """Vacía la caché manteniendo los contadores."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self, node_id: Optional[str] = None) -> Dict:
+        """Obtiene los contadores de la caché, globales o de un nodo concreto."""
+        with self._lock:
+            if node_id is not None:
+                return dict(self._node_stats.get(node_id, {"hits": 0, "misses": 0}))
+
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+    def _count(self, node_id: str, counter: str):
+        """Incrementa un contador por nodo."""
+        node_stats = self._node_stats.setdefault(node_id, {"hits": 0, "misses": 0})
+        node_stats[counter] += 1
+
+    def _evict_expired(self):
+        """Elimina las entradas cuyo TTL ha vencido."""
+        now = time.monotonic()
+        expired = [key for key, entry in self._entries.items() if entry.expires_at <= now]
+        for key in expired:
+            self._bytes -= self._entries.pop(key).size
+            self.evictions += 1
+
+    def _find_similar(self, key: Tuple[str, str, str],
+                      query_embedding: Sequence[float]) -> Optional[CacheEntry]:
+        """Busca la entrada más parecida del mismo nodo y prompt por similitud de embeddings."""
+        candidates = [
+            entry for entry in self._entries.values()
+            if entry.key[:2] == key[:2] and entry.embedding is not None
+        ]
+        if not candidates:
+            return None
+
+        best_entry, best_score = None, self.similarity_threshold
+        for entry in candidates:
+            score = _cosine_similarity(query_embedding, entry.embedding)
+            if score >= best_score:
+                best_entry, best_score = entry, score
+
+        if best_entry is not None:
+            logger.debug(f"Coincidencia semántica en caché (similitud {best_score:.3f})")
+        return best_entry
@@ -0,0 +1,258 @@
+"""
+Enrutador local de intenciones: elige especialistas sin llamar al modelo.
+
+El índice combina dos fuentes:
+
+- TF-IDF sobre los system prompts de `agents/<id>/prompts.py` (los términos que
+  aparecen en todos los prompts, como las instrucciones de uso de herramientas,
+  pesan cero)
+- Palabras clave curadas por especialista (`ROUTING_KEYWORDS`), que son la señal
+  fuerte; admiten frases de varias palabras
+
+Una consulta se enruta solo si la decisión es clara:
+
+- Se eligen todos los especialistas que superan `min_score`; si son más de
+  `max_specialists`, la consulta es ambigua (nunca se descarta en silencio a un
+  especialista que la consulta necesita)
+- Cada elegido tiene al menos `min_keyword_hits` coincidencias con sus palabras
+  clave (una sola palabra no basta)
+- El mejor de los descartados queda al menos `margin` veces por debajo
+
+El resto de consultas vuelven al coordinador (LLM).
+"""
+import importlib
+import logging
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import (
+    ROUTER_MARGIN,
+    ROUTER_MAX_SPECIALISTS,
+    ROUTER_MIN_KEYWORD_HITS,
+    ROUTER_MIN_SCORE,
+)
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Especialistas que conoce el enrutador (id de agente = paquete en agents/)
+SPECIALISTS = ("aws_expert", "networking", "cicd", "iac", "kubernetes")
+
+# Señales fuertes por especialista (en minúsculas y sin acentos). Se evitan las palabras
+# genéricas que aparecen en consultas de otros dominios ("red", "build", "stack", "cluster"...)
+ROUTING_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "aws_expert": (
+        "aws", "ec2", "s3", "lambda", "rds", "dynamodb", "iam", "bedrock", "cloudwatch", "sqs", "sns",
+        "ecs", "fargate", "aurora", "cloudfront", "costo", "costos", "coste", "costes", "cost",
+        "cost explorer", "billing", "factura", "facturacion", "well-architected", "inventario"
+    ),
+    "networking": (
+        "vpc", "subnet", "subnets", "subred", "subredes", "cidr", "nat", "nat gateway", "internet gateway",
+        "transit gateway", "peering", "vpc peering", "route table", "tabla de rutas", "enrutamiento",
+        "security group", "security groups", "acl", "nacl", "direct connect", "vpn", "dns", "route 53",
+        "route53", "privatelink", "load balancer", "balanceador", "conectividad", "redes", "network",
+        "networking"
+    ),
+    "cicd": (
+        "ci/cd", "cicd", "pipeline", "pipelines", "github actions", "workflow de github", "gitlab ci",
+        "jenkins", "codepipeline", "codebuild", "codedeploy", "despliegue continuo", "integracion continua",
+        "continuous integration", "continuous delivery", "blue/green", "canary", "argo cd", "argocd"
+    ),
+    "iac": (
+        "terraform", "cloudformation", "cdk", "pulumi", "iac", "infrastructure as code",
+        "infraestructura como codigo", "hcl", "tfstate", "state file", "modulo de terraform",
+        "terraform module", "cloudformation stack", "sam"
+    ),
+    "kubernetes": (
+        "kubernetes", "k8s", "eks", "kubectl", "helm", "pod", "pods", "deployment de kubernetes",
+        "namespace", "ingress", "service mesh", "istio", "karpenter", "autoscaler", "hpa",
+        "contenedor", "contenedores", "container", "containers", "nodegroup", "manifest",
+        "manifiesto", "manifiestos"
+    ),
+}
+
+# Peso de cada palabra clave curada frente al TF-IDF de los prompts
+KEYWORD_WEIGHT = 1.0
+
+# Palabras vacías que no aportan al índice
+_STOPWORDS = frozenset("""
+a al algo ante como con cual cuando de del desde donde el ella en entre es esta este esto estos
+hay la las le lo los mas me mi mis muy no o para pero por que se si sin sobre su sus te tu tus un
+una uno unos y ya yo and are as at be by can do for from how i in is it my of on or the this to
+what when which with you your quiero necesito puedes ayuda ayudame
+""".split())
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:[/.\-][a-z0-9]+)*")
+
+
+def normalize(text: str) -> str:
+    """Minúsculas y sin acentos."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: str) -> List[str]:
+    """Términos del texto normalizado, sin palabras vacías."""
+    return [token for token in _TOKEN.findall(normalize(text)) if token not in _STOPWORDS and len(token) > 1]
+
+
+@dataclass
+class RouteDecision:
+    """Resultado de enrutar una consulta."""
+    specialists: List[str]
+    confident: bool
+    scores: Dict[str, float] = field(default_factory=dict)
+    reason: str = ""
+
+    @property
+    def primary(self) -> Optional[str]:
+        return self.specialists[0] if self.specialists else None
+
+
+class IntentRouter:
+    """
+    Clasificador léxico de consultas por especialista.
+
+    El índice es un diccionario término -> [(especialista, peso)], así que
+    clasificar una consulta cuesta unas pocas búsquedas por término.
+    """
+
+    def __init__(self, documents: Dict[str, str], keywords: Optional[Dict[str, Tuple[str, ...]]] = None,
+                 min_score: float = 1.0, margin: float = 2.0, max_specialists: int = 3,
+                 min_keyword_hits: int = 2):
+        self.specialists = list(documents)
+        self.min_score = min_score
+        self.margin = margin
+        self.max_specialists = max_specialists
+        self.min_keyword_hits = min_keyword_hits
+
+        # término -> [(especialista, peso, es palabra clave curada)]
+        self._index: Dict[str, List[Tuple[str, float, bool]]] = {}
+        self._phrases: Dict[str, re.Pattern] = {}
+        self._build_tfidf(documents)
+        self._build_keywords(keywords or {})
+
+        self._lock = threading.Lock()
+        self._counts = {"routed": 0, "fallback": 0}
+
+    @classmethod
+    def from_agent_prompts(cls, specialists=SPECIALISTS, **kwargs) -> "IntentRouter":
+        """Construye el índice con los system prompts de `agents/<id>/prompts.py`."""
+        documents = {}
+        for agent_id in specialists:
+            module = importlib.import_module(f"agents.{agent_id}.prompts")
+            prompts = [value for name, value in vars(module).items()
+                       if name.endswith("_SYSTEM_PROMPT") and isinstance(value, str)]
+            documents[agent_id] = "\n".join(prompts)
+        keywords = {agent_id: ROUTING_KEYWORDS.get(agent_id, ()) for agent_id in specialists}
+        return cls(documents, keywords, **kwargs)
+
+    def route(self, query: str) -> RouteDecision:
+        """Clasifica una consulta entre los especialistas."""
+        scores, hits = self._score(query)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        chosen = [(spec_id, score) for spec_id, score in ranked if score >= self.min_score]
+        specialists = [spec_id for spec_id, _ in chosen]
+        weak = [spec_id for spec_id in specialists if hits[spec_id] < self.min_keyword_hits]
+
+        if not chosen:
+            decision = RouteDecision([], False, scores, "sin señal suficiente")
+        elif len(chosen) > self.max_specialists:
+            decision = RouteDecision(specialists, False, scores,
+                                     f"{len(chosen)} especialistas relevantes (máximo {self.max_specialists})")
+        elif weak:
+            decision = RouteDecision(specialists, False, scores,
+                                     f"pocas palabras clave para {', '.join(weak)}")
+        else:
+            rest = ranked[len(chosen)][1] if len(ranked) > len(chosen) else 0.0
+            weakest = chosen[-1][1]
+            if rest * self.margin <= weakest:
+                decision = RouteDecision(specialists, True, scores)
+            else:
+                decision = RouteDecision(specialists, False, scores,
+                                         f"margen insuficiente ({weakest:.2f} frente a {rest:.2f})")
+
+        with self._lock:
+            self._counts["routed" if decision.confident else "fallback"] += 1
+        return decision
+
+    def score(self, query: str) -> Dict[str, float]:
+        """Puntuación de cada especialista para la consulta."""
+        return self._score(query)[0]
+
+    def _score(self, query: str) -> Tuple[Dict[str, float], Dict[str, int]]:
+        """Puntuación y número de palabras clave encontradas de cada especialista."""
+        scores = dict.fromkeys(self.specialists, 0.0)
+        hits = dict.fromkeys(self.specialists, 0)
+        for term, count in Counter(tokenize(query)).items():
+            entries = self._index.get(term)
+            # Plural simple: "vpcs" -> "vpc", "pipelines" -> "pipeline"
+            if entries is None and len(term) > 3 and term.endswith("s"):
+                entries = self._index.get(term[:-1])
+            for spec_id, weight, is_keyword in entries or ():
+                scores[spec_id] += weight * count
+                if is_keyword:
+                    hits[spec_id] += count
+        if self._phrases:
+            text = normalize(query)
+            for spec_id, pattern in self._phrases.items():
+                found = len(pattern.findall(text))
+                scores[spec_id] += KEYWORD_WEIGHT * found
+                hits[spec_id] += found
+        return scores, hits
+
+    def stats(self) -> Dict:
+        """Obtiene los contadores de consultas enrutadas y devueltas al coordinador."""
+        with self._lock:
+            return {"terms": len(self._index), **self._counts}
+
+    def _build_tfidf(self, documents: Dict[str, str]):
+        """Pesos TF-IDF normalizados (L2) de cada prompt; idf = ln(N / df)."""
+        term_counts = {spec_id: Counter(tokenize(text)) for spec_id, text in documents.items()}
+        doc_freq = Counter(term for counts in term_counts.values() for term in counts)
+        total_docs = len(documents)
+
+        for spec_id, counts in term_counts.items():
+            weights = {term: (1 + math.log(count)) * math.log(total_docs / doc_freq[term])
+                       for term, count in counts.items()}
+            norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+            for term, weight in weights.items():
+                if weight > 0:
+                    self._index.setdefault(term, []).append((spec_id, weight / norm, False))
+
+    def _build_keywords(self, keywords: Dict[str, Tuple[str, ...]]):
+        """Las palabras sueltas van al índice; las frases, a una expresión regular por especialista."""
+        for spec_id, words in keywords.items():
+            phrases = []
+            for word in words:
+                normalized = normalize(word)
+                if _TOKEN.fullmatch(normalized):
+                    self._index.setdefault(normalized, []).append((spec_id, KEYWORD_WEIGHT, True))
+                else:
+                    phrases.append(re.escape(normalized))
+            if phrases:
+                self._phrases[spec_id] = re.compile(r"(?<![a-z0-9])(?:" + "|".join(phrases) + r")(?![a-z0-9])")
+
+
+_default_router: Optional[IntentRouter] = None
+_default_router_lock = threading.Lock()
+
+
+def get_intent_router() -> IntentRouter:
+    """Devuelve el enrutador compartido configurado en settings."""
+    global _default_router
+    if _default_router is None:
+        with _default_router_lock:
+            if _default_router is None:
+                _default_router = IntentRouter.from_agent_prompts(
+                    min_score=ROUTER_MIN_SCORE,
+                    margin=ROUTER_MARGIN,
+                    max_specialists=ROUTER_MAX_SPECIALISTS,
+                    min_keyword_hits=ROUTER_MIN_KEYWORD_HITS
+                )
+    return _default_router
@@ -0,0 +1,369 @@
+"""
+Trazas jerárquicas del grafo de agentes.
+Cada ejecución del flujo de trabajo abre una traza con spans hijos por
+invocación de especialista, llamada al modelo y llamada a herramienta, y las
+trazas terminadas se exportan en OTLP/JSON (una línea por traza) a un fichero
+local para analizarlas o convertirlas en flame graphs.
+"""
+import contextvars
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+from strands.hooks import (
+    AfterModelCallEvent,
+    AfterToolCallEvent,
+    BeforeModelCallEvent,
+    BeforeToolCallEvent,
+    HookProvider,
+    HookRegistry,
+)
+
+from config.settings import ENABLE_TRACING, TRACE_EXPORT_PATH, TRACE_SERVICE_NAME
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Tipos de span y códigos de estado de OTLP
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+# Atributo con el que se marca un Agent ya instrumentado
+_INSTRUMENTED_ATTR = "_graph_tracing_hook"
+
+# Span activo en el contexto actual (se propaga a hilos y tareas con copy_context)
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+@dataclass
+class Span:
+    """Operación con tiempo de inicio y fin dentro de una traza."""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str] = None
+    kind: int = SPAN_KIND_INTERNAL
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status_code: int = STATUS_OK
+    status_message: str = ""
+    events: List[Dict[str, Any]] = field(default_factory=list)
+
+    def set_attribute(self, key: str, value: Any):
+        if value is not None:
+            self.attributes[key] = value
+
+    def record_exception(self, error: BaseException):
+        """Marca el span como fallido y añade el evento de excepción."""
+        self.status_code = STATUS_ERROR
+        self.status_message = str(error)[:500]
+        self.events.append({
+            "name": "exception",
+            "time_ns": time.time_ns(),
+            "attributes": {"exception.type": type(error).__name__, "exception.message": str(error)[:500]}
+        })
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Representación OTLP/JSON del span."""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": self.status_code}
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        if self.events:
+            span["events"] = [
+                {"timeUnixNano": str(event["time_ns"]), "name": event["name"],
+                 "attributes": _otlp_attributes(event["attributes"])}
+                for event in self.events
+            ]
+        return span
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+class OTLPJsonFileExporter:
+    """
+    Exporta trazas en OTLP/JSON a un fichero JSON Lines.
+
+    Los spans se acumulan por traza y se escriben juntos cuando termina el span
+    raíz. Los spans que terminan después que su raíz (p. ej. un especialista que
+    superó el timeout) se escriben por separado con el mismo traceId.
+    """
+
+    def __init__(self, path: str, service_name: str = "strands-agents-ecosystem", max_pending_spans: int = 10000):
+        self.path = path
+        self.service_name = service_name
+        self.max_pending_spans = max_pending_spans
+        self._pending: Dict[str, List[Span]] = {}
+        self._pending_count = 0
+        self._closed: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.exported_traces = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def on_end(self, span: Span):
+        """Recibe un span terminado."""
+        with self._lock:
+            if span.trace_id in self._closed or self._pending_count >= self.max_pending_spans:
+                batch = [span]
+            elif span.parent_span_id is None:
+                batch = self._pending.pop(span.trace_id, []) + [span]
+                self._pending_count -= len(batch) - 1
+                self._closed[span.trace_id] = None
+                if len(self._closed) > 1024:
+                    self._closed.popitem(last=False)
+                self.exported_traces += 1
+            else:
+                self._pending.setdefault(span.trace_id, []).append(span)
+                self._pending_count += 1
+                return
+
+            self._write(batch)
+
+    def _write(self, spans: List[Span]):
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+                "scopeSpans": [{
+                    "scope": {"name": __name__},
+                    "spans": [span.to_otlp() for span in spans]
+                }]
+            }]
+        }
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(payload, separators=(",", ":"), ensure_ascii=False, default=str) + "\n")
+        except OSError as e:
+            logger.warning(f"No se pudo exportar la traza a {self.path}: {str(e)}")
+
+
+class _NoopSpan:
+    """Span que no registra nada (trazas desactivadas)."""
+    trace_id = ""
+    span_id = ""
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def record_exception(self, error: BaseException):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Crea spans enlazados con el span activo del contexto y los envía al exportador."""
+
+    def __init__(self, exporter: Optional[OTLPJsonFileExporter] = None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def start(self, name: str, kind: int = SPAN_KIND_INTERNAL, parent: Optional[Span] = None,
+              attributes: Optional[Dict[str, Any]] = None) -> Span:
+        """Abre un span hijo de `parent` (o del span activo) sin activarlo."""
+        parent = parent or _current_span.get()
+        return Span(
+            name=name,
+            trace_id=parent.trace_id if parent else secrets.token_hex(16),
+            span_id=secrets.token_hex(8),
+            parent_span_id=parent.span_id if parent else None,
+            kind=kind,
+            attributes=dict(attributes or {})
+        )
+
+    def end(self, span: Span):
+        """Cierra un span y lo exporta."""
+        span.end_ns = time.time_ns()
+        if self.exporter is not None:
+            self.exporter.on_end(span)
+
+    @contextmanager
+    def span(self, name: str, attributes: Optional[Dict[str, Any]] = None,
+             kind: int = SPAN_KIND_INTERNAL) -> Iterator[Any]:
+        """Abre un span, lo activa en el contexto mientras dura el bloque y lo cierra al salir."""
+        if not self.enabled:
+            yield _NOOP_SPAN
+            return
+
+        parent = _current_span.get()
+        span = self.start(name, kind, parent, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            if isinstance(e, Exception):
+                span.record_exception(e)
+            raise
+        finally:
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # Generador cerrado desde otro contexto: basta con restaurar el padre
+                _current_span.set(parent)
+            self.end(span)
+
+
+def current_span() -> Optional[Span]:
+    """Span activo en el contexto actual."""
+    return _current_span.get()
+
+
+def current_trace_id() -> Optional[str]:
+    """Id de la traza activa en el contexto actual."""
+    span = _current_span.get()
+    return span.trace_id if span else None
+
+
+class TracingHook(HookProvider):
+    """
+    Hook que abre spans para las llamadas al modelo y a herramientas de un nodo.
+
+    El span de una herramienta se activa mientras se ejecuta, de modo que las
+    invocaciones de especialistas que hace la herramienta quedan anidadas bajo él.
+    """
+
+    def __init__(self, tracer: Tracer, node_id: str):
+        self.tracer = tracer
+        self.node_id = node_id
+        self._tool_spans: Dict[str, tuple] = {}
+        self._model_spans: Dict[int, Span] = {}
+        self._lock = threading.Lock()
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeToolCallEvent, self._on_before_tool_call)
+        registry.add_callback(AfterToolCallEvent, self._on_after_tool_call)
+        registry.add_callback(BeforeModelCallEvent, self._on_before_model_call)
+        registry.add_callback(AfterModelCallEvent, self._on_after_model_call)
+
+    def _on_before_tool_call(self, event: BeforeToolCallEvent) -> None:
+        tool_name = event.tool_use.get("name", "")
+        tool_use_id = event.tool_use.get("toolUseId", "")
+        parent = _current_span.get()
+        span = self.tracer.start(f"tool {tool_name}", attributes={
+            "agent.node": self.node_id,
+            "tool.name": tool_name,
+            "tool.use_id": tool_use_id
+        })
+        _current_span.set(span)
+        with self._lock:
+            self._tool_spans[tool_use_id] = (span, parent)
+
+    def _on_after_tool_call(self, event: AfterToolCallEvent) -> None:
+        with self._lock:
+            entry = self._tool_spans.pop(event.tool_use.get("toolUseId", ""), None)
+        if entry is None:
+            return
+        span, parent = entry
+        _current_span.set(parent)
+
+        result = event.result if isinstance(event.result, dict) else {}
+        exception = getattr(event, "exception", None)
+        if exception is not None:
+            span.record_exception(exception)
+        elif result.get("status") == "error":
+            span.status_code = STATUS_ERROR
+        span.set_attribute("tool.status", result.get("status"))
+        self.tracer.end(span)
+
+    def _on_before_model_call(self, event: BeforeModelCallEvent) -> None:
+        span = self.tracer.start("model.invoke", SPAN_KIND_CLIENT, attributes={"agent.node": self.node_id})
+        span.set_attribute("gen_ai.request.model", _model_id(event.agent))
+        span.set_attribute("gen_ai.usage.projected_input_tokens", getattr(event, "projected_input_tokens", None))
+        with self._lock:
+            self._model_spans[id(event.agent)] = span
+
+    def _on_after_model_call(self, event: AfterModelCallEvent) -> None:
+        with self._lock:
+            span = self._model_spans.pop(id(event.agent), None)
+        if span is None:
+            return
+        exception = getattr(event, "exception", None)
+        if exception is not None:
+            span.record_exception(exception)
+        stop_response = getattr(event, "stop_response", None)
+        if stop_response is not None:
+            span.set_attribute("gen_ai.response.stop_reason", str(stop_response.stop_reason))
+        self.tracer.end(span)
+
+
+def _model_id(agent: Any) -> Optional[str]:
+    """Id del modelo configurado en un Agent, si se puede obtener."""
+    try:
+        config = agent.model.get_config()
+    except Exception:
+        return None
+    return config.get("model_id") if isinstance(config, dict) else None
+
+
+class TraceContextFilter(logging.Filter):
+    """Añade `trace_id` (abreviado) a los registros de log para correlacionarlos con las trazas."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        trace_id = current_trace_id()
+        record.trace_id = trace_id[:16] if trace_id else "-"
+        return True
+
+
+_default_tracer: Optional[Tracer] = None
+_default_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Devuelve el tracer compartido configurado en settings."""
+    global _default_tracer
+    if _default_tracer is None:
+        with _default_tracer_lock:
+            if _default_tracer is None:
+                exporter = OTLPJsonFileExporter(TRACE_EXPORT_PATH, TRACE_SERVICE_NAME) if ENABLE_TRACING else None
+                _default_tracer = Tracer(exporter)
+    return _default_tracer
+
+
+def instrument_agent(node_id: str, agent: Any, tracer: Optional[Tracer] = None) -> Any:
+    """Registra en un Agent el hook de trazas del nodo, una sola vez por instancia."""
+    tracer = tracer or get_tracer()
+    if not tracer.enabled or agent is None or getattr(agent, _INSTRUMENTED_ATTR, None) is not None:
+        return agent
+    hooks = getattr(agent, "hooks", None)
+    if hooks is None:
+        return agent
+    hook = TracingHook(tracer, node_id)
+    hooks.add_hook(hook)
+    setattr(agent, _INSTRUMENTED_ATTR, hook)
+    return agent
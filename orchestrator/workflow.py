@@ -0,0 +1,375 @@
+"""
+Flujos de trabajo declarativos sobre el grafo de agentes.
+
+Un flujo es un DAG de tareas; cada tarea se asigna a un agente del grafo y su
+mensaje es una plantilla que puede usar la consulta original y las respuestas
+de otras tareas:
+
+    {
+      "name": "vpc_delivery",
+      "tasks": [
+        {"id": "vpc_design", "agent": "networking", "prompt": "Diseña la VPC para: {{query}}"},
+        {"id": "terraform", "agent": "iac", "prompt": "Escribe el Terraform de este diseño:\\n{{vpc_design}}"},
+        {"id": "pipeline", "agent": "cicd", "prompt": "Crea el pipeline que despliega:\\n{{terraform}}"}
+      ],
+      "outputs": ["terraform", "pipeline"]
+    }
+
+- Las tareas citadas en la plantilla son dependencias implícitas; `depends_on`
+  añade dependencias que no se citan
+- Una tarea arranca en cuanto terminan sus dependencias, así que las tareas de
+  un mismo nivel topológico se ejecutan en paralelo
+- Cada tarea se reintenta hasta `retries` veces con espera exponencial; si falla
+  del todo, las tareas que dependen de ella se omiten
+- Las respuestas se memorizan por (agente, mensaje): repetir un flujo, o una
+  tarea cuyas entradas no han cambiado, no vuelve a llamar al modelo
+- `outputs` son las tareas que forman la respuesta (por defecto, las finales)
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from config.settings import (
+    SPECIALIST_TIMEOUT,
+    WORKFLOW_MAX_CONCURRENCY,
+    WORKFLOW_MEMO_SIZE,
+    WORKFLOW_RETRY_BACKOFF,
+    WORKFLOW_TASK_RETRIES,
+)
+from orchestrator.mesh import topological_levels
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Referencias de las plantillas: {{query}} o {{id_de_tarea}}
+_PLACEHOLDER = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+
+QUERY_PLACEHOLDER = "query"
+
+
+@dataclass
+class WorkflowTask:
+    """Tarea del flujo (ver docstring del módulo)."""
+    id: str
+    agent: str
+    prompt: str
+    depends_on: List[str] = field(default_factory=list)
+    retries: Optional[int] = None
+    timeout: Optional[float] = None
+
+    @property
+    def references(self) -> List[str]:
+        """Tareas citadas en la plantilla del mensaje."""
+        names = dict.fromkeys(_PLACEHOLDER.findall(self.prompt))
+        names.pop(QUERY_PLACEHOLDER, None)
+        return list(names)
+
+    @property
+    def dependencies(self) -> List[str]:
+        return list(dict.fromkeys(self.depends_on + self.references))
+
+    def render(self, query: str, outputs: Dict[str, str]) -> str:
+        """Sustituye las referencias por la consulta y las respuestas de las dependencias."""
+        def substitute(match: re.Match) -> str:
+            name = match.group(1)
+            return query if name == QUERY_PLACEHOLDER else outputs[name]
+        return _PLACEHOLDER.sub(substitute, self.prompt)
+
+
+@dataclass
+class Workflow:
+    """DAG de tareas validado: dependencias conocidas y sin ciclos."""
+    name: str
+    tasks: List[WorkflowTask]
+    outputs: List[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.task_map: Dict[str, WorkflowTask] = {}
+        for task in self.tasks:
+            if task.id == QUERY_PLACEHOLDER or task.id in self.task_map:
+                raise ValueError(f"Flujo '{self.name}': id de tarea no válido o repetido '{task.id}'")
+            self.task_map[task.id] = task
+
+        for task in self.tasks:
+            unknown = [dep for dep in task.dependencies if dep not in self.task_map]
+            if unknown:
+                raise ValueError(f"Flujo '{self.name}': la tarea '{task.id}' depende de tareas "
+                                 f"desconocidas: {', '.join(unknown)}")
+        for task_id in self.outputs:
+            if task_id not in self.task_map:
+                raise ValueError(f"Flujo '{self.name}': la salida '{task_id}' no es una tarea")
+
+        try:
+            self.levels = topological_levels(list(self.task_map), self.edges)
+        except ValueError as e:
+            raise ValueError(f"Flujo '{self.name}': {e}") from None
+
+    @property
+    def edges(self) -> List[Tuple[str, str]]:
+        return [(dep, task.id) for task in self.tasks for dep in task.dependencies]
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Workflow":
+        tasks = [
+            WorkflowTask(
+                id=task["id"],
+                agent=task["agent"],
+                prompt=task["prompt"],
+                depends_on=list(task.get("depends_on", [])),
+                retries=task.get("retries"),
+                timeout=task.get("timeout")
+            )
+            for task in data.get("tasks", [])
+        ]
+        return cls(data.get("name", "workflow"), tasks, list(data.get("outputs", [])))
+
+    @classmethod
+    def from_file(cls, path: str) -> "Workflow":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+@dataclass
+class WorkflowResult:
+    """Resultado de ejecutar un flujo."""
+    answer: str
+    outputs: Dict[str, str] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    skipped: List[str] = field(default_factory=list)
+    attempts: Dict[str, int] = field(default_factory=dict)
+    memo_hits: List[str] = field(default_factory=list)
+    duration_ms: float = 0.0
+
+
+class WorkflowExecutor:
+    """
+    Ejecuta flujos sobre un AgentGraph.
+
+    Args:
+        graph: Grafo con los agentes de las tareas
+        max_concurrency: Tareas ejecutándose a la vez
+        retries: Reintentos por tarea (si la tarea no indica los suyos)
+        retry_backoff: Espera antes del primer reintento; se duplica en cada uno
+        task_timeout: Segundos máximos por intento (si la tarea no indica el suyo)
+        memo_size: Respuestas memorizadas por (agente, mensaje); 0 la desactiva
+    """
+
+    def __init__(self, graph, max_concurrency: int = WORKFLOW_MAX_CONCURRENCY,
+                 retries: int = WORKFLOW_TASK_RETRIES, retry_backoff: float = WORKFLOW_RETRY_BACKOFF,
+                 task_timeout: float = SPECIALIST_TIMEOUT, memo_size: int = WORKFLOW_MEMO_SIZE):
+        self.graph = graph
+        self.max_concurrency = max(1, max_concurrency)
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.task_timeout = task_timeout
+        self.memo_size = memo_size
+
+        self._memo: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def validate(self, workflow: Workflow):
+        """Comprueba que el grafo tiene los agentes de todas las tareas."""
+        missing = sorted({task.agent for task in workflow.tasks if task.agent not in self.graph.nodes})
+        if missing:
+            raise ValueError(f"Flujo '{workflow.name}': agentes no encontrados en el grafo: {', '.join(missing)}")
+
+    async def astream(self, workflow: Workflow, query: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Ejecuta el flujo emitiendo eventos de progreso.
+
+        Eventos: {"workflow_task_start": {...}}, {"workflow_task_end": {...}},
+        {"workflow_task_skipped": {...}} y, al final, {"workflow_result": WorkflowResult}
+        y {"graph_result": str, "agent_id": "workflow"}.
+        """
+        self.validate(workflow)
+        started = time.perf_counter()
+
+        dependents: Dict[str, List[str]] = {task_id: [] for task_id in workflow.task_map}
+        waiting: Dict[str, int] = {}
+        for task in workflow.tasks:
+            waiting[task.id] = len(task.dependencies)
+            for dep in task.dependencies:
+                dependents[dep].append(task.id)
+
+        result = WorkflowResult(answer="")
+        ready = [task.id for task in workflow.tasks if waiting[task.id] == 0]
+        running: Dict[asyncio.Task, Tuple[str, float]] = {}
+
+        try:
+            while ready or running:
+                while ready and len(running) < self.max_concurrency:
+                    task = workflow.task_map[ready.pop(0)]
+                    message = task.render(query, result.outputs)
+                    running[asyncio.create_task(self._run_task(task, message, result))] = (task.id, time.perf_counter())
+                    yield {"workflow_task_start": {"task_id": task.id, "agent_id": task.agent,
+                                                   "inputs": task.dependencies}}
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for finished in done:
+                    task_id, task_started = running.pop(finished)
+                    status = "ok"
+                    try:
+                        result.outputs[task_id] = finished.result()
+                    except Exception as e:
+                        status = "error"
+                        result.errors[task_id] = str(e) or type(e).__name__
+                    if task_id in result.memo_hits:
+                        status = "memo"
+                    yield {"workflow_task_end": {"task_id": task_id, "status": status,
+                                                 "attempts": result.attempts.get(task_id, 0),
+                                                 "duration_ms": round((time.perf_counter() - task_started) * 1000, 1)}}
+
+                    if status == "error":
+                        # Sin esta respuesta no se pueden componer los mensajes de las dependientes
+                        for skipped in self._downstream(task_id, dependents, result):
+                            result.skipped.append(skipped)
+                            logger.warning(f"⏭️  Tarea '{skipped}' omitida: depende de '{task_id}', que ha fallado")
+                            yield {"workflow_task_skipped": {"task_id": skipped, "cause": task_id}}
+                        continue
+                    for dependent in dependents[task_id]:
+                        waiting[dependent] -= 1
+                        if waiting[dependent] == 0 and dependent not in result.skipped:
+                            ready.append(dependent)
+        finally:
+            for pending in running:
+                pending.cancel()
+
+        result.answer = self._final_answer(workflow, result)
+        result.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        logger.info(f"Flujo '{workflow.name}' completado en {result.duration_ms:.0f} ms: "
+                    f"{len(result.outputs)} tareas, {len(result.errors)} fallidas, {len(result.skipped)} omitidas, "
+                    f"{len(result.memo_hits)} memorizadas")
+        yield {"workflow_result": result}
+        yield {"graph_result": result.answer, "agent_id": "workflow"}
+
+    async def arun(self, workflow: Workflow, query: str) -> WorkflowResult:
+        """Ejecuta el flujo y devuelve el resultado completo."""
+        result = None
+        async for event in self.astream(workflow, query):
+            if "workflow_result" in event:
+                result = event["workflow_result"]
+        return result
+
+    def clear_memo(self):
+        with self._lock:
+            self._memo.clear()
+
+    async def _run_task(self, task: WorkflowTask, message: str, result: WorkflowResult) -> str:
+        """Invoca el agente de la tarea con memorización, timeout y reintentos."""
+        key = self._memo_key(task.agent, message)
+        cached = self._memo_get(key)
+        if cached is not None:
+            result.memo_hits.append(task.id)
+            return cached
+
+        retries = self.retries if task.retries is None else task.retries
+        timeout = self.task_timeout if task.timeout is None else task.timeout
+        attempt = 0
+        while True:
+            attempt += 1
+            result.attempts[task.id] = attempt
+            try:
+                answer = await asyncio.wait_for(self.graph.asend_message(task.agent, message), timeout)
+                break
+            except Exception as e:
+                if attempt > retries:
+                    if isinstance(e, asyncio.TimeoutError):
+                        raise TimeoutError(f"sin respuesta en {timeout:g}s") from None
+                    raise
+                delay = self.retry_backoff * (2 ** (attempt - 1))
+                logger.warning(f"Tarea '{task.id}' falló (intento {attempt}/{retries + 1}): {str(e) or type(e).__name__}; "
+                               f"reintento en {delay:g}s")
+                await asyncio.sleep(delay)
+
+        self._memo_put(key, answer)
+        return answer
+
+    @staticmethod
+    def _downstream(task_id: str, dependents: Dict[str, List[str]], result: WorkflowResult) -> List[str]:
+        """Tareas que dependen (directa o indirectamente) de una tarea, sin las ya omitidas."""
+        found: List[str] = []
+        pending = list(dependents[task_id])
+        while pending:
+            dependent = pending.pop(0)
+            if dependent not in found and dependent not in result.skipped:
+                found.append(dependent)
+                pending.extend(dependents[dependent])
+        return found
+
+    def _final_answer(self, workflow: Workflow, result: WorkflowResult) -> str:
+        """Respuesta de las tareas de salida; si son varias, una sección por tarea."""
+        depended = {dep for task in workflow.tasks for dep in task.dependencies}
+        output_ids = workflow.outputs or [task_id for task_id in workflow.task_map if task_id not in depended]
+        answered = [task_id for task_id in output_ids if task_id in result.outputs]
+        problems = [f"{task_id} ({error})" for task_id, error in result.errors.items()]
+        problems += [f"{task_id} (omitida)" for task_id in result.skipped]
+
+        if not answered:
+            return f"El flujo '{workflow.name}' no produjo respuesta: " + ", ".join(problems)
+        if len(answered) == 1 and not problems:
+            return result.outputs[answered[0]]
+
+        sections = [f"## {task_id}\n\n{result.outputs[task_id]}" for task_id in answered]
+        if problems:
+            sections.append("⚠️ Respuesta parcial: " + ", ".join(problems))
+        return "\n\n".join(sections)
+
+    def _memo_key(self, agent_id: str, message: str) -> str:
+        return hashlib.sha256(f"{agent_id}\x00{message}".encode("utf-8")).hexdigest()
+
+    def _memo_get(self, key: str) -> Optional[str]:
+        if self.memo_size <= 0:
+            return None
+        with self._lock:
+            answer = self._memo.get(key)
+            if answer is not None:
+                self._memo.move_to_end(key)
+            return answer
+
+    def _memo_put(self, key: str, answer: str):
+        if self.memo_size <= 0:
+            return
+        with self._lock:
+            self._memo[key] = answer
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+
+
+def create_vpc_delivery_workflow() -> Dict:
+    """Flujo VPC -> Terraform -> pipeline; la estimación de costes corre en paralelo con el Terraform."""
+    return {
+        "name": "vpc_delivery",
+        "tasks": [
+            {
+                "id": "vpc_design",
+                "agent": "networking",
+                "prompt": "Diseña la VPC (CIDR, subredes por AZ, NAT, tablas de rutas y security groups) "
+                          "para este requisito:\n\n{{query}}"
+            },
+            {
+                "id": "cost_estimate",
+                "agent": "aws_expert",
+                "prompt": "Estima el coste mensual y propone optimizaciones para este diseño de red:\n\n{{vpc_design}}"
+            },
+            {
+                "id": "terraform",
+                "agent": "iac",
+                "prompt": "Escribe los módulos de Terraform que implementan este diseño de VPC:\n\n{{vpc_design}}"
+            },
+            {
+                "id": "pipeline",
+                "agent": "cicd",
+                "prompt": "Crea un pipeline de GitHub Actions que valide (fmt, validate, plan) y aplique "
+                          "este código de Terraform:\n\n{{terraform}}"
+            }
+        ],
+        "outputs": ["vpc_design", "terraform", "pipeline", "cost_estimate"]
+    }
@@ -0,0 +1,108 @@
+"""
+Pruebas del pool de instancias de agentes: reutilización, límite de tamaño y expulsión por inactividad.
+"""
+import threading
+import unittest
+from unittest import mock
+
+from orchestrator import agent_pool
+from orchestrator.agent_pool import AgentPool, AgentPoolExhaustedError
+
+
+class StubAgent:
+
+    def __init__(self):
+        self.messages = []
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class AgentPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(agent_pool.time, "monotonic", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_warm_and_reuse(self):
+        pool = AgentPool(StubAgent, min_size=2, max_size=4)
+        self.assertEqual(pool.stats()["created"], 2)
+
+        agent = pool.acquire()
+        agent.messages.append({"role": "user"})
+        pool.release(agent)
+
+        self.assertIs(pool.acquire(), agent)
+        self.assertEqual(agent.messages, [])
+        self.assertEqual(pool.stats()["created"], 2)
+
+    def test_exhausted_pool_times_out(self):
+        pool = AgentPool(StubAgent, min_size=0, max_size=1)
+        pool.acquire()
+        with self.assertRaises(AgentPoolExhaustedError):
+            pool.acquire(timeout=0)
+        self.assertIsNone(pool.try_acquire())
+
+    def test_waiter_gets_released_instance(self):
+        pool = AgentPool(StubAgent, min_size=0, max_size=1)
+        agent = pool.acquire()
+        threading.Timer(0.05, pool.release, (agent,)).start()
+        self.assertIs(pool.acquire(timeout=5), agent)
+        self.assertEqual(pool.stats()["waits"], 1)
+
+    def test_idle_instances_above_min_size_are_evicted_on_release(self):
+        pool = AgentPool(StubAgent, min_size=1, max_size=4, idle_timeout=10)
+        agents = [pool.acquire() for _ in range(3)]
+        for agent in agents[:2]:
+            pool.release(agent)
+
+        self.clock.now += 11
+        pool.release(agents[2])
+
+        stats = pool.stats()
+        self.assertEqual((stats["size"], stats["idle"], stats["evicted"]), (1, 1, 2))
+        self.assertIs(pool.acquire(), agents[2])
+
+    def test_idle_instances_are_evicted_on_acquire(self):
+        pool = AgentPool(StubAgent, min_size=1, max_size=4, idle_timeout=10)
+        agents = [pool.acquire() for _ in range(3)]
+        for agent in agents:
+            pool.release(agent)
+
+        self.clock.now += 11
+        pool.acquire()
+
+        stats = pool.stats()
+        self.assertEqual((stats["size"], stats["in_use"], stats["evicted"]), (1, 1, 2))
+
+    def test_min_size_is_never_evicted(self):
+        pool = AgentPool(StubAgent, min_size=2, max_size=4, idle_timeout=10)
+        self.clock.now += 100
+        self.assertEqual(pool.evict_idle(), 0)
+        self.assertEqual(pool.stats()["size"], 2)
+
+    def test_factory_error_frees_the_slot(self):
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("fallo al crear")
+            return StubAgent()
+
+        pool = AgentPool(flaky, min_size=0, max_size=1)
+        with self.assertRaises(RuntimeError):
+            pool.acquire()
+        self.assertIsInstance(pool.acquire(timeout=0), StubAgent)
+
+
+if __name__ == "__main__":
+    unittest.main()
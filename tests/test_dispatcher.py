@@ -0,0 +1,53 @@
+"""
+Pruebas del despacho concurrente de especialistas con invocaciones anidadas.
+"""
+import asyncio
+import threading
+import unittest
+
+from orchestrator.dispatcher import SpecialistDispatcher
+
+
+class NestedDispatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dispatcher = SpecialistDispatcher(max_concurrency=1, default_timeout=5.0)
+
+    def tearDown(self):
+        self.dispatcher.shutdown()
+
+    def test_nested_dispatch_from_new_thread_runs_inline(self):
+        """Como Strands: el manager consulta a su subordinado desde un hilo nuevo (asyncio.to_thread)."""
+        def subordinate():
+            return threading.current_thread().name
+
+        def manager():
+            return asyncio.run(asyncio.to_thread(self.dispatcher.run, "subordinate", subordinate))
+
+        # Con un único hilo en el pool, volver a encolar la invocación anidada la bloquearía
+        result = self.dispatcher.run("manager", manager)
+        self.assertNotIn("specialist", result)
+
+    def test_nested_fan_out_does_not_starve_pool(self):
+        def leaf(name):
+            return lambda: name
+
+        def manager():
+            return asyncio.run(asyncio.to_thread(
+                self.dispatcher.fan_out, {"a": leaf("a"), "b": leaf("b")}
+            ))
+
+        self.assertEqual(self.dispatcher.run("manager", manager), {"a": "a", "b": "b"})
+
+    def test_other_dispatcher_still_uses_its_pool(self):
+        other = SpecialistDispatcher(max_concurrency=1, default_timeout=5.0)
+        self.addCleanup(other.shutdown)
+
+        def manager():
+            return other.run("subordinate", lambda: threading.current_thread().name)
+
+        self.assertTrue(self.dispatcher.run("manager", manager).startswith("specialist"))
+
+
+if __name__ == "__main__":
+    unittest.main()
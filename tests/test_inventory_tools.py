@@ -0,0 +1,89 @@
+"""
+Pruebas de los filtros por tipo de recurso del inventario multirregión (clientes simulados, sin red).
+"""
+import json
+import unittest
+from unittest import mock
+
+from common.tools import inventory_tools
+
+# Respuesta de cada operación de listado
+_RESPONSES = {
+    "describe_instances": {"Reservations": [{"Instances": [
+        {"InstanceId": "i-1", "State": {"Name": "running"}}
+    ]}]},
+    "describe_vpcs": {"Vpcs": [{"VpcId": "vpc-1"}]},
+    "list_functions": {"Functions": [
+        {"FunctionName": "a", "Runtime": "python3.12"},
+        {"FunctionName": "b", "Runtime": "nodejs20.x"}
+    ]},
+}
+
+
+class StubClient:
+    """Cliente boto3 mínimo que registra los argumentos de cada llamada."""
+
+    def __init__(self, calls):
+        self.calls = calls
+
+    def can_paginate(self, method):
+        return False
+
+    def __getattr__(self, method):
+        def operation(**kwargs):
+            self.calls.append((method, kwargs))
+            return _RESPONSES[method]
+        return operation
+
+
+class StubClientPool:
+
+    def __init__(self):
+        self.calls = []
+
+    def call(self, service, operation, region=None):
+        return operation(StubClient(self.calls))
+
+
+class ScanFiltersTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = StubClientPool()
+        patcher = mock.patch.object(inventory_tools, "get_client_pool", return_value=self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def scan(self, filters):
+        return json.loads(inventory_tools.scan_aws_inventory(
+            regions=["us-east-1"],
+            resource_types=["ec2:instances", "ec2:vpcs", "lambda:functions"],
+            filters=filters
+        ))
+
+    def test_filters_apply_only_to_their_resource_type(self):
+        result = self.scan({
+            "ec2:instances": {"instance-state-name": "running"},
+            "lambda:functions": {"runtime": "python3.12"}
+        })
+
+        sent = dict(self.pool.calls)
+        self.assertEqual(sent["describe_instances"],
+                         {"Filters": [{"Name": "instance-state-name", "Values": ["running"]}]})
+        self.assertEqual(sent["describe_vpcs"], {})
+        self.assertEqual(result["counts"], {
+            "ec2:instances": {"us-east-1": 1},
+            "ec2:vpcs": {"us-east-1": 1},
+            "lambda:functions": {"us-east-1": 1}
+        })
+        self.assertEqual(result["failures"], [])
+
+    def test_untyped_filter_is_reported_not_applied(self):
+        result = self.scan({"instance-state-name": "running"})
+
+        self.assertTrue(all(kwargs == {} for _, kwargs in self.pool.calls))
+        self.assertEqual(result["counts"]["lambda:functions"], {"us-east-1": 2})
+        self.assertEqual([failure["resource_type"] for failure in result["failures"]], ["instance-state-name"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+Pruebas del planificador de la topología mesh con un grafo simulado (sin agentes ni red).
+"""
+import asyncio
+import time
+import unittest
+from types import SimpleNamespace
+
+from orchestrator.agent_graph import AgentEdge
+from orchestrator.mesh import MeshScheduler, find_back_edges, topological_levels
+
+
+class StubGraph:
+    """Grafo mínimo: miembros de la malla, aristas y una respuesta simulada por nodo."""
+
+    def __init__(self, mesh_nodes, edges, extra_nodes=(), delays=None, failures=None):
+        self.mesh_nodes = list(mesh_nodes)
+        self.edges = [AgentEdge(source, target) for source, target in edges]
+        self.nodes = {node_id: SimpleNamespace(role=node_id.upper())
+                      for node_id in self.mesh_nodes + list(extra_nodes)}
+        self.delays = delays or {}
+        self.failures = failures or {}
+        self.messages = {}
+
+    async def asend_message(self, node_id, message):
+        self.messages[node_id] = message
+        await asyncio.sleep(self.delays.get(node_id, 0))
+        if node_id in self.failures:
+            raise RuntimeError(self.failures[node_id])
+        return f"{node_id}-out"
+
+
+class PlanTest(unittest.TestCase):
+
+    def test_back_edge_follows_registration_order(self):
+        edges = [("a", "b"), ("b", "c"), ("c", "a")]
+        self.assertEqual(find_back_edges(["a", "b", "c"], edges), [("c", "a")])
+        self.assertEqual(find_back_edges(["b", "c", "a"], edges), [("a", "b")])
+
+    def test_levels_reject_cycles(self):
+        self.assertEqual(topological_levels(["a", "b", "c"], [("a", "b"), ("a", "c")]), [["a"], ["b", "c"]])
+        with self.assertRaises(ValueError):
+            topological_levels(["a", "b"], [("a", "b"), ("b", "a")])
+
+    def test_plan_only_uses_mesh_members(self):
+        graph = StubGraph(["a", "b"], [("a", "b"), ("b", "x"), ("x", "a")], extra_nodes=["x"])
+        predecessors, levels, back_edges = MeshScheduler(graph).plan()
+
+        self.assertEqual(levels, [["a"], ["b"]])
+        self.assertEqual(predecessors, {"a": [], "b": ["a"]})
+        self.assertEqual(back_edges, [])
+        with self.assertRaises(ValueError):
+            MeshScheduler(graph).plan(["x"])
+
+    def test_entry_nodes_limit_plan_to_reachable(self):
+        graph = StubGraph(["a", "b", "c"], [("a", "c"), ("b", "c")])
+        _, levels, _ = MeshScheduler(graph).plan(["b"])
+        self.assertEqual(levels, [["b"], ["c"]])
+
+
+class RunTest(unittest.TestCase):
+
+    def run_mesh(self, graph, max_hops=5, max_concurrency=4, node_timeout=5.0, entry_nodes=None):
+        scheduler = MeshScheduler(graph, max_hops=max_hops, max_concurrency=max_concurrency,
+                                  node_timeout=node_timeout)
+        return asyncio.run(scheduler.run("consulta", entry_nodes))
+
+    def test_cycle_is_broken_and_outputs_flow_along_edges(self):
+        graph = StubGraph(["a", "b", "c"], [("a", "b"), ("b", "c"), ("c", "a")])
+        result = self.run_mesh(graph)
+
+        self.assertEqual(result.back_edges, [("c", "a")])
+        self.assertEqual(result.answer, "c-out")
+        self.assertEqual(graph.messages["a"], "consulta")
+        self.assertIn("b-out", graph.messages["c"])
+        self.assertNotIn("a-out", graph.messages["c"])
+
+    def test_nodes_beyond_max_hops_are_skipped(self):
+        graph = StubGraph(["a", "b", "c", "d"], [("a", "b"), ("a", "c"), ("b", "d"), ("c", "d")])
+        result = self.run_mesh(graph, max_hops=1)
+
+        self.assertEqual(result.skipped, ["d"])
+        self.assertNotIn("d", graph.messages)
+        self.assertEqual(set(result.outputs), {"a", "b", "c"})
+        self.assertIn("## B", result.answer)
+        self.assertIn("## C", result.answer)
+
+    def test_failed_predecessor_is_reported_to_successor(self):
+        graph = StubGraph(["a", "b", "c"], [("a", "c"), ("b", "c")], failures={"b": "boom"})
+        result = self.run_mesh(graph)
+
+        self.assertEqual(result.errors, {"b": "boom"})
+        self.assertIn("(no disponible: boom)", graph.messages["c"])
+        self.assertIn("Respuesta parcial", result.answer)
+
+    def test_node_timeout(self):
+        graph = StubGraph(["a"], [], delays={"a": 1.0})
+        result = self.run_mesh(graph, node_timeout=0.05)
+        self.assertIn("a", result.errors)
+        self.assertIn("Ningún agente", result.answer)
+
+    def test_independent_branches_run_concurrently(self):
+        graph = StubGraph(["a", "b", "c"], [("a", "b"), ("a", "c")], delays={"b": 0.2, "c": 0.2})
+
+        started = time.perf_counter()
+        self.run_mesh(graph, max_concurrency=2)
+        self.assertLess(time.perf_counter() - started, 0.35)
+
+        started = time.perf_counter()
+        self.run_mesh(graph, max_concurrency=1)
+        self.assertGreaterEqual(time.perf_counter() - started, 0.4)
+
+
+if __name__ == "__main__":
+    unittest.main()
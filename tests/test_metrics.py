@@ -0,0 +1,32 @@
+"""
+Pruebas de los percentiles publicados por las métricas del grafo.
+"""
+import unittest
+
+from orchestrator.metrics import LatencyStats, _percentile
+
+
+class PercentileTest(unittest.TestCase):
+
+    def test_nearest_rank(self):
+        self.assertEqual(_percentile(list(range(1, 11)), 0.5), 5)
+        self.assertEqual(_percentile(list(range(1, 101)), 0.95), 95)
+        self.assertEqual(_percentile([1, 2], 0.5), 1)
+        self.assertEqual(_percentile(list(range(1, 9)), 0.5), 4)
+
+    def test_bounds(self):
+        self.assertEqual(_percentile([], 0.5), 0.0)
+        self.assertEqual(_percentile([7], 0.99), 7)
+        self.assertEqual(_percentile(list(range(1, 101)), 0.99), 99)
+        self.assertEqual(_percentile(list(range(1, 101)), 1.0), 100)
+        self.assertEqual(_percentile(list(range(1, 101)), 0.0), 1)
+
+    def test_latency_stats_sort_samples(self):
+        stats = LatencyStats()
+        for seconds in (0.4, 0.1, 0.3, 0.2):
+            stats.observe(seconds)
+        self.assertEqual(stats.percentile(0.5), 0.2)
+
+
+if __name__ == "__main__":
+    unittest.main()
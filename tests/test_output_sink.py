@@ -0,0 +1,123 @@
+"""
+Pruebas del escritor de salida con cola: agrupación y políticas de contrapresión.
+"""
+import threading
+import time
+import unittest
+
+from common.utils.output_sink import BufferedOutputWriter, MemorySink, OutputSink
+
+
+class GatedSink(MemorySink):
+    """MemorySink que retiene cada escritura hasta que se abre la puerta."""
+
+    def __init__(self):
+        super().__init__()
+        self.entered = threading.Event()
+        self.gate = threading.Event()
+
+    def write(self, text: str):
+        self.entered.set()
+        self.gate.wait(5)
+        super().write(text)
+
+
+class OutputSinkTest(unittest.TestCase):
+
+    def test_sink_is_abstract(self):
+        with self.assertRaises(TypeError):
+            OutputSink()
+
+
+class CoalescingTest(unittest.TestCase):
+
+    def test_small_writes_are_grouped_into_few_batches(self):
+        sink = MemorySink()
+        writer = BufferedOutputWriter(sink, flush_interval=0.2, flush_chars=4096)
+        self.addCleanup(writer.close)
+
+        chunks = [f"token{i} " for i in range(200)]
+        for chunk in chunks:
+            writer.write(chunk)
+        self.assertTrue(writer.flush())
+
+        self.assertEqual(sink.getvalue(), "".join(chunks))
+        self.assertLessEqual(len(sink.batches), 2)
+
+    def test_flush_chars_threshold_writes_before_interval(self):
+        sink = MemorySink()
+        writer = BufferedOutputWriter(sink, flush_interval=10.0, flush_chars=8)
+        self.addCleanup(writer.close)
+
+        writer.write("x" * 16)
+        started = time.monotonic()
+        self.assertTrue(writer.flush(timeout=2.0))
+        self.assertLess(time.monotonic() - started, 2.0)
+        self.assertEqual(sink.getvalue(), "x" * 16)
+
+    def test_unbuffered_writes_synchronously(self):
+        sink = MemorySink()
+        writer = BufferedOutputWriter(sink, buffered=False)
+        writer.write("a")
+        writer.write("b")
+        self.assertEqual(sink.batches, ["a", "b"])
+
+
+class BackpressureTest(unittest.TestCase):
+
+    def stalled_writer(self, backpressure: str, block_timeout: float = 0.5):
+        """Escritor cuyo sink está ocupado con un primer lote: lo siguiente se queda pendiente."""
+        sink = GatedSink()
+        writer = BufferedOutputWriter(sink, flush_interval=0.0, max_pending_chars=10,
+                                      backpressure=backpressure, block_timeout=block_timeout)
+        self.addCleanup(writer.close)
+        self.addCleanup(sink.gate.set)
+        writer.write("first|")
+        self.assertTrue(sink.entered.wait(2))
+        return sink, writer
+
+    def test_drop_oldest_keeps_newest_text(self):
+        sink, writer = self.stalled_writer("drop_oldest")
+        writer.write("b" * 6)
+        writer.write("c" * 6)
+        sink.gate.set()
+        writer.flush()
+
+        self.assertEqual(sink.getvalue(), "first|" + "c" * 6)
+        self.assertEqual(writer.stats()["dropped_chars"], 6)
+
+    def test_drop_new_keeps_pending_text(self):
+        sink, writer = self.stalled_writer("drop_new")
+        writer.write("b" * 6)
+        writer.write("c" * 6)
+        sink.gate.set()
+        writer.flush()
+
+        self.assertEqual(sink.getvalue(), "first|" + "b" * 6)
+        self.assertEqual(writer.stats()["dropped_chars"], 6)
+
+    def test_block_waits_for_room(self):
+        sink, writer = self.stalled_writer("block", block_timeout=2.0)
+        writer.write("b" * 6)
+        threading.Timer(0.05, sink.gate.set).start()
+        writer.write("c" * 6)
+        writer.flush()
+
+        self.assertEqual(sink.getvalue(), "first|" + "b" * 6 + "c" * 6)
+        self.assertEqual(writer.stats()["dropped_chars"], 0)
+
+    def test_block_drops_after_timeout(self):
+        sink, writer = self.stalled_writer("block", block_timeout=0.05)
+        writer.write("b" * 6)
+        started = time.monotonic()
+        writer.write("c" * 6)
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
+        sink.gate.set()
+        writer.flush()
+
+        self.assertEqual(sink.getvalue(), "first|" + "b" * 6)
+        self.assertEqual(writer.stats()["dropped_chars"], 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Pruebas de la caché de respuestas: normalización de claves, TTL y expulsión LRU.
+"""
+import unittest
+from unittest import mock
+
+from orchestrator import response_cache
+from orchestrator.response_cache import ResponseCache, normalize_query
+
+
+class NormalizeQueryTest(unittest.TestCase):
+
+    def test_equivalent_phrasings_share_a_key(self):
+        self.assertEqual(normalize_query("How do I size the NAT gateways?"),
+                         normalize_query("How can I size a NAT gateway"))
+        self.assertEqual(normalize_query("Configuración de la VPC"), normalize_query("configuracion vpc"))
+
+    def test_word_order_is_kept(self):
+        self.assertNotEqual(normalize_query("Migrate from ECS to EKS"), normalize_query("Migrate from EKS to ECS"))
+
+    def test_direction_and_negation_words_are_kept(self):
+        self.assertNotEqual(normalize_query("VPC con NAT gateway"), normalize_query("VPC sin NAT gateway"))
+        self.assertNotEqual(normalize_query("copy from bucket"), normalize_query("copy to bucket"))
+        self.assertNotEqual(normalize_query("subnet with public ip"), normalize_query("subnet without public ip"))
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class ResponseCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(response_cache.time, "monotonic", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_hit_is_scoped_by_node_and_prompt(self):
+        cache = ResponseCache()
+        cache.put("networking", "prompt", "Size the NAT gateway", "respuesta")
+
+        self.assertEqual(cache.get("networking", "prompt", "size the nat gateways?"), "respuesta")
+        self.assertIsNone(cache.get("iac", "prompt", "Size the NAT gateway"))
+        self.assertIsNone(cache.get("networking", "otro prompt", "Size the NAT gateway"))
+        self.assertEqual(cache.stats("networking"), {"hits": 1, "misses": 1})
+
+    def test_entries_expire_after_ttl(self):
+        cache = ResponseCache(ttl=10.0)
+        cache.put("n", None, "consulta", "respuesta")
+
+        self.clock.now += 9.9
+        self.assertEqual(cache.get("n", None, "consulta"), "respuesta")
+        self.clock.now += 0.2
+        self.assertIsNone(cache.get("n", None, "consulta"))
+        self.assertEqual(cache.stats()["entries"], 0)
+        self.assertEqual(cache.stats()["bytes"], 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ResponseCache(max_entries=2)
+        cache.put("n", None, "uno", "1")
+        cache.put("n", None, "dos", "2")
+        cache.get("n", None, "uno")
+        cache.put("n", None, "tres", "3")
+
+        self.assertEqual(cache.get("n", None, "uno"), "1")
+        self.assertIsNone(cache.get("n", None, "dos"))
+        self.assertEqual(cache.get("n", None, "tres"), "3")
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_byte_limit_evicts_and_skips_oversized_responses(self):
+        # Tamaño de cada entrada: respuesta + clave normalizada (10 + 3 bytes)
+        cache = ResponseCache(max_bytes=20)
+        cache.put("n", None, "uno", "x" * 10)
+        cache.put("n", None, "dos", "y" * 10)
+        self.assertIsNone(cache.get("n", None, "uno"))
+        self.assertEqual(cache.get("n", None, "dos"), "y" * 10)
+
+        cache.put("n", None, "tres", "z" * 50)
+        self.assertIsNone(cache.get("n", None, "tres"))
+        self.assertEqual(cache.get("n", None, "dos"), "y" * 10)
+
+    def test_replacing_an_entry_keeps_byte_count(self):
+        cache = ResponseCache()
+        cache.put("n", None, "consulta", "corta")
+        cache.put("n", None, "consulta", "mucho mas larga")
+        self.assertEqual(cache.stats()["entries"], 1)
+        self.assertEqual(cache.stats()["bytes"], len("mucho mas larga") + len(normalize_query("consulta")))
+
+
+if __name__ == "__main__":
+    unittest.main()
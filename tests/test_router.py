@@ -0,0 +1,100 @@
+"""
+Pruebas de las decisiones del enrutador local de intenciones (sin modelo ni red).
+"""
+import unittest
+
+from orchestrator.router import IntentRouter
+
+# Prompts idénticos: todos sus términos pesan cero y solo cuentan las palabras clave
+_DOCUMENTS = {"a": "texto comun", "b": "texto comun", "c": "texto comun"}
+_KEYWORDS = {
+    "a": ("alpha", "beta", "nat gateway"),
+    "b": ("gamma", "delta"),
+    "c": ("epsilon", "zeta"),
+}
+
+
+def make_router(**kwargs) -> IntentRouter:
+    options = {"min_score": 1.0, "margin": 2.0, "max_specialists": 2, "min_keyword_hits": 2}
+    options.update(kwargs)
+    return IntentRouter(_DOCUMENTS, _KEYWORDS, **options)
+
+
+class RouteDecisionTest(unittest.TestCase):
+
+    def test_clear_query_is_confident(self):
+        decision = make_router().route("alpha y beta")
+        self.assertTrue(decision.confident)
+        self.assertEqual(decision.specialists, ["a"])
+
+    def test_single_keyword_is_not_enough(self):
+        decision = make_router().route("solo alpha")
+        self.assertFalse(decision.confident)
+        self.assertEqual(decision.specialists, ["a"])
+        self.assertIn("pocas palabras clave", decision.reason)
+
+    def test_every_relevant_specialist_is_kept(self):
+        decision = make_router().route("alpha beta gamma delta")
+        self.assertTrue(decision.confident)
+        self.assertEqual(sorted(decision.specialists), ["a", "b"])
+
+    def test_too_many_specialists_fall_back_without_dropping_any(self):
+        decision = make_router().route("alpha beta gamma delta epsilon zeta")
+        self.assertFalse(decision.confident)
+        self.assertEqual(sorted(decision.specialists), ["a", "b", "c"])
+
+    def test_weak_companion_makes_the_route_ambiguous(self):
+        # b supera min_score con una sola palabra clave: no se descarta ni se da por buena
+        decision = make_router().route("alpha beta gamma")
+        self.assertFalse(decision.confident)
+        self.assertEqual(decision.specialists, ["a", "b"])
+
+    def test_margin_against_best_excluded(self):
+        query = "alpha beta gamma"
+        self.assertTrue(make_router(min_score=2.0, margin=2.0).route(query).confident)
+        decision = make_router(min_score=2.0, margin=3.0).route(query)
+        self.assertFalse(decision.confident)
+        self.assertIn("margen insuficiente", decision.reason)
+
+    def test_no_signal(self):
+        decision = make_router().route("que tiempo hace hoy")
+        self.assertFalse(decision.confident)
+        self.assertEqual(decision.specialists, [])
+
+    def test_phrases_accents_and_plurals(self):
+        router = make_router()
+        self.assertEqual(router.score("Un NAT Gateway y álpha")["a"], 2.0)
+        self.assertEqual(router.score("gammas deltas")["b"], 2.0)
+
+    def test_stats_count_decisions(self):
+        router = make_router()
+        router.route("alpha beta")
+        router.route("nada")
+        self.assertEqual(router.stats()["routed"], 1)
+        self.assertEqual(router.stats()["fallback"], 1)
+
+
+class AgentPromptRouterTest(unittest.TestCase):
+    """Con los prompts y palabras clave reales de los agentes."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.router = IntentRouter.from_agent_prompts(min_score=1.0, margin=2.0, max_specialists=3,
+                                                     min_keyword_hits=2)
+
+    def test_multi_domain_query_keeps_all_specialists(self):
+        decision = self.router.route("Diseña la red VPC, el módulo de terraform y el pipeline de github actions")
+        self.assertFalse(decision.confident)
+        self.assertEqual(set(decision.specialists), {"networking", "iac", "cicd"})
+
+    def test_generic_words_do_not_route(self):
+        self.assertFalse(self.router.route("deploy the stack").confident)
+
+    def test_clear_domain_query_routes(self):
+        decision = self.router.route("Crea subredes privadas en la VPC con NAT gateway")
+        self.assertTrue(decision.confident)
+        self.assertEqual(decision.specialists, ["networking"])
+
+
+if __name__ == "__main__":
+    unittest.main()
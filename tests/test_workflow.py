@@ -0,0 +1,146 @@
+"""
+Pruebas del ejecutor de flujos declarativos con un grafo simulado (sin agentes ni red).
+"""
+import asyncio
+import time
+import unittest
+
+from orchestrator.workflow import Workflow, WorkflowExecutor
+
+_PIPELINE = {
+    "name": "pipeline",
+    "tasks": [
+        {"id": "design", "agent": "networking", "prompt": "Diseña: {{query}}"},
+        {"id": "code", "agent": "iac", "prompt": "Código de {{design}}"},
+        {"id": "deploy", "agent": "cicd", "prompt": "Despliega {{code}}"},
+        {"id": "cost", "agent": "aws_expert", "prompt": "Coste de {{design}}"}
+    ]
+}
+
+
+class StubGraph:
+    """Grafo mínimo: cada agente responde con su id y el mensaje; puede fallar las primeras veces."""
+
+    def __init__(self, failures=None, delays=None):
+        self.nodes = {agent_id: object() for agent_id in ("networking", "iac", "cicd", "aws_expert")}
+        self.failures = dict(failures or {})
+        self.delays = delays or {}
+        self.calls = []
+
+    async def asend_message(self, agent_id, message):
+        self.calls.append(agent_id)
+        await asyncio.sleep(self.delays.get(agent_id, 0))
+        if self.failures.get(agent_id, 0):
+            self.failures[agent_id] -= 1
+            raise RuntimeError(f"{agent_id} caído")
+        return f"[{agent_id}] {message}"
+
+
+def make_executor(graph, **kwargs):
+    options = {"max_concurrency": 4, "retries": 0, "retry_backoff": 0.0, "task_timeout": 5.0, "memo_size": 16}
+    options.update(kwargs)
+    return WorkflowExecutor(graph, **options)
+
+
+class WorkflowDefinitionTest(unittest.TestCase):
+
+    def test_references_become_dependencies(self):
+        workflow = Workflow.from_dict(_PIPELINE)
+        self.assertEqual(workflow.task_map["code"].dependencies, ["design"])
+        self.assertEqual(workflow.levels, [["design"], ["code", "cost"], ["deploy"]])
+
+    def test_invalid_definitions(self):
+        with self.assertRaises(ValueError):
+            Workflow.from_dict({"tasks": [{"id": "a", "agent": "x", "prompt": "{{missing}}"}]})
+        with self.assertRaises(ValueError):
+            Workflow.from_dict({"tasks": [{"id": "a", "agent": "x", "prompt": "{{b}}"},
+                                          {"id": "b", "agent": "x", "prompt": "{{a}}"}]})
+        with self.assertRaises(ValueError):
+            Workflow.from_dict({"tasks": [{"id": "query", "agent": "x", "prompt": "p"}]})
+
+    def test_unknown_agent_is_rejected(self):
+        workflow = Workflow.from_dict({"tasks": [{"id": "a", "agent": "nadie", "prompt": "p"}]})
+        with self.assertRaises(ValueError):
+            asyncio.run(make_executor(StubGraph()).arun(workflow, "q"))
+
+
+class WorkflowExecutorTest(unittest.TestCase):
+
+    def test_outputs_are_rendered_into_dependents(self):
+        graph = StubGraph()
+        result = asyncio.run(make_executor(graph).arun(Workflow.from_dict(_PIPELINE), "una VPC"))
+
+        self.assertEqual(result.errors, {})
+        self.assertEqual(result.outputs["deploy"], "[cicd] Despliega [iac] Código de [networking] Diseña: una VPC")
+        self.assertIn("## deploy", result.answer)
+        self.assertIn("## cost", result.answer)
+
+    def test_retry_with_backoff_then_success(self):
+        graph = StubGraph(failures={"iac": 2})
+        executor = make_executor(graph, retries=2, retry_backoff=0.05)
+
+        started = time.perf_counter()
+        result = asyncio.run(executor.arun(Workflow.from_dict(_PIPELINE), "q"))
+
+        self.assertEqual(result.attempts["code"], 3)
+        self.assertIn("code", result.outputs)
+        # Esperas de 0.05 s y 0.1 s antes de los reintentos
+        self.assertGreaterEqual(time.perf_counter() - started, 0.15)
+
+    def test_failed_task_skips_its_dependents_only(self):
+        graph = StubGraph(failures={"iac": 1})
+        result = asyncio.run(make_executor(graph).arun(Workflow.from_dict(_PIPELINE), "q"))
+
+        self.assertEqual(list(result.errors), ["code"])
+        self.assertEqual(result.skipped, ["deploy"])
+        self.assertNotIn("cicd", graph.calls)
+        self.assertIn("cost", result.outputs)
+        self.assertIn("Respuesta parcial", result.answer)
+
+    def test_timeout_per_attempt(self):
+        graph = StubGraph(delays={"networking": 1.0})
+        workflow = Workflow.from_dict({"tasks": [{"id": "a", "agent": "networking", "prompt": "p"}]})
+        result = asyncio.run(make_executor(graph, task_timeout=0.05).arun(workflow, "q"))
+        self.assertIn("sin respuesta", result.errors["a"])
+
+    def test_memo_skips_repeated_calls(self):
+        graph = StubGraph()
+        executor = make_executor(graph)
+        workflow = Workflow.from_dict(_PIPELINE)
+
+        asyncio.run(executor.arun(workflow, "q"))
+        second = asyncio.run(executor.arun(workflow, "q"))
+        self.assertEqual(len(graph.calls), 4)
+        self.assertEqual(sorted(second.memo_hits), ["code", "cost", "deploy", "design"])
+
+        # Otra consulta cambia los mensajes: nada se reutiliza
+        asyncio.run(executor.arun(workflow, "otra"))
+        self.assertEqual(len(graph.calls), 8)
+
+        executor.clear_memo()
+        asyncio.run(executor.arun(workflow, "q"))
+        self.assertEqual(len(graph.calls), 12)
+
+    def test_memo_disabled_and_failures_not_memoized(self):
+        graph = StubGraph(failures={"networking": 1})
+        executor = make_executor(graph)
+        workflow = Workflow.from_dict({"tasks": [{"id": "a", "agent": "networking", "prompt": "p"}]})
+
+        self.assertIn("a", asyncio.run(executor.arun(workflow, "q")).errors)
+        self.assertIn("a", asyncio.run(executor.arun(workflow, "q")).outputs)
+
+        graph = StubGraph()
+        executor = make_executor(graph, memo_size=0)
+        asyncio.run(executor.arun(workflow, "q"))
+        asyncio.run(executor.arun(workflow, "q"))
+        self.assertEqual(len(graph.calls), 2)
+
+    def test_independent_tasks_run_in_parallel(self):
+        graph = StubGraph(delays={"iac": 0.2, "aws_expert": 0.2})
+        started = time.perf_counter()
+        asyncio.run(make_executor(graph).arun(Workflow.from_dict(_PIPELINE), "q"))
+        self.assertLess(time.perf_counter() - started, 0.35)
+
+
+if __name__ == "__main__":
+    unittest.main()